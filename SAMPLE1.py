@@ -1,19 +1,44 @@
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
-import mysql.connector
+from tkinter import ttk, messagebox, filedialog
+from db_pool import MySQLPool, SQLitePool
+from paged_tree import PagedTreeview
+from tasks import TaskRunner
+from pages import PageManager
+from bulk_import import import_marks_db
+from passwords import hash_password, verify_password, needs_rehash, dummy_hash
+from settings import PASSWORD_SCHEME, PASSWORD_COST, METRICS_ENABLED, METRICS_FILE, PROFILE_ENABLED, PROFILE_DIR
+from diagnostics import DiagnosticsPanel
+import instrument, profiling
 
 # ===== DATABASE CONNECTION =====
-def connect_db():
-    try:
-        return mysql.connector.connect(
-            host="localhost",
-            user="root",       
-            password="root",   
-            database="grade_system"
-        )
-    except mysql.connector.Error as err:
-        messagebox.showerror("Database Error", f"Error connecting to database:\n{err}")
-        raise SystemExit
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "root",
+    "database": "grade_system",
+}
+POOL_SIZE = int(os.environ.get("GRADE_DB_POOL_SIZE", "5"))
+# set GRADE_DB_SQLITE=<file> to run against a local SQLite stand-in instead of MySQL
+SQLITE_STANDIN = os.environ.get("GRADE_DB_SQLITE")
+# users.password holds "<scheme>$<cost>$<salt>$<hash>" (~90 chars for scrypt); see passwords.py
+
+_pool = None
+
+def get_pool():
+    # one pool shared by every handler; connections stay warm between clicks.
+    # It is created on the Tk thread at startup, before any worker needs it.
+    global _pool
+    if _pool is None:
+        try:
+            if SQLITE_STANDIN:
+                _pool = SQLitePool(SQLITE_STANDIN, size=POOL_SIZE)
+            else:
+                _pool = MySQLPool(size=POOL_SIZE, **DB_CONFIG)
+        except Exception as err:
+            messagebox.showerror("Database Error", f"Error connecting to database:\n{err}")
+            raise SystemExit
+    return _pool
 
 # ===== MAIN WINDOW =====
 root = tk.Tk()
@@ -21,22 +46,43 @@ root.title("Student Grade Tracking System")
 root.geometry("800x500")
 root.resizable(False, False)
 
+# DB calls run on worker threads via runner.submit(); only the on_done
+# callbacks (which run back on the Tk thread) may touch widgets
+runner = TaskRunner(root)
+
+def on_db_error(err):
+    messagebox.showerror("Database Error", f"Database error:\n{err}")
+
+# F12 opens the latency/IO panel and F11 the last action's profile; the
+# GRADE_METRICS*/GRADE_PROFILE* switches are read in settings.py
+instrument.enable(METRICS_ENABLED)
+if PROFILE_ENABLED:
+    profiling.enable(PROFILE_DIR)
+diagnostics = DiagnosticsPanel(root)
+root.bind_all("<F12>", lambda e: diagnostics.toggle())
+root.bind_all("<F11>", lambda e: diagnostics.profile_viewer.toggle())
+
+# each screen is built once into its own frame and raised on navigation
+pages = PageManager(root)
+
 # ===== LOGIN WINDOW =====
+@instrument.timed
 def show_login():
-    for widget in root.winfo_children():
-        widget.destroy()
+    pages.show("login")
 
-    tk.Label(root, text="STUDENT GRADE TRACKING SYSTEM", font=("Arial", 18, "bold")).pack(pady=30)
-    tk.Label(root, text="Login", font=("Arial", 14, "bold")).pack(pady=10)
+def build_login(page):
+    tk.Label(page, text="STUDENT GRADE TRACKING SYSTEM", font=("Arial", 18, "bold")).pack(pady=30)
+    tk.Label(page, text="Login", font=("Arial", 14, "bold")).pack(pady=10)
 
-    tk.Label(root, text="Username").pack()
-    username_entry = tk.Entry(root)
+    tk.Label(page, text="Username").pack()
+    username_entry = tk.Entry(page)
     username_entry.pack(pady=5)
 
-    tk.Label(root, text="Password").pack()
-    password_entry = tk.Entry(root, show="*")
+    tk.Label(page, text="Password").pack()
+    password_entry = tk.Entry(page, show="*")
     password_entry.pack(pady=5)
 
+    @instrument.timed
     def login():
         username = username_entry.get().strip()
         password = password_entry.get().strip()
@@ -45,44 +91,68 @@ def show_login():
             messagebox.showerror("Error", "All fields are required!")
             return
 
-        db = connect_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT role FROM users WHERE username=%s AND password=%s", (username, password))
-        result = cursor.fetchone()
-        db.close()
-
-        if result:
-            role = result[0]
-            if role == "admin":
-                show_admin_dashboard()
+        @instrument.timed
+        def check():
+            # runs on a worker: the hash comparison is deliberately slow
+            with get_pool().cursor() as cursor:
+                cursor.execute("SELECT password, role FROM users WHERE username=%s", (username,))
+                row = cursor.fetchone()
+            if row is None:
+                # as slow as a wrong password, so unknown usernames cannot be told apart by timing
+                verify_password(password, dummy_hash(PASSWORD_SCHEME, PASSWORD_COST))
+                return None
+            if not verify_password(password, row[0]):
+                return None
+            if needs_rehash(row[0], PASSWORD_SCHEME, PASSWORD_COST):
+                # plaintext from before hashing, or an older cost: upgrade it now
+                with get_pool().cursor() as cursor:
+                    cursor.execute("UPDATE users SET password=%s WHERE username=%s",
+                                   (hash_password(password, PASSWORD_SCHEME, PASSWORD_COST), username))
+            return row
+
+        def done(result):
+            if result:
+                role = result[1]
+                if role == "admin":
+                    show_admin_dashboard()
+                else:
+                    show_student_dashboard(username)
             else:
-                show_student_dashboard(username)
-        else:
-            messagebox.showerror("Error", "Invalid username or password")
+                messagebox.showerror("Error", "Invalid username or password")
+
+        runner.submit(check, on_done=done, on_error=on_db_error, key="login")
+
+    tk.Button(page, text="Login", bg="green", fg="white", width=15, command=login).pack(pady=15)
+    tk.Button(page, text="Don't have an account? Sign Up", fg="blue", command=show_signup).pack()
 
-    tk.Button(root, text="Login", bg="green", fg="white", width=15, command=login).pack(pady=15)
-    tk.Button(root, text="Don't have an account? Sign Up", fg="blue", command=show_signup).pack()
+    def refresh():
+        username_entry.delete(0, tk.END)
+        password_entry.delete(0, tk.END)
+        username_entry.focus_set()
+    return refresh
 
 # ===== SIGNUP WINDOW =====
+@instrument.timed
 def show_signup():
-    for widget in root.winfo_children():
-        widget.destroy()
+    pages.show("signup")
 
-    tk.Label(root, text="CREATE AN ACCOUNT", font=("Arial", 18, "bold")).pack(pady=30)
+def build_signup(page):
+    tk.Label(page, text="CREATE AN ACCOUNT", font=("Arial", 18, "bold")).pack(pady=30)
 
-    tk.Label(root, text="Username").pack()
-    username_entry = tk.Entry(root)
+    tk.Label(page, text="Username").pack()
+    username_entry = tk.Entry(page)
     username_entry.pack(pady=5)
 
-    tk.Label(root, text="Password").pack()
-    password_entry = tk.Entry(root, show="*")
+    tk.Label(page, text="Password").pack()
+    password_entry = tk.Entry(page, show="*")
     password_entry.pack(pady=5)
 
-    tk.Label(root, text="Role (admin/student)").pack()
+    tk.Label(page, text="Role (admin/student)").pack()
     role_var = tk.StringVar(value="student")
-    role_box = ttk.Combobox(root, textvariable=role_var, values=["admin", "student"], state="readonly", width=15)
+    role_box = ttk.Combobox(page, textvariable=role_var, values=["admin", "student"], state="readonly", width=15)
     role_box.pack(pady=5)
 
+    @instrument.timed
     def signup():
         username = username_entry.get().strip()
         password = password_entry.get().strip()
@@ -92,33 +162,46 @@ def show_signup():
             messagebox.showerror("Error", "All fields are required!")
             return
 
-        db = connect_db()
-        cursor = db.cursor()
+        @instrument.timed
+        def create():
+            pool = get_pool()
+            try:
+                with pool.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO users (username, password, role) VALUES (%s, %s, %s)",
+                        (username, hash_password(password, PASSWORD_SCHEME, PASSWORD_COST), role)
+                    )
+                return True
+            except pool.IntegrityError:
+                return False
+
+        def done(created):
+            if created:
+                messagebox.showinfo("Success", "Account created successfully! You can now log in.")
+                show_login()
+            else:
+                messagebox.showerror("Error", "Username already exists!")
 
-        try:
-            cursor.execute(
-                "INSERT INTO users (username, password, role) VALUES (%s, %s, %s)",
-                (username, password, role)
-            )
-            db.commit()
-            messagebox.showinfo("Success", "Account created successfully! You can now log in.")
-            show_login()
-        except mysql.connector.IntegrityError:
-            messagebox.showerror("Error", "Username already exists!")
-        finally:
-            db.close()
-
-    tk.Button(root, text="Sign Up", bg="green", fg="white", width=15, command=signup).pack(pady=15)
-    tk.Button(root, text="Back to Login", fg="blue", command=show_login).pack()
+        runner.submit(create, on_done=done, on_error=on_db_error, key="signup")
+
+    tk.Button(page, text="Sign Up", bg="green", fg="white", width=15, command=signup).pack(pady=15)
+    tk.Button(page, text="Back to Login", fg="blue", command=show_login).pack()
+
+    def refresh():
+        username_entry.delete(0, tk.END)
+        password_entry.delete(0, tk.END)
+        role_var.set("student")
+    return refresh
 
 # ===== ADMIN DASHBOARD =====
+@instrument.timed
 def show_admin_dashboard():
-    for widget in root.winfo_children():
-        widget.destroy()
+    pages.show("admin")
 
-    tk.Label(root, text="ADMIN DASHBOARD", font=("Arial", 16, "bold")).pack(pady=10)
+def build_admin_dashboard(page):
+    tk.Label(page, text="ADMIN DASHBOARD", font=("Arial", 16, "bold")).pack(pady=10)
     
-    frame = tk.Frame(root)
+    frame = tk.Frame(page)
     frame.pack(pady=10)
 
     tk.Label(frame, text="Student").grid(row=0, column=0, padx=5)
@@ -134,6 +217,7 @@ def show_admin_dashboard():
     marks_entry.grid(row=0, column=5, padx=5)
 
     # Add Marks
+    @instrument.timed
     def add_marks():
         student = student_entry.get().strip()
         subject = subject_entry.get().strip()
@@ -143,54 +227,66 @@ def show_admin_dashboard():
             messagebox.showerror("Error", "Please fill all fields correctly!")
             return
 
-        db = connect_db()
-        cursor = db.cursor()
-        cursor.execute("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)",
-                       (student, subject, marks))
-        db.commit()
-        db.close()
-        messagebox.showinfo("Success", "Marks added successfully!")
-        load_data()
-        student_entry.delete(0, tk.END)
-        subject_entry.delete(0, tk.END)
-        marks_entry.delete(0, tk.END)
+        @instrument.timed
+        def insert():
+            with get_pool().cursor() as cursor:
+                cursor.execute("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)",
+                               (student, subject, marks))
+
+        def done(_):
+            messagebox.showinfo("Success", "Marks added successfully!")
+            load_data()
+            student_entry.delete(0, tk.END)
+            subject_entry.delete(0, tk.END)
+            marks_entry.delete(0, tk.END)
+
+        runner.submit(insert, on_done=done, on_error=on_db_error)
 
     tk.Button(frame, text="Add Marks", command=add_marks, bg="green", fg="white").grid(row=0, column=6, padx=5)
 
-    # Table
-    tree = ttk.Treeview(root, columns=("ID", "Student", "Subject", "Marks"), show='headings')
+    # Table (rows are fetched a page at a time, keyed on id, as the user scrolls)
+    @instrument.timed
+    def fetch_marks_page(after_id, limit):
+        with get_pool().cursor() as cursor:
+            cursor.execute("SELECT * FROM marks WHERE id > %s ORDER BY id ASC LIMIT %s", (after_id or 0, limit))
+            rows = cursor.fetchall()
+        return rows, (rows[-1][0] if len(rows) == limit else None)
+
+    table_frame = tk.Frame(page)
+    table_frame.pack(pady=20, fill='both', expand=True)
+    tree = PagedTreeview(table_frame, fetch_marks_page, runner=runner, columns=("ID", "Student", "Subject", "Marks"), show='headings')
     for col in ("ID", "Student", "Subject", "Marks"):
         tree.heading(col, text=col)
         tree.column(col, width=150, anchor="center")
-    tree.pack(pady=20, fill='both', expand=True)
+    tree.scrollbar.pack(side='right', fill='y')
+    tree.pack(side='left', fill='both', expand=True)
 
     # Load Data
+    @instrument.timed
     def load_data():
-        for row in tree.get_children():
-            tree.delete(row)
-        db = connect_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM marks ORDER BY id ASC")
-        for row in cursor.fetchall():
-            tree.insert("", "end", values=row)
-        db.close()
+        tree.reload()
 
     # Delete Record
+    @instrument.timed
     def delete_record():
         selected = tree.selection()
         if not selected:
             messagebox.showerror("Error", "Select a record to delete!")
             return
         record = tree.item(selected[0])['values']
-        db = connect_db()
-        cursor = db.cursor()
-        cursor.execute("DELETE FROM marks WHERE id=%s", (record[0],))
-        db.commit()
-        db.close()
-        messagebox.showinfo("Deleted", "Record deleted successfully!")
-        load_data()
+        @instrument.timed
+        def delete():
+            with get_pool().cursor() as cursor:
+                cursor.execute("DELETE FROM marks WHERE id=%s", (record[0],))
+
+        def done(_):
+            messagebox.showinfo("Deleted", "Record deleted successfully!")
+            load_data()
+
+        runner.submit(delete, on_done=done, on_error=on_db_error)
 
     # Edit Record
+    @instrument.timed
     def edit_record():
         selected = tree.selection()
         if not selected:
@@ -213,6 +309,7 @@ def show_admin_dashboard():
         mark_entry.insert(0, record[3])
         mark_entry.pack()
 
+        @instrument.timed
         def update_record():
             new_subject = sub_entry.get().strip()
             new_marks = mark_entry.get().strip()
@@ -221,53 +318,95 @@ def show_admin_dashboard():
                 messagebox.showerror("Error", "Invalid input!")
                 return
 
-            db = connect_db()
-            cursor = db.cursor()
-            cursor.execute("UPDATE marks SET subject=%s, marks=%s WHERE id=%s",
-                           (new_subject, new_marks, record[0]))
-            db.commit()
-            db.close()
-            messagebox.showinfo("Success", "Record updated successfully!")
-            edit_window.destroy()
-            load_data()
+            @instrument.timed
+            def update():
+                with get_pool().cursor() as cursor:
+                    cursor.execute("UPDATE marks SET subject=%s, marks=%s WHERE id=%s",
+                                   (new_subject, new_marks, record[0]))
+
+            def done(_):
+                messagebox.showinfo("Success", "Record updated successfully!")
+                edit_window.destroy()
+                load_data()
+
+            runner.submit(update, on_done=done, on_error=on_db_error)
 
         tk.Button(edit_window, text="Save Changes", bg="blue", fg="white", command=update_record).pack(pady=10)
 
+    # Import Marks (Student, Subject, Marks columns) in chunked transactions
+    @instrument.timed
+    def import_marks():
+        path = filedialog.askopenfilename(title="Import marks", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def done(result):
+            messagebox.showinfo("Import finished", result.summary())
+            load_data()
+
+        runner.submit(import_marks_db, path, get_pool(), on_done=done, on_error=on_db_error, key="import")
+
     # Buttons
-    button_frame = tk.Frame(root)
+    button_frame = tk.Frame(page)
     button_frame.pack(pady=10)
     tk.Button(button_frame, text="Edit Record", command=edit_record, bg="orange", fg="white", width=15).grid(row=0, column=0, padx=10)
     tk.Button(button_frame, text="Delete Record", command=delete_record, bg="red", fg="white", width=15).grid(row=0, column=1, padx=10)
-    tk.Button(button_frame, text="Logout", command=show_login, bg="gray", fg="white", width=15).grid(row=0, column=2, padx=10)
+    tk.Button(button_frame, text="Import CSV", command=import_marks, bg="green", fg="white", width=15).grid(row=0, column=2, padx=10)
+    tk.Button(button_frame, text="Logout", command=show_login, bg="gray", fg="white", width=15).grid(row=0, column=3, padx=10)
 
-    load_data()
+    def refresh():
+        student_entry.delete(0, tk.END)
+        subject_entry.delete(0, tk.END)
+        marks_entry.delete(0, tk.END)
+        load_data()
+    return refresh
 
 # ===== STUDENT DASHBOARD =====
+@instrument.timed
 def show_student_dashboard(username):
-    for widget in root.winfo_children():
-        widget.destroy()
+    pages.show("student", username)
 
-    tk.Label(root, text=f"STUDENT DASHBOARD - {username}", font=("Arial", 16, "bold")).pack(pady=10)
+def build_student_dashboard(page):
+    title = tk.Label(page, font=("Arial", 16, "bold"))
+    title.pack(pady=10)
 
-    tree = ttk.Treeview(root, columns=("ID", "Subject", "Marks"), show='headings')
+    tree = ttk.Treeview(page, columns=("ID", "Subject", "Marks"), show='headings')
     for col in ("ID", "Subject", "Marks"):
         tree.heading(col, text=col)
         tree.column(col, width=200, anchor="center")
     tree.pack(pady=20, fill='both', expand=True)
 
-    def load_data():
+    @instrument.timed
+    def fetch(username):
+        with get_pool().cursor() as cursor:
+            cursor.execute("SELECT id, subject, marks FROM marks WHERE student=%s ORDER BY id ASC", (username,))
+            return cursor.fetchall()
+
+    def show_rows(rows):
         for row in tree.get_children():
             tree.delete(row)
-        db = connect_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT id, subject, marks FROM marks WHERE student=%s ORDER BY id ASC", (username,))
-        for row in cursor.fetchall():
+        for row in rows:
             tree.insert("", "end", values=row)
-        db.close()
 
-    tk.Button(root, text="Logout", command=show_login, bg="gray", fg="white", width=15).pack(pady=10)
-    load_data()
+    def refresh(username):
+        title.config(text=f"STUDENT DASHBOARD - {username}")
+        # the previous student's rows must not linger while this one's load
+        tree.delete(*tree.get_children())
+        runner.submit(fetch, username, on_done=show_rows, on_error=on_db_error, key="student_marks")
+
+    tk.Button(page, text="Logout", command=show_login, bg="gray", fg="white", width=15).pack(pady=10)
+    return refresh
+
+pages.register("login", build_login)
+pages.register("signup", build_signup)
+pages.register("admin", build_admin_dashboard)
+pages.register("student", build_student_dashboard)
 
 # ===== START APP =====
+get_pool()
 show_login()
 root.mainloop()
+runner.shutdown()
+if METRICS_FILE:
+    instrument.export(METRICS_FILE)
+_pool.close()
@@ -0,0 +1,135 @@
+import hashlib, multiprocessing, os, re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import grading
+from charts import marks_pie
+
+FORMATS = ("pdf", "png")
+PAGE_SIZE = (8.27, 11.69)     # A4, inches
+
+# grade data for the worker processes: {student_id: [records]}. Set once per
+# worker by _init_worker, so it is pickled once per worker rather than per task.
+_GROUPS = None
+
+
+def group_records(rows):
+    groups = {}
+    for r in rows:
+        groups.setdefault(r[0], []).append(r)
+    return groups
+
+
+def report_filename(sid, fmt):
+    safe = re.sub(r"[^\w.-]", "_", sid)
+    if safe != sid or not sid:
+        # "A/1" and "A_1" must not share a file: tag a changed ID with a hash of the original
+        safe += "-" + hashlib.sha1(sid.encode("utf-8")).hexdigest()[:8]
+    return safe + "." + fmt
+
+
+class ReportPage:
+    """One student's report laid out on a Figure: course lines, stats and the marks pie.
+
+    The axes and text artists are created once and updated per student, which
+    is most of the per-report cost when the figure is rebuilt every time.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.title = fig.text(0.5, 0.955, "", ha="center", fontsize=16, fontweight="bold")
+        fig.text(0.5, 0.93, "Performance Report", ha="center", fontsize=11, color="#555555")
+        fig.text(0.1, 0.89, "Course - Marks - Grade", fontsize=12, fontweight="bold")
+        self.courses = fig.text(0.1, 0.875, "", va="top", fontsize=10, linespacing=1.6)
+        self.stats = fig.text(0.5, 0.52, "", ha="center", fontsize=12)
+        self.gpa = fig.text(0.5, 0.49, "", ha="center", fontsize=12, fontweight="bold")
+        self.pie_ax = fig.add_axes([0.15, 0.04, 0.7, 0.42])
+
+    def render(self, sid, recs):
+        # same content as GradeTrackerApp.show_student_report
+        name = recs[0][1] if len(recs[0]) > 1 else ""
+        self.title.set_text(f"{name}  —  {sid}")
+        lines, subjects = [], []
+        for r in recs:
+            course = r[2] if len(r) > 2 else "(unknown)"
+            lines.append(f"{course}  |  Marks: {r[3] if len(r) > 3 else '0'}  |  Grade: {r[4] if len(r) > 4 else 'F'}")
+            subjects.append(course)
+        self.courses.set_text("\n".join(lines))
+
+        marks, avg_marks, highest, lowest, gpa = grading.report_stats(recs)
+        self.stats.set_text(f"Average Marks: {avg_marks:.2f}    Highest: {highest:.2f}    Lowest: {lowest:.2f}")
+        self.gpa.set_text(f"GPA: {gpa:.2f}")
+
+        for artist in list(self.pie_ax.patches) + list(self.pie_ax.texts):
+            artist.remove()
+        self.pie_ax.set_prop_cycle(None)     # every report starts from the first colour, like a fresh chart
+        marks_pie(self.pie_ax, marks, subjects)
+
+
+# ---------- worker side ----------
+def _init_worker(groups):
+    global _GROUPS
+    _GROUPS = groups
+
+
+def _render_chunk(sids, out_dir, fmt, dpi):
+    # Agg canvas on a plain Figure: no pyplot, no GUI backend in the workers
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=PAGE_SIZE)
+    FigureCanvasAgg(fig)
+    page = ReportPage(fig)
+    # the default zlib level costs about as much as drawing the page; level 1 is far cheaper
+    save_kw = {"pil_kwargs": {"compress_level": 1}} if fmt == "png" else {}
+    written, failed = 0, []
+    for sid in sids:
+        try:
+            page.render(sid, _GROUPS[sid])
+            fig.savefig(os.path.join(out_dir, report_filename(sid, fmt)), format=fmt, dpi=dpi, **save_kw)
+            written += 1
+        except Exception as exc:
+            failed.append((sid, f"{type(exc).__name__}: {exc}"))
+    fig.clear()
+    return written, failed
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def generate_reports(rows, out_dir, fmt="pdf", workers=None, chunk_size=100, dpi=100,
+                     student_ids=None, progress=None):
+    """Write one report file per student (out_dir/<ID>.pdf or .png) from grade rows.
+
+    IDs holding characters unsafe in a file name have them replaced and get a
+    short hash suffix (report_filename), so different IDs never share a file.
+
+    Students are handed to a process pool in chunks of chunk_size IDs; each
+    worker renders with Agg and reuses one Figure and layout per chunk. progress(done,
+    total) is called in this process as chunks finish. Returns (written,
+    [(student_id, error), ...]).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    groups = group_records(r for r in rows if r)
+    sids = sorted(groups) if student_ids is None else [s for s in student_ids if s in groups]
+    os.makedirs(out_dir, exist_ok=True)
+    if not sids:
+        return 0, []
+
+    workers = workers or os.cpu_count() or 1
+    # never fork: the GUI's task threads may be running, and forking a threaded process can deadlock
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    written, failed, done = 0, [], 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(sids)), mp_context=multiprocessing.get_context(method),
+                             initializer=_init_worker, initargs=(groups,)) as pool:
+        futures = {pool.submit(_render_chunk, chunk, out_dir, fmt, dpi): len(chunk)
+                   for chunk in _chunks(sids, chunk_size)}
+        for fut in as_completed(futures):
+            w, f = fut.result()
+            written += w
+            failed.extend(f)
+            done += futures[fut]
+            if progress is not None:
+                progress(done, len(sids))
+    return written, failed
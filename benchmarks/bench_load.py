@@ -0,0 +1,111 @@
+"""Throughput of the first students.csv load: serial csv.reader vs parallel_load.
+
+For each size a students.csv is generated (synth.py) and read with each
+worker count, reporting MB/s for:
+
+  parse  rows only: parallel_load.read_rows against one csv.reader
+  store  a cold RecordStore.refresh() (parse + index + aggregates), as the
+         app does before the first search or all-students report
+
+Every parallel result is checked against the serial one: the same rows in
+the same order, the same store contents and the same aggregates. With
+--quoted, every fifth name gets a comma, an escaped quote and an embedded
+newline, so chunk boundaries have to fall outside quoted fields.
+
+    python benchmarks/bench_load.py [--sizes 100k,1m] [--workers 1,2,4] [--quoted] [--out load.json]
+"""
+import argparse, csv, json, os, shutil, sys, tempfile, time
+
+import synth
+
+ROOT = synth.ROOT
+
+import parallel_load
+from record_store import HEADER, RecordStore, StudentAggregate
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000, "10m": 10_000_000}
+
+
+def write_quoted(path, rows, courses, seed):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for i, r in enumerate(synth.grade_rows(rows, courses, seed)):
+            if i % 5 == 0:
+                r = [r[0], f'{r[1]}, "Jr"\nsecond line'] + list(r[2:])
+            w.writerow(r)
+
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t
+
+
+def load_store(path, workers):
+    store = RecordStore(path, snapshot=False, load_workers=workers)
+    store.refresh()
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100k,1m", help=f"comma list of {', '.join(SIZES)} or row counts")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma list of worker counts")
+    parser.add_argument("--courses", type=int, default=6, help="courses per student")
+    parser.add_argument("--quoted", action="store_true", help="put commas, quotes and newlines in names")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results as JSON here")
+    args = parser.parse_args(argv)
+    # measure the pool at every size, not just above the store's default cut-off
+    parallel_load.MIN_PARALLEL_BYTES = 0
+
+    worker_counts = sorted({int(w) for w in args.workers.split(",") if w.strip()})
+    results, failures = [], 0
+    print(f"cpus {os.cpu_count()}")
+    print(f"{'size':<6} {'MiB':>7} {'workers':>7} {'parse MB/s':>11} {'store MB/s':>11} {'store s':>8}  check")
+    for label in (s.strip().lower() for s in args.sizes.split(",") if s.strip()):
+        rows = SIZES.get(label) or int(label)
+        base = tempfile.mkdtemp(prefix=f"benchload_{label}_")
+        try:
+            path = os.path.join(base, "students.csv")
+            if args.quoted:
+                write_quoted(path, rows, args.courses, args.seed)
+            else:
+                path = synth.write_dataset(base, rows, args.courses, args.seed)["students"]
+            mb = os.path.getsize(path) / 1e6
+
+            ref_rows, _ = timed(lambda: list(parallel_load.read_serial(path)))
+            ref_store = ref_aggs = None
+            for workers in worker_counts:
+                got, parse_s = timed(lambda: list(parallel_load.read_rows(path, workers)))
+                ok = got == ref_rows
+                del got
+                store, store_s = timed(lambda: load_store(path, workers))
+                if ref_store is None:
+                    ref_store, ref_aggs = store.all_records(), store.student_aggregates()
+                else:
+                    ok = ok and store.all_records() == ref_store and _same_aggs(store.student_aggregates(), ref_aggs)
+                del store
+                failures += not ok
+                r = {"size": label, "bytes": int(mb * 1e6), "rows": len(ref_rows), "workers": workers,
+                     "quoted": args.quoted, "parse_s": round(parse_s, 3), "parse_mb_s": round(mb / parse_s, 1),
+                     "store_s": round(store_s, 3), "store_mb_s": round(mb / store_s, 1), "match": ok}
+                results.append(r)
+                print(f"{label:<6} {mb / 1.048576:7.1f} {workers:>7} {r['parse_mb_s']:>11.1f} {r['store_mb_s']:>11.1f} "
+                      f"{store_s:8.2f}  {'ok' if ok else 'MISMATCH'}")
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "results": results}, f, indent=1)
+    return 1 if failures else 0
+
+
+def _same_aggs(a, b):
+    fields = StudentAggregate.__slots__
+    return list(a) == list(b) and all(getattr(a[k], f) == getattr(b[k], f) for k in a for f in fields)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
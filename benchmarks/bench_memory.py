@@ -0,0 +1,149 @@
+"""Memory of grade records held as row lists vs the columnar RecordTable.
+
+For each size a students.csv is generated (synth.py) and loaded, each
+representation in its own subprocess, measuring the Python heap it keeps
+(tracemalloc) and the time to load, filter and aggregate it:
+
+  lists         list of [ID, Name, CourseCode, Marks, Grade] str lists, as
+                RecordStore.all_records() / the reports hand them around
+  record_store  a loaded RecordStore (a RecordTable plus its ID/name slot indexes
+                and per-student aggregates); filter/aggregate go through
+                all_records(), which builds the row lists on each call
+  table         RecordTable.from_csv (dictionary-encoded int32/float32/uint8 columns)
+
+filter = rows of one course with marks >= 75; aggregate = per-student
+count/sum/min/max/GPA computed from scratch.
+
+    python benchmarks/bench_memory.py [--sizes 100k,1m] [--modes lists,record_store,table] [--out mem.json]
+"""
+import argparse, json, os, shutil, subprocess, sys, tempfile, time, tracemalloc
+
+import synth
+
+ROOT = synth.ROOT
+
+from grading import grade_to_gpa_point, parse_marks
+from record_store import RecordStore, StudentAggregate
+from record_table import RecordTable
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+MODES = ("lists", "record_store", "table")
+
+
+def load(mode, path):
+    if mode == "lists":
+        import csv
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [r for r in reader if r]
+    if mode == "record_store":
+        store = RecordStore(path)
+        store.refresh()
+        return store
+    return RecordTable.from_csv(path)
+
+
+def rows_of(mode, data):
+    return data.all_records() if mode == "record_store" else data
+
+
+def list_filter(rows, course, low):
+    return [r for r in rows if len(r) > 3 and r[2] == course and parse_marks(r[3]) >= low]
+
+
+def list_aggregates(rows):
+    aggs = {}
+    for r in rows:
+        if len(r) < 5:
+            continue
+        m = parse_marks(r[3])
+        a = aggs.get(r[0])
+        if a is None:
+            a = aggs[r[0]] = StudentAggregate(r[1])
+        a.count += 1
+        a.sum_marks += m
+        a.sum_points += grade_to_gpa_point(r[4])
+        a.min_marks = m if a.min_marks is None else min(a.min_marks, m)
+        a.max_marks = m if a.max_marks is None else max(a.max_marks, m)
+    return aggs
+
+
+def measure(mode, path):
+    """Runs in the child process; returns a result dict."""
+    tracemalloc.start()
+    t = time.perf_counter()
+    data = load(mode, path)
+    load_s = time.perf_counter() - t
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    course = synth.course_code(0)
+    if mode == "table":
+        from record_table import _np
+        _np()     # keep numpy's import time out of the filter timing
+
+    t = time.perf_counter()
+    if mode == "table":
+        hits = len(data.where(course=course, min_marks=75))
+    else:
+        hits = len(list_filter(rows_of(mode, data), course, 75))
+    filter_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    aggs = data.student_aggregates() if mode == "table" else list_aggregates(rows_of(mode, data))
+    aggregate_s = time.perf_counter() - t
+
+    rows = len(data)
+    return {"mode": mode, "rows": rows, "bytes": held, "bytes_per_row": round(held / max(rows, 1), 1),
+            "load_s": round(load_s, 3), "filter_s": round(filter_s, 4), "aggregate_s": round(aggregate_s, 4),
+            "filter_hits": hits, "students": len(aggs)}
+
+
+def run_child(mode, path):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, path],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100k,1m", help=f"comma list of {', '.join(SIZES)} or row counts")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--courses", type=int, default=6, help="courses per student")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results as JSON here")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return 0
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for m in modes:
+        if m not in MODES:
+            parser.error(f"unknown mode {m}")
+    results = []
+    print(f"{'size':<6} {'mode':<13} {'MiB':>9} {'B/row':>7} {'load s':>8} {'filter ms':>10} {'agg ms':>9}")
+    for label in (s.strip().lower() for s in args.sizes.split(",") if s.strip()):
+        rows = SIZES.get(label) or int(label)
+        base = tempfile.mkdtemp(prefix=f"benchmem_{label}_")
+        try:
+            path = synth.write_dataset(base, rows, args.courses, args.seed)["students"]
+            baseline = None
+            for mode in modes:
+                r = dict(run_child(mode, path), size=label)
+                results.append(r)
+                baseline = baseline or r["bytes"]
+                print(f"{label:<6} {mode:<13} {r['bytes'] / 2**20:9.1f} {r['bytes_per_row']:7.1f} {r['load_s']:8.2f} "
+                      f"{r['filter_s'] * 1000:10.1f} {r['aggregate_s'] * 1000:9.1f}"
+                      + (f"   ({baseline / r['bytes']:.1f}x smaller than {modes[0]})" if r["bytes"] < baseline else ""))
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"results": results}, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
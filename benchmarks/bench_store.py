@@ -0,0 +1,263 @@
+"""Headless benchmark suite for the grade store, from 1k to 10M grade records.
+
+For each size a deterministic dataset is generated (see synth.py) and the core
+operations are timed against each backend:
+
+  csv, csv-journal, sqlite  GradeTrackerApp's repositories (code.py):
+      cold_load, login, search_by_id, report_stats, all_students, upsert, delete
+  marks-sqlite, marks-mysql SAMPLE1.py's users/marks tables through db_pool:
+      db_login, db_page, db_student_marks, db_insert, db_delete
+
+upsert follows save_student_grade (course check, grade, upsert_record).
+Each op runs up to --repeat times or until --budget seconds have passed,
+whichever comes first. Results (mean/p50/p95/min/max in microseconds) are
+written as JSON; --compare prints the p50 ratio against an earlier run and
+flags slowdowns beyond --threshold.
+
+    python benchmarks/bench_store.py [--sizes 1k,10k,100k] [--backends csv,sqlite,marks-sqlite]
+                                     [--out bench_results.json] [--compare old.json]
+
+marks-mysql uses GRADE_DB_HOST/GRADE_DB_USER/GRADE_DB_PASSWORD/GRADE_DB_NAME
+(defaults as in SAMPLE1.py) and replaces the users/marks contents of that
+database, so point it at a scratch schema.
+"""
+import argparse, json, os, platform, random, shutil, statistics, subprocess, sys, tempfile, time
+
+import synth
+
+ROOT = synth.ROOT
+
+import grading
+from passwords import PBKDF2, verify_password
+from repository import CsvRepository, SqliteRepository
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+BACKENDS = ("csv", "csv-journal", "sqlite", "marks-sqlite", "marks-mysql")
+
+
+def stats(samples_ns):
+    us = sorted(s / 1000.0 for s in samples_ns)
+    return {"n": len(us), "mean_us": round(statistics.mean(us), 2), "p50_us": round(statistics.median(us), 2),
+            "p95_us": round(us[min(len(us) - 1, int(len(us) * 0.95))], 2),
+            "min_us": round(us[0], 2), "max_us": round(us[-1], 2)}
+
+
+def timed(fn, repeat, budget):
+    samples = []
+    start = time.perf_counter()
+    for i in range(repeat):
+        t = time.perf_counter_ns()
+        fn(i)
+        samples.append(time.perf_counter_ns() - t)
+        if i >= 2 and time.perf_counter() - start > budget:
+            break
+    return stats(samples)
+
+
+# ---------- GradeTrackerApp repositories ----------
+def open_repo(backend, d, paths):
+    # the synthetic users carry 1-iteration PBKDF2 hashes; matching settings keep login from re-hashing them
+    kw = {"password_scheme": PBKDF2, "password_cost": 1}
+    if backend == "sqlite":
+        return SqliteRepository(os.path.join(d, "grades.db"),
+                                migrate_from=(paths["users"], paths["courses"], paths["students"]), **kw)
+    return CsvRepository(paths["users"], paths["courses"], paths["students"], journal=backend == "csv-journal", **kw)
+
+
+def bench_repository(backend, d, paths, rows, args):
+    rng = random.Random(args.seed)
+    students, n_courses = synth.plan(rows, args.courses)
+    sids = [synth.student_id(rng.randrange(students)) for _ in range(args.repeat)]
+
+    t = time.perf_counter_ns()
+    repo = open_repo(backend, d, paths)
+    repo.records_for_id(sids[0])     # CSV parses lazily on first access
+    results = {"cold_load": stats([time.perf_counter_ns() - t])}
+
+    def login(i):
+        assert repo.verify_user(sids[i], synth.password_for(sids[i])) is not None
+
+    def report_stats(i):
+        recs = repo.records_for_id(sids[i])
+        grading.report_stats(recs, repo.student_aggregate(sids[i]))
+
+    def upsert(i):
+        # same steps as GradeTrackerApp.save_student_grade
+        course = synth.course_code(rng.randrange(n_courses))
+        marks = round(rng.uniform(0, 100), 2)
+        grade = grading.marks_to_grade(marks)
+        if repo.get_course(course) is not None:
+            repo.upsert_record([sids[i], "Bench Student", course, f"{marks:.2f}", grade])
+
+    victims = []
+
+    def delete(i):
+        sid, course = victims[i]
+        repo.delete_record(sid, course)
+
+    results["login"] = timed(login, args.repeat, args.budget)
+    results["search_by_id"] = timed(lambda i: repo.records_for_id(sids[i]), args.repeat, args.budget)
+    results["report_stats"] = timed(report_stats, args.repeat, args.budget)
+    results["all_students"] = timed(lambda i: repo.student_aggregates(), max(3, args.repeat // 10), args.budget)
+    results["upsert"] = timed(upsert, args.repeat, args.budget)
+    for sid in sids:
+        recs = repo.records_for_id(sid)
+        if recs:
+            victims.append((sid, recs[0][2]))
+    results["delete"] = timed(delete, len(victims), args.budget)
+    repo.close()
+    return results
+
+
+# ---------- SAMPLE1 marks tables ----------
+def open_marks_pool(backend, d):
+    if backend == "marks-sqlite":
+        from db_pool import SQLitePool
+        return SQLitePool(os.path.join(d, "marks.db"), size=2)
+    from db_pool import MySQLPool
+    return MySQLPool(size=2, host=os.environ.get("GRADE_DB_HOST", "localhost"),
+                     user=os.environ.get("GRADE_DB_USER", "root"),
+                     password=os.environ.get("GRADE_DB_PASSWORD", "root"),
+                     database=os.environ.get("GRADE_DB_NAME", "grade_system"))
+
+
+def bench_marks_db(backend, d, rows, args):
+    rng = random.Random(args.seed)
+    pool = open_marks_pool(backend, d)
+    students = synth.load_marks_db(pool, rows, args.courses, args.seed)
+    sids = [synth.student_id(rng.randrange(students)) for _ in range(args.repeat)]
+    with pool.cursor() as cur:
+        cur.execute("SELECT MAX(id) FROM marks")
+        max_id = cur.fetchone()[0] or 0
+
+    def db_login(i):
+        # as SAMPLE1's login: fetch the stored hash by username, verify in Python
+        with pool.cursor() as cur:
+            cur.execute("SELECT password, role FROM users WHERE username=%s", (sids[i],))
+            row = cur.fetchone()
+        assert row is not None and verify_password(synth.password_for(sids[i]), row[0])
+
+    def db_page(i):
+        with pool.cursor() as cur:
+            cur.execute("SELECT * FROM marks WHERE id > %s ORDER BY id ASC LIMIT %s", (rng.randrange(max_id + 1), 200))
+            cur.fetchall()
+
+    def db_student_marks(i):
+        with pool.cursor() as cur:
+            cur.execute("SELECT id, subject, marks FROM marks WHERE student=%s ORDER BY id ASC", (sids[i],))
+            cur.fetchall()
+
+    inserted = []
+
+    def db_insert(i):
+        with pool.cursor() as cur:
+            cur.execute("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)", (sids[i], "BENCH", 50))
+            inserted.append(cur.lastrowid)
+
+    def db_delete(i):
+        with pool.cursor() as cur:
+            cur.execute("DELETE FROM marks WHERE id=%s", (inserted[i],))
+
+    results = {
+        "db_login": timed(db_login, args.repeat, args.budget),
+        "db_page": timed(db_page, args.repeat, args.budget),
+        "db_student_marks": timed(db_student_marks, args.repeat, args.budget),
+        "db_insert": timed(db_insert, args.repeat, args.budget),
+    }
+    results["db_delete"] = timed(db_delete, len(inserted), args.budget)
+    pool.close()
+    return results
+
+
+# ---------- driver ----------
+def run_size(label, rows, args, out):
+    base = tempfile.mkdtemp(prefix=f"bench_{label}_")
+    try:
+        t = time.perf_counter()
+        paths = synth.write_dataset(os.path.join(base, "data"), rows, args.courses, args.seed)
+        print(f"[{label}] generated {rows} rows in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+        for backend in args.backends:
+            d = os.path.join(base, backend)
+            os.makedirs(d)
+            # every backend mutates its own copy of the data
+            own = {k: shutil.copy(p, d) for k, p in paths.items()}
+            t = time.perf_counter()
+            try:
+                if backend.startswith("marks-"):
+                    results = bench_marks_db(backend, d, rows, args)
+                else:
+                    results = bench_repository(backend, d, own, rows, args)
+            except Exception as exc:
+                print(f"[{label}] {backend}: skipped ({type(exc).__name__}: {exc})", file=sys.stderr)
+                continue
+            for op, s in results.items():
+                out.append(dict({"size": label, "rows": rows, "backend": backend, "op": op}, **s))
+                print(f"[{label}] {backend:<12} {op:<16} p50 {s['p50_us']:>12.1f} us  p95 {s['p95_us']:>12.1f} us  "
+                      f"(n={s['n']})", file=sys.stderr)
+            print(f"[{label}] {backend} done in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+    finally:
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+def meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {(r["size"], r["backend"], r["op"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"{'size':<6} {'backend':<13} {'op':<17} {'old p50':>12} {'new p50':>12}  ratio")
+    for r in results:
+        old = baseline.get((r["size"], r["backend"], r["op"]))
+        if old is None or not old["p50_us"]:
+            continue
+        ratio = r["p50_us"] / old["p50_us"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"{r['size']:<6} {r['backend']:<13} {r['op']:<17} {old['p50_us']:>12.1f} {r['p50_us']:>12.1f}  "
+              f"{ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,10k,100k", help=f"comma list of {', '.join(SIZES)} or row counts")
+    parser.add_argument("--backends", default="csv,csv-journal,sqlite,marks-sqlite",
+                        help=f"comma list of {', '.join(BACKENDS)}")
+    parser.add_argument("--courses", type=int, default=6, help="courses per student")
+    parser.add_argument("--repeat", type=int, default=200, help="max samples per op")
+    parser.add_argument("--budget", type=float, default=5.0, help="max seconds per op")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier JSON results to compare p50 against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio counted as a regression")
+    parser.add_argument("--keep", action="store_true", help="keep the generated data directories")
+    args = parser.parse_args(argv)
+    args.backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    for b in args.backends:
+        if b not in BACKENDS:
+            parser.error(f"unknown backend {b}")
+
+    results = []
+    for label in (s.strip().lower() for s in args.sizes.split(",") if s.strip()):
+        rows = SIZES.get(label) or int(label)
+        run_size(label, rows, args, results)
+
+    with open(args.out, "w") as f:
+        json.dump({"meta": meta(), "results": results}, f, indent=1)
+    print(f"wrote {len(results)} results to {args.out}", file=sys.stderr)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Page-switch latency of GradeTrackerApp: rebuild-per-navigation vs cached frames.
+
+"rebuild" drops every cached page frame before each navigation, which is the
+old destroy-and-rebuild behaviour. "cached" just raises the frame that was
+built on first show and refreshes its data-bound widgets. Each switch is timed
+through root.update() so geometry and redraw are included. Runs against empty
+data files in a temp directory, with synthetic backgrounds if PIL is present.
+Needs a display (use xvfb-run on a headless box).
+
+    python benchmarks/page_switch.py [--cycles 50]
+"""
+import argparse, importlib.util, os, statistics, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTE = ["admin_home", "courses", "admin_home", "add_grade", "admin_home",
+         "edit_delete", "admin_home", "report", "admin_home"]
+BACKGROUNDS = ["login_bg", "signup_bg", "admin_bg", "student_bg", "courses_bg", "report_bg"]
+
+
+def load_app_module():
+    # code.py shadows the stdlib "code" module, so load it by path under another name
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("grade_app", os.path.join(ROOT, "code.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def make_backgrounds():
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+    for i, name in enumerate(BACKGROUNDS):
+        Image.new("RGB", (1600, 1200), (40 * i % 255, 90, 160)).save(name + ".png")
+
+
+def run(app, cycles, rebuild):
+    times = []
+    for _ in range(cycles):
+        for name in ROUTE:
+            t = time.perf_counter()
+            if rebuild:
+                app.pages.forget()
+            app.pages.show(name)
+            app.root.update()
+            times.append((time.perf_counter() - t) * 1000.0)
+    return times
+
+
+def report(label, times):
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{label:<8} mean {statistics.mean(times):7.2f} ms   p50 {statistics.median(times):7.2f} ms   "
+          f"p95 {p95:7.2f} ms   ({len(times)} switches)")
+    return statistics.mean(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=50, help="passes over the navigation route per mode")
+    args = parser.parse_args(argv)
+
+    os.environ["GRADE_BG_WARMUP"] = "0"
+    os.environ["GRADE_BACKEND"] = "csv"
+    os.chdir(tempfile.mkdtemp(prefix="page_switch_"))
+    make_backgrounds()
+
+    app_mod = load_app_module()
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        print(f"no display available ({exc}); run under xvfb-run", file=sys.stderr)
+        return 2
+    app = app_mod.GradeTrackerApp(root)
+    app.current_user = {"username": "admin", "role": "admin"}
+    root.update()
+
+    # one untimed pass so image decoding and first-time Tk setup don't skew either mode
+    run(app, 1, rebuild=True)
+    before = report("rebuild", run(app, args.cycles, rebuild=True))
+    after = report("cached", run(app, args.cycles, rebuild=False))
+    print(f"speedup  {before / after:.1f}x")
+
+    app.tasks.shutdown()
+    app.repo.close()
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
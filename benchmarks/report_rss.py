@@ -0,0 +1,158 @@
+"""Open and close many student-report charts and check that RSS stays bounded.
+
+Each report is a charts.ReportChart in a window that is then destroyed,
+as show_student_report does. With a display the window is a real Toplevel.
+Without one (or with --headless) the chart gets an Agg canvas and a stand-in
+Toplevel that fires <Destroy> as Tk does, so the same release path runs.
+Every chart must have released its Figure once its window is gone. --pyplot
+runs the old plt.subplots()-without-close pattern for comparison; it is
+expected to fail the check. tests/test_report_chart.py runs both modes.
+
+    python benchmarks/report_rss.py [--reports 1000] [--max-growth-mb 25] [--headless] [--pyplot]
+"""
+import argparse, gc, os, random, resource, sys, types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import charts
+
+WARMUP = 50
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # peak RSS only, but still shows unbounded growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def sample_report(rng):
+    n = rng.randint(3, 8)
+    return [rng.uniform(30, 100) for _ in range(n)], [f"CS{100 + i}" for i in range(n)]
+
+
+def has_display():
+    return bool(os.environ.get("DISPLAY")) or sys.platform in ("win32", "darwin")
+
+
+# Each generator yields once per report, after its window is destroyed: the
+# ReportChart (which must have released its Figure by then), or None.
+def tk_reports(count, rng):
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+    for _ in range(count):
+        win = tk.Toplevel(root)
+        chart = charts.ReportChart(win)
+        chart.render(*sample_report(rng))
+        chart.widget.pack()
+        root.update()
+        win.destroy()
+        root.update()
+        yield chart
+    root.destroy()
+
+
+class _Toplevel:
+    """Just enough of a Tk Toplevel for ReportChart: destroy() fires the bound <Destroy> handlers."""
+
+    def __init__(self):
+        self._on_destroy = []
+
+    def winfo_toplevel(self):
+        return self
+
+    def bind(self, sequence, func, add=None):
+        if sequence == "<Destroy>":
+            self._on_destroy.append(func)
+
+    def destroy(self):
+        handlers, self._on_destroy = self._on_destroy, []
+        for func in handlers:
+            func(types.SimpleNamespace(widget=self))
+
+
+def _agg_canvas_class():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    class AggCanvas(FigureCanvasAgg):
+        def __init__(self, figure, master=None):
+            super().__init__(figure)
+
+        def get_tk_widget(self):
+            return None
+    return AggCanvas
+
+
+def headless_reports(count, rng):
+    canvas_class = _agg_canvas_class()
+    for _ in range(count):
+        win = _Toplevel()
+        chart = charts.ReportChart(win, canvas_class=canvas_class)
+        chart.render(*sample_report(rng))
+        win.destroy()
+        yield chart
+
+
+def pyplot_reports(count, rng):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    for _ in range(count):
+        fig, ax = plt.subplots(figsize=(5, 4))
+        marks, subjects = sample_report(rng)
+        ax.pie(marks, labels=subjects, autopct="%1.1f%%", startangle=90)
+        fig.canvas.draw()     # never closed, as show_student_report used to do
+        yield None
+
+
+def run(mode, count, seed=7, progress=None):
+    """Open and close count reports; returns (rss after warm-up MB, rss at the end MB, charts not released)."""
+    rng = random.Random(seed)
+    reports = {"tk": tk_reports, "headless": headless_reports, "pyplot": pyplot_reports}[mode](count, rng)
+    base = None
+    unreleased = 0
+    for i, chart in enumerate(reports, 1):
+        unreleased += chart is not None and chart.figure is not None
+        if i == WARMUP:
+            gc.collect()
+            base = rss_mb()
+        if progress is not None and i % 200 == 0:
+            progress(f"{mode}: {i:5d} reports  rss {rss_mb():7.1f} MB")
+    gc.collect()
+    end = rss_mb()
+    return (end if base is None else base), end, unreleased
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--max-growth-mb", type=float, default=25.0,
+                        help="allowed RSS growth between the end of warm-up and the last report")
+    parser.add_argument("--headless", action="store_true", help="Agg canvas even if a display is available")
+    parser.add_argument("--pyplot", action="store_true", help="legacy pyplot pattern (leaks)")
+    args = parser.parse_args(argv)
+
+    if args.pyplot:
+        mode = "pyplot"
+    elif args.headless or not has_display():
+        mode = "headless"
+    else:
+        mode = "tk"
+    base, end, unreleased = run(mode, args.reports, progress=print)
+    growth = end - base
+    print(f"{mode}: rss after warm-up {base:.1f} MB, after {args.reports} reports {end:.1f} MB "
+          f"(growth {growth:+.1f} MB, limit {args.max_growth_mb:.0f} MB)")
+    if growth > args.max_growth_mb or unreleased:
+        print("FAIL: report charts are not being released"
+              + (f" ({unreleased} still hold a Figure)" if unreleased else ""))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
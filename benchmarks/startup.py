@@ -0,0 +1,76 @@
+"""Cold-start import budget for the GUI module (code.py).
+
+Runs `python -X importtime` on a fresh interpreter that only imports code.py
+(no window is created), prints the slowest imports and exits non-zero if the
+total import time goes over the budget or if a module that must stay lazy
+(matplotlib, PIL) got imported at startup.
+
+    python benchmarks/startup.py [--budget-ms 250] [--runs 5]
+"""
+import argparse, os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "code.py")
+LAZY_MODULES = ("matplotlib", "PIL")
+
+# code.py shadows the stdlib "code" module, so load it by path under another name
+IMPORT_APP = (
+    "import importlib.util, sys; "
+    f"sys.path.insert(0, {ROOT!r}); "
+    f"spec = importlib.util.spec_from_file_location('grade_app', {APP!r}); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+
+def _importtime(code):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, raw_name = line.split(":", 1)[1].split("|")
+        # nested imports are indented two extra spaces per level
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        imports.append((raw_name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def measure():
+    # only count what code.py adds on top of a bare interpreter + importlib.util
+    baseline = {i[0] for i in _importtime("import importlib.util")}
+    return [i for i in _importtime(IMPORT_APP) if i[0] not in baseline]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--runs", type=int, default=5, help="best of N runs is compared to the budget")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    best = None
+    for _ in range(args.runs):
+        imports = measure()
+        total_ms = sum(i[1] for i in imports) / 1000.0
+        if best is None or total_ms < best[0]:
+            best = (total_ms, imports)
+    total_ms, imports = best
+
+    print(f"code.py import time: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for name, _, cumulative_us, depth in sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])[:args.top]:
+        print(f"  {cumulative_us / 1000.0:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({i[0] for i in imports if i[0].split(".")[0] in LAZY_MODULES})
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager[:5])}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: cold start {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Multi-process write stress test for the shared CSV store: no lost updates.
+
+--procs processes open the same students.csv (seeded by synth.py), wait at a
+barrier, then issue --ops writes each, as admins saving and deleting grades
+from separate copies of the app would:
+
+  insert   a new (ID, CourseCode) row owned by this process (CSV append)
+  update   re-grade one of its own rows (full CSV rewrite)
+  delete   remove one of its own rows (full CSV rewrite)
+  shared   upsert one of --hot rows that every process writes (last writer wins)
+
+Each process records the final state it expects for the rows it owns. At the
+end, the file is reloaded and checked:
+- every owned row is present with its last value, and deleted rows are gone;
+- every seed row is still there;
+- every hot row holds a value some process actually wrote.
+
+With --no-lock the stores skip FileLock and the version check, so the
+updates lost without them show up in the report.
+
+    python benchmarks/stress_concurrency.py [--procs 4] [--ops 200] [--rows 10k] [--journal [--compact-every N]]
+                                            [--no-lock]
+"""
+import argparse, json, multiprocessing, random, shutil, sys, tempfile, time
+
+import synth
+
+ROOT = synth.ROOT
+
+from grading import marks_to_grade
+from record_store import RecordStore
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+
+def worker(args):
+    n, path, ops, hot, journal, compact_every, locking, tries, seed, barrier = args
+    rnd = random.Random(seed * 1000 + n)
+    store = RecordStore(path, journal=journal, compact_every=compact_every, snapshot=False, locking=locking,
+                        optimistic_tries=tries)
+    store.refresh()
+    mine = {}           # (ID, CourseCode) -> marks this process expects, None once deleted
+    hot_writes = []
+    barrier.wait()
+    t = time.perf_counter()
+    for k in range(ops):
+        live = [key for key, m in mine.items() if m is not None]
+        roll = rnd.random()
+        if roll < 0.15 and live:
+            key = rnd.choice(live)
+            store.delete(*key)
+            mine[key] = None
+            continue
+        if roll < 0.40 and live:
+            key = rnd.choice(live)
+        elif roll < 0.55 and hot:
+            key = (f"HOT{rnd.randrange(hot):03d}", "C00000")
+        else:
+            key = (f"P{n:02d}-{k:06d}", "C00000")
+        marks = f"{rnd.uniform(0, 100):.2f}"
+        store.upsert([key[0], f"Writer {n}", key[1], marks, marks_to_grade(float(marks))])
+        if key[0].startswith("HOT"):
+            hot_writes.append((key, marks))
+        else:
+            mine[key] = marks
+    elapsed = time.perf_counter() - t
+    stats = store.lock_stats()
+    store.close()
+    return {"proc": n, "elapsed_s": elapsed, "mine": [[k[0], k[1], m] for k, m in mine.items()],
+            "hot": [[k[0], k[1], m] for k, m in hot_writes], "lock": stats}
+
+
+def check(path, journal, seed_keys, results):
+    rows = {(r[0], r[2]): r[3] for r in RecordStore(path, journal=journal, snapshot=False).all_records()}
+    lost = stale = resurrected = 0
+    for res in results:
+        for sid, course, marks in res["mine"]:
+            got = rows.get((sid, course))
+            if marks is None:
+                resurrected += got is not None
+            elif got is None:
+                lost += 1
+            elif got != marks:
+                stale += 1
+    hot_written = {}
+    for res in results:
+        for sid, course, marks in res["hot"]:
+            hot_written.setdefault((sid, course), set()).add(marks)
+    hot_bad = sum(rows.get(key) not in values for key, values in hot_written.items())
+    seed_lost = sum(key not in rows for key in seed_keys)
+    return {"lost": lost, "stale": stale, "resurrected": resurrected, "hot_bad": hot_bad,
+            "seed_lost": seed_lost, "rows": len(rows)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=200, help="writes per process")
+    parser.add_argument("--rows", default="10k", help=f"seed rows: {', '.join(SIZES)} or a count")
+    parser.add_argument("--hot", type=int, default=5, help="rows every process writes")
+    parser.add_argument("--journal", action="store_true", help="journal mode (GRADE_JOURNAL=1)")
+    parser.add_argument("--compact-every", type=int, default=1000,
+                        help="journal entries per process before it compacts (small values race compactions)")
+    parser.add_argument("--no-lock", action="store_true", help="disable FileLock to show lost updates")
+    parser.add_argument("--optimistic-tries", type=int, default=RecordStore.OPTIMISTIC_TRIES,
+                        help="optimistic attempts before a write holds the lock throughout")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    base = tempfile.mkdtemp(prefix="stress_")
+    try:
+        rows = SIZES.get(args.rows.lower()) or int(args.rows)
+        path = synth.write_dataset(base, rows, 6, args.seed)["students"]
+        seed = RecordStore(path, snapshot=False, locking=False)
+        seed_keys = [(r[0], r[2]) for r in seed.all_records()]
+        del seed
+
+        ctx = multiprocessing.get_context("spawn")     # fresh interpreters, like separate app instances
+        barrier = ctx.Manager().Barrier(args.procs)
+        jobs = [(n, path, args.ops, args.hot, args.journal, args.compact_every, not args.no_lock,
+                 args.optimistic_tries, args.seed, barrier) for n in range(args.procs)]
+        t = time.perf_counter()
+        with ctx.Pool(args.procs) as pool:
+            results = pool.map(worker, jobs)
+        wall = time.perf_counter() - t
+        report = check(path, args.journal, seed_keys, results)
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    total = args.procs * args.ops
+    report.update(procs=args.procs, ops=total, journal=args.journal, locking=not args.no_lock,
+                  optimistic_tries=args.optimistic_tries,
+                  wall_s=round(wall, 2), ops_per_s=round(total / max(r["elapsed_s"] for r in results), 1))
+    locks = [r["lock"] for r in results if r["lock"]]
+    if locks:
+        report.update(conflicts=sum(l["conflicts"] for l in locks),
+                      contended=sum(l["contended"] for l in locks),
+                      lock_wait_s=round(sum(l["wait_s"] for l in locks), 3))
+    print(json.dumps(report, indent=1))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+    broken = report["lost"] + report["stale"] + report["resurrected"] + report["hot_bad"] + report["seed_lost"]
+    print("OK: no lost updates" if not broken else f"FAILED: {broken} rows wrong", file=sys.stderr)
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
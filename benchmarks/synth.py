@@ -0,0 +1,142 @@
+"""Deterministic synthetic data for the grade store benchmarks.
+
+Writes students.csv / courses.csv / users.csv in the GradeTrackerApp layout
+(ROWS grade records = ROWS // COURSES students x COURSES courses each), and
+can fill SAMPLE1's users/marks tables through any DBPool (SQLite or MySQL).
+The same seed always produces the same files.
+
+User passwords are "pw-<username>" hashed with single-iteration PBKDF2, so
+generating a million users stays fast; the benchmarks time lookups, not the
+hash cost.
+
+    python benchmarks/synth.py <out_dir> [--rows 100000] [--courses 6] [--seed 1]
+"""
+import argparse, csv, os, random, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from grading import DEFAULT_SCHEME
+from passwords import PBKDF2, hash_password
+from record_store import HEADER
+from repository import COURSE_HEADER, USER_HEADER
+
+FIRST = ["Asha", "Ben", "Chen", "Divya", "Eli", "Farah", "Gopal", "Hana", "Ivan", "Jia",
+         "Kofi", "Lena", "Mateo", "Nia", "Omar", "Priya", "Quinn", "Ravi", "Sara", "Tomas"]
+LAST = ["Kumar", "Smith", "Wang", "Iyer", "Garcia", "Okafor", "Rossi", "Sato", "Novak", "Haddad"]
+SUBJECTS = ["Algebra", "Physics", "Data Structures", "Chemistry", "Databases", "Networks",
+            "Statistics", "Operating Systems", "Economics", "Biology", "Compilers", "Graphics"]
+
+
+def student_id(i):
+    return f"S{i:08d}"
+
+
+def course_code(i):
+    return f"C{i:05d}"
+
+
+def password_for(username):
+    return f"pw-{username}"
+
+
+def plan(rows, courses_per_student):
+    students = max(1, rows // courses_per_student)
+    # a catalog a few times wider than each student's load, like a real department
+    n_courses = max(courses_per_student * 4, 24)
+    return students, n_courses
+
+
+def grade_rows(rows, courses_per_student=6, seed=1):
+    """Yield [ID, Name, CourseCode, Marks, Grade] rows in student order."""
+    rng = random.Random(seed)
+    students, n_courses = plan(rows, courses_per_student)
+    for i in range(students):
+        sid = student_id(i)
+        name = f"{FIRST[rng.randrange(len(FIRST))]} {LAST[rng.randrange(len(LAST))]}"
+        for c in rng.sample(range(n_courses), courses_per_student):
+            marks = round(rng.uniform(20.0, 100.0), 2)
+            yield [sid, name, course_code(c), f"{marks:.2f}", DEFAULT_SCHEME.grade(marks)]
+
+
+def write_dataset(out_dir, rows, courses_per_student=6, seed=1):
+    """Write students.csv, courses.csv and users.csv; returns their paths as a dict."""
+    os.makedirs(out_dir, exist_ok=True)
+    students, n_courses = plan(rows, courses_per_student)
+    paths = {k: os.path.join(out_dir, k + ".csv") for k in ("students", "courses", "users")}
+
+    with open(paths["courses"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(COURSE_HEADER)
+        for c in range(n_courses):
+            w.writerow([course_code(c), f"{SUBJECTS[c % len(SUBJECTS)]} {c // len(SUBJECTS) + 1}"])
+
+    with open(paths["students"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        w.writerows(grade_rows(rows, courses_per_student, seed))
+
+    with open(paths["users"], "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(USER_HEADER)
+        w.writerow(["admin", hash_password("admin", PBKDF2, 1), "admin"])
+        for i in range(students):
+            sid = student_id(i)
+            w.writerow([sid, hash_password(password_for(sid), PBKDF2, 1), "student"])
+    return paths
+
+
+def load_marks_db(pool, rows, courses_per_student=6, seed=1, chunk=10000):
+    """Fill SAMPLE1's users and marks tables (student = the student's username)."""
+    students, _ = plan(rows, courses_per_student)
+    with pool.cursor() as cur:
+        cur.execute("DELETE FROM marks")
+        cur.execute("DELETE FROM users")
+        cur.execute("INSERT INTO users (username, password, role) VALUES (%s, %s, %s)",
+                    ("admin", hash_password("admin", PBKDF2, 1), "admin"))
+    batch = []
+    for i in range(students):
+        sid = student_id(i)
+        batch.append((sid, hash_password(password_for(sid), PBKDF2, 1), "student"))
+        if len(batch) >= chunk:
+            with pool.cursor() as cur:
+                cur.executemany("INSERT INTO users (username, password, role) VALUES (%s, %s, %s)", batch)
+            batch = []
+    if batch:
+        with pool.cursor() as cur:
+            cur.executemany("INSERT INTO users (username, password, role) VALUES (%s, %s, %s)", batch)
+    batch = []
+    for r in grade_rows(rows, courses_per_student, seed):
+        # SAMPLE1 keeps whole-number marks
+        batch.append((r[0], r[2], int(float(r[3]))))
+        if len(batch) >= chunk:
+            with pool.cursor() as cur:
+                cur.executemany("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)", batch)
+            batch = []
+    if batch:
+        with pool.cursor() as cur:
+            cur.executemany("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)", batch)
+    return students
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--rows", type=int, default=100000, help="grade records in students.csv")
+    parser.add_argument("--courses", type=int, default=6, help="courses per student")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--marks-db", help="also write SAMPLE1's users/marks tables to this SQLite file")
+    args = parser.parse_args(argv)
+    paths = write_dataset(args.out_dir, args.rows, args.courses, args.seed)
+    if args.marks_db:
+        from db_pool import SQLitePool
+        pool = SQLitePool(args.marks_db, size=1)
+        load_marks_db(pool, args.rows, args.courses, args.seed)
+        pool.close()
+    for p in paths.values():
+        print(p)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
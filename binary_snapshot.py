@@ -0,0 +1,305 @@
+"""Binary snapshot of students.csv, opened with mmap instead of parsed.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header   MAGIC, u32 sig_len, u32 reserved, u64 rows, sig (repr of the CSV's stat signature)
+    pools    ids, names, courses, grades, marks text: u64 count, u64 blob_len, u64 offsets[count + 1], utf-8 blob
+    columns  i32 id[rows], i32 name[rows], i32 course[rows], f32 marks[rows], u8 grade[rows],
+             i32 marks_text[rows], u8 width[rows]
+    indexes  i32 id_rows[rows], u64 id_start[ids + 1], u64 name_start[names + 1], i32 name_rows[name_start[-1]]
+
+The id pool is sorted, so an ID (or ID prefix) is found by binary search
+over the mapped strings, and id_rows lists row numbers grouped by ID code
+(file order within a group): the rows of code c are
+id_rows[id_start[c]:id_start[c + 1]]. Names are sorted case-insensitively
+with the same kind of index; rows with no Name field are left out of it,
+as RecordStore leaves them out of its name index. The Marks text and each
+row's field count are stored as well, so a mapped row is the same list the
+parsed CSV gives. Opening a snapshot reads only the header;
+everything else is paged in by the OS as lookups touch it.
+
+A snapshot records the signature of the CSV (and journal) it was written
+from; open_snapshot() returns None when that no longer matches, and callers
+fall back to parsing the CSV.
+"""
+import mmap, os, struct
+from array import array
+
+MAGIC = b"GRSNAP02"
+_HEAD = struct.Struct("<8sIIQ")
+_MISSING = "\x00"     # grade of a row shorter than five columns
+
+
+def _pad(n):
+    return (-n) % 8
+
+
+# ---------- writing ----------
+def write_snapshot(path, table, sig):
+    """Write a RecordTable as a binary snapshot tagged with sig; atomic via a temp file.
+
+    Returns False, writing nothing, if a row has more than five fields.
+    Deleted slots are left out.
+    """
+    if table.extra:
+        return False
+    if table.dead:
+        table = table.copy()
+    n = len(table)
+    id_map, ids = _sorted_pool(table.ids.values, key=None)
+    name_map, names = _sorted_pool(table.names.values, key=lambda s: (s.lower(), s))
+    course_map, courses = _sorted_pool(table.courses.values, key=None)
+    grades = [_MISSING if g is None else g for g in table.grades.values]
+
+    id_col = array("i", (id_map[c] for c in table.id_col))
+    name_col = array("i", (name_map[c] for c in table.name_col))
+    course_col = array("i", (course_map[c] for c in table.course_col))
+    id_rows, id_start = _group(id_col, len(ids))
+    # case-insensitive groups: every spelling of a name maps to its first (lower-cased) slot
+    lower_first = {}
+    name_group = array("i", (lower_first.setdefault(s.lower(), i) for i, s in enumerate(names)))
+    grouped = array("i", (name_group[c] if w > 1 else -1 for c, w in zip(name_col, table.width)))
+    name_rows, name_start = _group(grouped, len(names))
+
+    sig_b = repr(sig).encode()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(MAGIC, len(sig_b), 0, n))
+        f.write(sig_b + b"\0" * _pad(len(sig_b)))
+        for pool in (ids, names, courses, grades, table.marks_text.values):
+            _write_pool(f, pool)
+        for col in (id_col, name_col, course_col, table.marks, table.grade_col, table.marks_col, table.width,
+                    id_rows, id_start, name_start, name_rows):
+            col.tofile(f)
+            f.write(b"\0" * _pad(len(col) * col.itemsize))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return True
+
+
+def _sorted_pool(values, key):
+    order = sorted(range(len(values)), key=(lambda c: values[c]) if key is None else (lambda c: key(values[c])))
+    remap = [0] * len(values)
+    for new, old in enumerate(order):
+        remap[old] = new
+    return remap, [values[c] for c in order]
+
+
+def _group(codes, ngroups):
+    # counting sort of row numbers by code: stable, so each group stays in file order;
+    # rows with code -1 belong to no group
+    start = array("Q", bytes(8 * (ngroups + 1)))
+    for c in codes:
+        if c >= 0:
+            start[c + 1] += 1
+    for c in range(ngroups):
+        start[c + 1] += start[c]
+    fill = array("Q", start)
+    rows = array("i", bytes(4 * start[ngroups]))
+    for i, c in enumerate(codes):
+        if c >= 0:
+            rows[fill[c]] = i
+            fill[c] += 1
+    return rows, start
+
+
+def _write_pool(f, values):
+    blob = bytearray()
+    offsets = array("Q", [0])
+    for v in values:
+        blob += v.encode()
+        offsets.append(len(blob))
+    f.write(struct.pack("<QQ", len(values), len(blob)))
+    offsets.tofile(f)
+    f.write(blob)
+    f.write(b"\0" * _pad(len(blob)))
+
+
+# ---------- reading ----------
+class _Pool:
+    """A mapped string pool: strings are decoded on access and memoised."""
+
+    def __init__(self, buf, pos):
+        self.count, blob_len = struct.unpack_from("<QQ", buf, pos)
+        pos += 16
+        self.offsets = buf[pos:pos + 8 * (self.count + 1)].cast("Q")
+        pos += 8 * (self.count + 1)
+        self.blob = buf[pos:pos + blob_len]
+        self.end = pos + blob_len + _pad(blob_len)
+        self._cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, code):
+        s = self._cache.get(code)
+        if s is None:
+            s = self._cache[code] = str(self.blob[self.offsets[code]:self.offsets[code + 1]], "utf-8")
+        return s
+
+    def bisect(self, value, key=None):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            v = self[mid] if key is None else key(self[mid])
+            if v < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def release(self):
+        self.offsets.release()
+        self.blob.release()
+
+
+class MappedTable:
+    """Read-only view of a snapshot file; rows come back exactly as the CSV had them."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._buf = memoryview(self._mm)
+        magic, sig_len, _, self.rows = _HEAD.unpack_from(buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a grade snapshot")
+        pos = _HEAD.size
+        self.sig = str(buf[pos:pos + sig_len], "utf-8")
+        pos += sig_len + _pad(sig_len)
+        self.ids = _Pool(buf, pos)
+        self.names = _Pool(buf, self.ids.end)
+        self.courses = _Pool(buf, self.names.end)
+        self.grades = _Pool(buf, self.courses.end)
+        self.marks_text = _Pool(buf, self.grades.end)
+        pos = self.marks_text.end
+        self._views = [self.ids, self.names, self.courses, self.grades, self.marks_text]
+
+        def column(fmt, count):
+            nonlocal pos
+            size = struct.calcsize(fmt) * count
+            view = buf[pos:pos + size].cast(fmt)
+            pos += size + _pad(size)
+            self._views.append(view)
+            return view
+
+        n = self.rows
+        self.id_col, self.name_col, self.course_col = column("i", n), column("i", n), column("i", n)
+        self.marks, self.grade_col = column("f", n), column("B", n)
+        self.marks_col, self.width = column("i", n), column("B", n)
+        self.id_rows, self.id_start = column("i", n), column("Q", len(self.ids) + 1)
+        self.name_start = column("Q", len(self.names) + 1)
+        self.name_rows = column("i", self.name_start[-1])
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        for v in getattr(self, "_views", ()):
+            v.release()
+        self._views = []
+        if getattr(self, "_buf", None) is not None:
+            self._buf.release()
+            self._buf = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass     # a search generator still holds a slice; the map goes when it does
+        self._file.close()
+
+    def column(self, name):
+        """Zero-copy numpy view of a column (id_col, name_col, course_col, marks, grade_col)."""
+        import numpy
+        view = getattr(self, name)
+        return numpy.frombuffer(view, dtype={"i": numpy.int32, "f": numpy.float32, "B": numpy.uint8}[view.format])
+
+    # ---------- rows ----------
+    def row(self, i):
+        width = self.width[i]
+        row = [self.ids[self.id_col[i]], self.names[self.name_col[i]], self.courses[self.course_col[i]],
+               self.marks_text[self.marks_col[i]]][:width]
+        if width > 4:
+            row.append(self.grades[self.grade_col[i]])
+        return row
+
+    def all_records(self):
+        return [self.row(i) for i in range(self.rows)]
+
+    def _id_code(self, sid):
+        c = self.ids.bisect(sid)
+        return c if c < len(self.ids) and self.ids[c] == sid else None
+
+    def _rows_of_ids(self, lo, hi):
+        return self.id_rows[self.id_start[lo]:self.id_start[hi]]
+
+    def records_for_id(self, sid):
+        c = self._id_code(sid)
+        return [] if c is None else [self.row(i) for i in self._rows_of_ids(c, c + 1)]
+
+    def records_for_name(self, name):
+        wanted = (name or "").lower()
+        c = self.names.bisect(wanted, key=str.lower)
+        if c >= len(self.names) or self.names[c].lower() != wanted:
+            return []
+        return [self.row(i) for i in self.name_rows[self.name_start[c]:self.name_start[c + 1]]]
+
+    def get(self, sid, course):
+        for r in self.records_for_id(sid):
+            if (r[2] if len(r) > 2 else "") == course:
+                return r
+        return None
+
+    def search(self, text, mode="prefix", chunk=2000):
+        """Same contract as RecordStore.search, answered from the mapped indexes."""
+        text = (text or "").strip()
+        if mode == "id":
+            yield self.records_for_id(text)
+            return
+        if mode == "name":
+            needle = text.lower()
+            lo = self.names.bisect(needle, key=str.lower)
+            hi = len(self.names)
+            c = lo
+            while c < hi:
+                part = []
+                while c < hi and len(part) < chunk:
+                    lowered = self.names[c].lower()
+                    if not lowered.startswith(needle):
+                        hi = c
+                        break
+                    part.extend(self.name_rows[self.name_start[c]:self.name_start[c + 1]])
+                    c += 1
+                yield [self.row(i) for i in part]
+            return
+        if mode == "prefix":
+            lo = self.ids.bisect(text)
+            hi = self.ids.bisect(text[:-1] + chr(ord(text[-1]) + 1)) if text else len(self.ids)
+            for c in range(lo, hi, chunk):
+                yield [self.row(i) for i in self._rows_of_ids(c, min(c + chunk, hi))]
+            return
+        if mode == "substring":
+            needle = text.lower()
+            for c0 in range(0, len(self.ids), chunk):
+                found = []
+                for c in range(c0, min(c0 + chunk, len(self.ids))):
+                    rows = self._rows_of_ids(c, c + 1)
+                    if needle in self.ids[c].lower() or any(needle in self.names[self.name_col[i]].lower()
+                                                            for i in rows):
+                        found.extend(self.row(i) for i in rows)
+                yield found
+            return
+        raise ValueError(f"unknown search mode {mode!r}")
+
+
+def open_snapshot(path, sig):
+    """The snapshot at path if it was written for sig, else None."""
+    try:
+        table = MappedTable(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if table.sig != repr(sig):
+        table.close()
+        return None
+    return table
@@ -0,0 +1,161 @@
+import csv, math, os
+from grading import DEFAULT_SCHEME
+
+GRADE_COLUMNS = ["ID", "Name", "CourseCode", "Marks"]
+DB_COLUMNS = ["Student", "Subject", "Marks"]
+REJECT_HEADER = ["Line", "Reason", "Row"]
+
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.reject_file = None
+
+    def summary(self):
+        text = (f"Read {self.read} rows: {self.inserted} added, {self.updated} updated, "
+                f"{self.rejected} rejected.")
+        if self.rejected:
+            text += f"\nRejected rows written to {self.reject_file}"
+        return text
+
+
+def _column_map(header, columns):
+    # map the expected columns to positions, accepting any order/case in the header
+    names = [h.strip().lower() for h in header]
+    if all(c.lower() in names for c in columns):
+        return [names.index(c.lower()) for c in columns], True
+    return list(range(len(columns))), False
+
+
+def _stream(path, columns):
+    # yields (line_no, raw_row, fields) without loading the whole file; fields
+    # holds the expected columns in order, or None if the row is too short
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        idx, has_header = _column_map(header, columns)
+        need = max(idx)
+        if not has_header:
+            # no header row: the first line is data
+            yield 1, header, ([header[i].strip() for i in idx] if len(header) > need else None)
+        for r in reader:
+            if not r:
+                continue
+            yield reader.line_num, r, ([r[i].strip() for i in idx] if len(r) > need else None)
+
+
+def _batches(rows, size):
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Rejects:
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+        self._w = None
+
+    def add(self, line, reason, row, result):
+        if self._f is None:
+            self._f = open(self.path, "w", newline="")
+            self._w = csv.writer(self._f)
+            self._w.writerow(REJECT_HEADER)
+        self._w.writerow([line, reason] + list(row))
+        result.rejected += 1
+        result.reject_file = self.path
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+
+def _validated_grade_rows(src, courses, rejects, result, batch_size, scheme):
+    """Validate rows against the course set and grade each batch in one vectorized call."""
+    def checked():
+        for line, raw, fields in _stream(src, GRADE_COLUMNS):
+            result.read += 1
+            if fields is None:
+                rejects.add(line, "missing columns", raw, result)
+                continue
+            sid, name, course, marks_raw = fields
+            course = course.upper()
+            if not (sid and name and course and marks_raw):
+                rejects.add(line, "empty field", raw, result)
+                continue
+            if course not in courses:
+                rejects.add(line, f"unknown course {course}", raw, result)
+                continue
+            try:
+                marks = float(marks_raw)
+            except ValueError:
+                marks = math.nan
+            if not math.isfinite(marks):
+                rejects.add(line, "marks not numeric", raw, result)
+                continue
+            yield sid, name, course, marks
+
+    for batch in _batches(checked(), batch_size):
+        grades = scheme.grade_array([b[3] for b in batch]).tolist()
+        for (sid, name, course, marks), grade in zip(batch, grades):
+            yield [sid, name, course, f"{marks:.2f}", grade]
+
+
+def import_grades(src, repo, reject_file=None, batch_size=10000, scheme=DEFAULT_SCHEME):
+    """Bulk-load ID,Name,CourseCode,Marks rows from src into a GradeTrackerApp repository.
+
+    Rows are validated against the course catalog held in memory and graded a
+    batch at a time. CSV storage is rewritten with a single atomic file swap;
+    SQLite writes go through executemany in chunked transactions. Rejected
+    rows land in reject_file (default: <src>.rejects.csv) with the reason.
+    """
+    result = ImportResult()
+    courses = repo.course_catalog()
+    rejects = _Rejects(reject_file or os.path.splitext(src)[0] + ".rejects.csv")
+    try:
+        rows = _validated_grade_rows(src, courses, rejects, result, batch_size, scheme)
+        result.inserted, result.updated = repo.bulk_upsert_records(rows, chunk_size=batch_size)
+    finally:
+        rejects.close()
+    return result
+
+
+def import_marks_db(src, pool, reject_file=None, chunk_size=5000):
+    """Bulk-load Student,Subject,Marks rows into SAMPLE1's marks table.
+
+    Each chunk is one executemany INSERT committed as its own transaction.
+    """
+    result = ImportResult()
+    rejects = _Rejects(reject_file or os.path.splitext(src)[0] + ".rejects.csv")
+
+    def checked():
+        for line, raw, fields in _stream(src, DB_COLUMNS):
+            result.read += 1
+            if fields is None:
+                rejects.add(line, "missing columns", raw, result)
+                continue
+            student, subject, marks = fields
+            # same rule as the Add Marks form
+            if not (student and subject and marks.isdigit()):
+                rejects.add(line, "invalid field", raw, result)
+                continue
+            yield student, subject, int(marks)
+
+    try:
+        for chunk in _batches(checked(), chunk_size):
+            with pool.cursor() as cursor:
+                cursor.executemany("INSERT INTO marks (student, subject, marks) VALUES (%s, %s, %s)", chunk)
+            result.inserted += len(chunk)
+    finally:
+        rejects.close()
+    return result
@@ -0,0 +1,54 @@
+def _mpl():
+    # matplotlib stays out of startup; the Figure API is imported with the first chart
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
+
+
+def marks_pie(ax, marks, subjects):
+    ax.pie(marks if marks else [1], labels=subjects, autopct="%1.1f%%", startangle=90)
+    ax.set_title("Subject-wise Marks Distribution")
+
+
+def draw_marks_pie(fig, marks, subjects):
+    """Draw the subject-wise marks pie into fig, replacing whatever it held."""
+    fig.clear()
+    ax = fig.add_subplot()
+    marks_pie(ax, marks, subjects)
+    return ax
+
+
+class ReportChart:
+    """Marks pie for one report window, drawn on a plain Figure (no pyplot state).
+
+    pyplot keeps every figure it creates alive until plt.close(), so a long
+    session leaked one figure per report. Here the window owns its Figure:
+    render() redraws into it and the figure is released when the window's
+    Toplevel is destroyed.
+    """
+
+    def __init__(self, master, figsize=(5, 4), canvas_class=None):
+        Figure, FigureCanvasTkAgg = _mpl()
+        self.figure = Figure(figsize=figsize)
+        # canvas_class(figure, master=...) stands in for FigureCanvasTkAgg where there is no
+        # display (see benchmarks/report_rss.py); it needs a get_tk_widget() as well
+        self.canvas = (canvas_class or FigureCanvasTkAgg)(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self._top = master.winfo_toplevel()
+        self._top.bind("<Destroy>", self._on_destroy, add="+")
+
+    def render(self, marks, subjects):
+        draw_marks_pie(self.figure, marks, subjects)
+        self.canvas.draw()
+
+    def _on_destroy(self, event):
+        # <Destroy> on a Toplevel also fires for each of its children
+        if event.widget is self._top:
+            self.release()
+
+    def release(self):
+        if self.figure is not None:
+            self.figure.clear()
+            self.figure = None
+            self.canvas = None
+            self.widget = None
@@ -1,68 +1,83 @@
+import argparse
 import tkinter as tk
-from tkinter import messagebox, ttk
-import csv, os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-
-# ----- File names -----
-USER_FILE = "users.csv"
-COURSE_FILE = "courses.csv"
-STUDENT_FILE = "students.csv"
+from tkinter import filedialog, messagebox, ttk
+import os
+from repository import open_repository
+from paged_tree import PagedTreeview, list_pager
+from tasks import TaskRunner
+from image_cache import BackgroundCache, read_bg_list
+from pages import PageManager
+from charts import ReportChart
+from course_picker import CoursePicker
+from search_view import SearchResults, SEARCH_MODES
+import grading
+import bulk_import
+import instrument, profiling
+from diagnostics import DiagnosticsPanel
+from settings import (USER_FILE, COURSE_FILE, STUDENT_FILE, SQLITE_FILE,
+                      STORAGE_BACKEND, USE_JOURNAL, BG_CACHE_DIR, BG_WARMUP,
+                      PASSWORD_SCHEME, PASSWORD_COST, METRICS_ENABLED, METRICS_FILE,
+                      PROFILE_ENABLED, PROFILE_DIR, LOAD_WORKERS)
 
 class GradeTrackerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Grade Tracking System")
         self.root.geometry("1000x750")
-        self.bg_cache = {}
+        # resized backgrounds are reused across navigations instead of decoded per page
+        self.bg_cache = BackgroundCache((1000, 750), cache_dir=BG_CACHE_DIR)
         self.current_user = None
 
+        self.repo = open_repository(STORAGE_BACKEND, USER_FILE, COURSE_FILE, STUDENT_FILE,
+                                    SQLITE_FILE, journal=USE_JOURNAL,
+                                    password_scheme=PASSWORD_SCHEME, password_cost=PASSWORD_COST,
+                                    load_workers=LOAD_WORKERS)
+        # all repo calls from handlers go through self.tasks so file/DB I/O never
+        # blocks the Tk mainloop; widgets are only touched in the on_done callbacks
+        self.tasks = TaskRunner(self.root)
+        # every page frame is built once and raised on navigation; only its
+        # data-bound widgets are refreshed when it is shown again
+        self.pages = PageManager(self.root)
+        for name, build in (("login", self.build_login_page), ("signup", self.build_signup_page),
+                            ("admin_home", self.build_admin_home), ("student_home", self.build_student_home),
+                            ("courses", self.build_courses_page), ("add_grade", self.build_add_grade_page),
+                            ("edit_delete", self.build_edit_delete_page), ("report", self.build_report_page)):
+            self.pages.register(name, build)
+        # F12 opens the live latency/IO panel; GRADE_METRICS=1 records from startup
+        instrument.enable(METRICS_ENABLED)
+        self.diagnostics = DiagnosticsPanel(self.root)
+        self.root.bind_all("<F12>", lambda e: self.diagnostics.toggle())
+        self.root.bind_all("<F11>", lambda e: self.diagnostics.profile_viewer.toggle())
         self.ensure_files()
         self.create_login_page()
+        if BG_WARMUP:
+            # resize the other pages' backgrounds off the mainloop; PhotoImages are built in on_done
+            self.tasks.submit(self.bg_cache.prepare_many, read_bg_list("bgdata.txt"),
+                              on_done=self.bg_cache.load_prepared, on_error=lambda e: None)
 
     # ---------- background helper ----------
     def set_background(self, window, image_file):
         if not os.path.exists(image_file):
             return
-        img = Image.open(image_file)
-        img = img.resize((1000, 750))
-        bg = ImageTk.PhotoImage(img)
-        self.bg_cache[image_file] = bg
+        bg = self.bg_cache.photo(image_file)
         label = tk.Label(window, image=bg)
+        label.image = bg     # cached pages keep their picture even if the LRU drops it
         label.place(x=0, y=0, relwidth=1, relheight=1)
         label.lower()
 
     # ---------- file initialization ----------
     def ensure_files(self):
-        # ensure users file with header exists
-        if not os.path.exists(USER_FILE):
-            with open(USER_FILE, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Username", "Password", "Role"])
-                writer.writerow(["admin", "admin", "admin"])
-        else:
-            # if exists but empty, write header
-            if os.path.getsize(USER_FILE) == 0:
-                with open(USER_FILE, "w", newline="") as f:
-                    csv.writer(f).writerow(["Username", "Password", "Role"])
-                    csv.writer(f).writerow(["admin", "admin", "admin"])
-
-        if not os.path.exists(COURSE_FILE):
-            with open(COURSE_FILE, "w", newline="") as f:
-                csv.writer(f).writerow(["CourseCode", "CourseName"])
-
-        if not os.path.exists(STUDENT_FILE):
-            with open(STUDENT_FILE, "w", newline="") as f:
-                csv.writer(f).writerow(["ID", "Name", "CourseCode", "Marks", "Grade"])
+        self.repo.ensure_storage()
 
     # ---------- login/signup pages ----------
+    @instrument.timed
     def create_login_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "login_bg.png")
+        self.pages.show("login")
+
+    def build_login_page(self, page):
+        self.set_background(page, "login_bg.png")
 
-        frame = tk.Frame(self.root, bg="white", padx=30, pady=30)
+        frame = tk.Frame(page, bg="white", padx=30, pady=30)
         frame.place(relx=0.5, rely=0.5, anchor="center")
 
         tk.Label(frame, text="College Grade Tracking System", font=("Arial", 24, "bold"), bg="white").pack(pady=10)
@@ -81,12 +96,20 @@ class GradeTrackerApp:
         tk.Button(frame, text="Sign Up", font=("Arial", 12), width=14,
                   command=self.create_signup_page).pack()
 
+        def refresh():
+            self.login_username.delete(0, tk.END)
+            self.login_password.delete(0, tk.END)
+            self.login_username.focus_set()
+        return refresh
+
+    @instrument.timed
     def create_signup_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "signup_bg.png")
+        self.pages.show("signup")
+
+    def build_signup_page(self, page):
+        self.set_background(page, "signup_bg.png")
 
-        frame = tk.Frame(self.root, bg="white", padx=30, pady=30)
+        frame = tk.Frame(page, bg="white", padx=30, pady=30)
         frame.place(relx=0.5, rely=0.5, anchor="center")
 
         tk.Label(frame, text="Create New Account", font=("Arial", 22, "bold"), bg="white").pack(pady=10)
@@ -102,39 +125,13 @@ class GradeTrackerApp:
         tk.Button(frame, text="Register", font=("Arial", 12, "bold"), width=14, command=self.register_user).pack(pady=10)
         tk.Button(frame, text="Back to Login", font=("Arial", 12), width=14, command=self.create_login_page).pack()
 
-    # ---------- safely read users.csv (handles header/no-header) ----------
-    def _read_users(self):
-        users = []
-        # prefer DictReader but fallback to reader
-        try:
-            with open(USER_FILE, "r", newline="") as f:
-                f.seek(0)
-                rdr = csv.DictReader(f)
-                # if DictReader has fieldnames and includes Username/Password
-                if rdr.fieldnames and "Username" in rdr.fieldnames and "Password" in rdr.fieldnames:
-                    for r in rdr:
-                        if r and r.get("Username"):
-                            users.append({"username": r.get("Username"), "password": r.get("Password"), "role": r.get("Role")})
-                    return users
-        except Exception:
-            pass
-
-        # fallback: plain reader, assume columns in order Username,Password,Role
-        try:
-            with open(USER_FILE, "r", newline="") as f:
-                rdr = csv.reader(f)
-                for r in rdr:
-                    if not r:
-                        continue
-                    # ignore header row if it looks like header
-                    if r[0].strip().lower() in ("username", "user", "uname"):
-                        continue
-                    if len(r) >= 3:
-                        users.append({"username": r[0], "password": r[1], "role": r[2]})
-            return users
-        except Exception:
-            return []
+        def refresh():
+            for e in (self.signup_username, self.signup_password, self.signup_role):
+                e.delete(0, tk.END)
+            self.signup_username.focus_set()
+        return refresh
 
+    @instrument.timed
     def login_user(self):
         uname = (self.login_username.get() or "").strip()
         pwd = (self.login_password.get() or "").strip()
@@ -142,9 +139,8 @@ class GradeTrackerApp:
             messagebox.showerror("Login failed", "Enter username and password.")
             return
 
-        users = self._read_users()
-        for u in users:
-            if u["username"] == uname and u["password"] == pwd:
+        def done(u):
+            if u is not None:
                 self.current_user = {"username": uname, "role": (u.get("role") or "student")}
                 role = self.current_user["role"].lower()
                 if role == "admin":
@@ -152,9 +148,12 @@ class GradeTrackerApp:
                 else:
                     self.create_student_home()
                 return
+            messagebox.showerror("Login failed", "Invalid username or password.")
 
-        messagebox.showerror("Login failed", "Invalid username or password.")
+        # the password hash is checked on a worker so its cost never freezes the login screen
+        self.tasks.submit(self.repo.verify_user, uname, pwd, on_done=done, key="login")
 
+    @instrument.timed
     def register_user(self):
         uname = (self.signup_username.get() or "").strip()
         pwd = (self.signup_password.get() or "").strip()
@@ -163,26 +162,27 @@ class GradeTrackerApp:
             messagebox.showerror("Error", "Enter username, password and role (admin or student).")
             return
 
-        users = self._read_users()
-        for u in users:
-            if u["username"] == uname:
+        def done(created):
+            if not created:
                 messagebox.showerror("Error", "Username already exists.")
                 return
+            messagebox.showinfo("Success", "Account created. You can log in.")
+            self.create_login_page()
 
-        with open(USER_FILE, "a", newline="") as f:
-            csv.writer(f).writerow([uname, pwd, role])
-        messagebox.showinfo("Success", "Account created. You can log in.")
-        self.create_login_page()
+        # add_user checks for the name under the file lock, so two copies of the app cannot both create it
+        self.tasks.submit(self.repo.add_user, uname, pwd, role, on_done=done, key="register")
 
     # ---------- admin / student homes ----------
+    @instrument.timed
     def create_admin_home(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "admin_bg.png")
+        self.pages.show("admin_home")
 
-        tk.Label(self.root, text=f"Admin Dashboard ( {self.current_user['username']} )",
-                 font=("Arial", 22, "bold"), bg="white").pack(pady=12)
-        btn_frame = tk.Frame(self.root, bg="white")
+    def build_admin_home(self, page):
+        self.set_background(page, "admin_bg.png")
+
+        title = tk.Label(page, font=("Arial", 22, "bold"), bg="white")
+        title.pack(pady=12)
+        btn_frame = tk.Frame(page, bg="white")
         btn_frame.place(relx=0.5, rely=0.55, anchor="center")
 
         tk.Button(btn_frame, text="Manage Courses", width=28, font=("Arial", 13), command=self.manage_courses_page).grid(row=0, column=0, pady=6)
@@ -190,33 +190,47 @@ class GradeTrackerApp:
         tk.Button(btn_frame, text="Edit / Delete Student Records", width=28, font=("Arial", 13), command=self.edit_delete_page).grid(row=2, column=0, pady=6)
         tk.Button(btn_frame, text="Generate Student Report (by ID)", width=28, font=("Arial", 13), command=self.generate_report_page).grid(row=3, column=0, pady=6)
         tk.Button(btn_frame, text="All Students Report (table)", width=28, font=("Arial", 13), command=self.all_students_report).grid(row=4, column=0, pady=6)
-        tk.Button(btn_frame, text="Logout", width=28, font=("Arial", 13), command=self.logout).grid(row=5, column=0, pady=6)
+        tk.Button(btn_frame, text="Import Marks (CSV)", width=28, font=("Arial", 13), command=self.import_grades_file).grid(row=5, column=0, pady=6)
+        tk.Button(btn_frame, text="Logout", width=28, font=("Arial", 13), command=self.logout).grid(row=6, column=0, pady=6)
+
+        def refresh():
+            title.config(text=f"Admin Dashboard ( {self.current_user['username']} )")
+        return refresh
 
+    @instrument.timed
     def create_student_home(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "student_bg.png")
+        self.pages.show("student_home")
+
+    def build_student_home(self, page):
+        self.set_background(page, "student_bg.png")
 
-        tk.Label(self.root, text=f"Student Dashboard ( {self.current_user['username']} )",
-                 font=("Arial", 22, "bold"), bg="white").pack(pady=12)
-        frame = tk.Frame(self.root, bg="white")
+        title = tk.Label(page, font=("Arial", 22, "bold"), bg="white")
+        title.pack(pady=12)
+        frame = tk.Frame(page, bg="white")
         frame.place(relx=0.5, rely=0.55, anchor="center")
 
         tk.Button(frame, text="View My Performance Report", width=28, font=("Arial", 13), command=self.student_view_own_report).pack(pady=8)
         tk.Button(frame, text="Logout", width=28, font=("Arial", 13), command=self.logout).pack(pady=8)
 
+        def refresh():
+            title.config(text=f"Student Dashboard ( {self.current_user['username']} )")
+        return refresh
+
+    @instrument.timed
     def logout(self):
         self.current_user = None
         self.create_login_page()
 
     # ---------- course mgmt ----------
+    @instrument.timed
     def manage_courses_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "courses_bg.png")
+        self.pages.show("courses")
+
+    def build_courses_page(self, page):
+        self.set_background(page, "courses_bg.png")
 
-        tk.Label(self.root, text="Manage Courses", font=("Arial", 20, "bold"), bg="white").pack(pady=8)
-        frame = tk.Frame(self.root, bg="white")
+        tk.Label(page, text="Manage Courses", font=("Arial", 20, "bold"), bg="white").pack(pady=8)
+        frame = tk.Frame(page, bg="white")
         frame.place(relx=0.5, rely=0.55, anchor="center")
 
         tk.Label(frame, text="Course Code", font=("Arial", 12), bg="white").grid(row=0, column=0, padx=6, pady=4)
@@ -227,29 +241,35 @@ class GradeTrackerApp:
         self.course_name_e = tk.Entry(frame, width=35, font=("Arial", 12))
         self.course_name_e.grid(row=1, column=1, padx=6, pady=4)
 
-        btn_frame = tk.Frame(self.root, bg="white")
+        btn_frame = tk.Frame(page, bg="white")
         btn_frame.pack(pady=6)
         
         # existing courses list
-        list_frame = tk.Frame(self.root, bg="white")
+        list_frame = tk.Frame(page, bg="white")
         list_frame.place(relx=0.5, rely=0.25, anchor="n")
         tk.Label(list_frame, text="Existing courses:", font=("Arial", 12, "bold"), bg="white").pack(anchor="w")
         courses_box = tk.Text(list_frame, height=8, width=80, font=("Arial", 11))
         courses_box.pack(pady=6)
-        courses_box.config(state="normal")
-        courses_box.delete("1.0", tk.END)
-        with open(COURSE_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            for r in reader:
-                if r:
-                    courses_box.insert(tk.END, f"{r[0]}  -  {r[1]}\n")
         courses_box.config(state="disabled")
-        
+
+        def show_courses(catalog):
+            courses_box.config(state="normal")
+            courses_box.delete("1.0", tk.END)
+            # one insert for the whole list; per-line inserts crawl with thousands of courses
+            courses_box.insert(tk.END, "".join(f"{code}  -  {name}\n" for code, name in catalog.courses))
+            courses_box.config(state="disabled")
+
         tk.Button(btn_frame, text="Add Course", font=("Arial", 12), command=self.add_course).grid(row=2, column=0, padx=6,pady=8)
         tk.Button(btn_frame, text="Back", font=("Arial", 12), command=self.create_admin_home).grid(row=2, column=1, padx=6,pady=8)
 
+        def refresh():
+            self.course_code_e.delete(0, tk.END)
+            self.course_name_e.delete(0, tk.END)
+            self.tasks.submit(self.repo.course_catalog, on_done=show_courses, key="courses")
+        return refresh
 
+
+    @instrument.timed
     def add_course(self):
         code = (self.course_code_e.get() or "").strip().upper()
         name = (self.course_name_e.get() or "").strip()
@@ -257,30 +277,26 @@ class GradeTrackerApp:
             messagebox.showerror("Input error", "Enter both course code and name.")
             return
 
-        # check duplicates
-        with open(COURSE_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            for r in reader:
-                if r and r[0] == code:
-                    messagebox.showerror("Duplicate", "Course code already exists.")
-                    return
-
-        with open(COURSE_FILE, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([code, name])
+        def done(added):
+            if not added:
+                messagebox.showerror("Duplicate", "Course code already exists.")
+                return
+            messagebox.showinfo("Success", f"Course {code} added.")
+            self.manage_courses_page()
 
-        messagebox.showinfo("Success", f"Course {code} added.")
-        self.manage_courses_page()
+        # add_course rejects a duplicate code itself
+        self.tasks.submit(self.repo.add_course, code, name, on_done=done, key="add_course")
 
     # ---------- add/update student grade ----------
+    @instrument.timed
     def add_student_grade_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "report_bg.png")
+        self.pages.show("add_grade")
+
+    def build_add_grade_page(self, page):
+        self.set_background(page, "report_bg.png")
 
-        tk.Label(self.root, text="Add / Update Student Grade", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
-        frame = tk.Frame(self.root, bg="white")
+        tk.Label(page, text="Add / Update Student Grade", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
+        frame = tk.Frame(page, bg="white")
         frame.place(relx=0.5, rely=0.55, anchor="center")
 
         tk.Label(frame, text="Student ID", font=("Arial", 12), bg="white").grid(row=0, column=0, padx=6, pady=4)
@@ -292,18 +308,27 @@ class GradeTrackerApp:
         self.as_name.grid(row=1, column=1, padx=6, pady=4)
 
         tk.Label(frame, text="Course Code", font=("Arial", 12), bg="white").grid(row=2, column=0, padx=6, pady=4)
-        self.as_course = tk.Entry(frame, font=("Arial", 12))
+        # suggests codes/names from the cached course catalog as the user types
+        self.as_course = CoursePicker(frame, font=("Arial", 12), width=18)
         self.as_course.grid(row=2, column=1, padx=6, pady=4)
 
         tk.Label(frame, text="Marks", font=("Arial", 12), bg="white").grid(row=3, column=0, padx=6, pady=4)
         self.as_marks = tk.Entry(frame, font=("Arial", 12))
         self.as_marks.grid(row=3, column=1, padx=6, pady=4)
 
-        btn_frame = tk.Frame(self.root, bg="white")
+        btn_frame = tk.Frame(page, bg="white")
         btn_frame.pack(pady=8)
         tk.Button(btn_frame, text="Save / Update", font=("Arial", 12), command=self.save_student_grade).grid(row=0, column=0, padx=6)
         tk.Button(btn_frame, text="Back", font=("Arial", 12), command=self.create_admin_home).grid(row=0, column=1, padx=6)
 
+        def refresh():
+            for e in (self.as_sid, self.as_name, self.as_marks):
+                e.delete(0, tk.END)
+            self.as_course.clear()
+            self.tasks.submit(self.repo.course_catalog, on_done=self.as_course.set_catalog, key="catalog")
+        return refresh
+
+    @instrument.timed
     def save_student_grade(self):
         sid = (self.as_sid.get() or "").strip()
         name = (self.as_name.get() or "").strip()
@@ -313,19 +338,6 @@ class GradeTrackerApp:
             messagebox.showerror("Input error", "All fields required.")
             return
 
-        # validate course exists
-        course_exists = False
-        with open(COURSE_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            for r in reader:
-                if r and len(r) >= 1 and r[0] == course:
-                    course_exists = True
-                    break
-        if not course_exists:
-            messagebox.showerror("Course missing", "Course code not found. Add it first.")
-            return
-
         try:
             marks = float(marks_raw)
         except ValueError:
@@ -334,68 +346,107 @@ class GradeTrackerApp:
 
         grade = self.marks_to_grade(marks)
 
-        # Read all records and update if student+course exists, else append
-        rows = []
-        updated = False
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            rows = list(reader)
-
-        # ensure header exists
-        if not rows:
-            rows = [["ID", "Name", "CourseCode", "Marks", "Grade"]]
-
-        for i, row in enumerate(rows):
-            if i == 0:
-                continue
-            if row and len(row) >= 3 and row[0] == sid and row[2] == course:
-                rows[i] = [sid, name, course, f"{marks:.2f}", grade]
-                updated = True
-
-        if updated:
-            with open(STUDENT_FILE, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerows(rows)
-            messagebox.showinfo("Updated", f"Updated marks for {sid} - {course}.")
-        else:
-            with open(STUDENT_FILE, "a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([sid, name, course, f"{marks:.2f}", grade])
-            messagebox.showinfo("Saved", f"Saved record for {sid} - {course}.")
-
-        # clear inputs
-        self.as_sid.delete(0, tk.END)
-        self.as_name.delete(0, tk.END)
-        self.as_course.delete(0, tk.END)
-        self.as_marks.delete(0, tk.END)
+        def save():
+            # validate course exists
+            if self.repo.get_course(course) is None:
+                return None
+            # update if student+course exists, else append
+            return self.repo.upsert_record([sid, name, course, f"{marks:.2f}", grade])
+
+        def done(updated):
+            if updated is None:
+                messagebox.showerror("Course missing", "Course code not found. Add it first.")
+                return
+            if updated:
+                messagebox.showinfo("Updated", f"Updated marks for {sid} - {course}.")
+            else:
+                messagebox.showinfo("Saved", f"Saved record for {sid} - {course}.")
+
+            # clear inputs
+            self.as_sid.delete(0, tk.END)
+            self.as_name.delete(0, tk.END)
+            self.as_course.clear()
+            self.as_marks.delete(0, tk.END)
+
+        # a second click on Save for the same record replaces the queued write
+        self.tasks.submit(save, on_done=done, key=("record", sid, course))
+
+    # ---------- bulk import ----------
+    @instrument.timed
+    def import_grades_file(self):
+        # expects columns ID, Name, CourseCode, Marks; grades are computed
+        path = filedialog.askopenfilename(title="Import marks", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        self.tasks.submit(bulk_import.import_grades, path, self.repo,
+                          on_done=lambda res: messagebox.showinfo("Import finished", res.summary()), key="import")
 
     # ---------- edit/delete student records ----------
+    @instrument.timed
     def edit_delete_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "report_bg.png")
+        self.pages.show("edit_delete")
 
-        tk.Label(self.root, text="Edit / Delete Student Records", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
-        frame = tk.Frame(self.root, bg="white")
-        frame.place(relx=0.5, rely=0.55, anchor="center")
+    def build_edit_delete_page(self, page):
+        self.set_background(page, "report_bg.png")
 
-        tk.Label(frame, text="Enter Student ID", font=("Arial", 12), bg="white").grid(row=0, column=0, padx=6, pady=4)
+        tk.Label(page, text="Edit / Delete Student Records", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
+        frame = tk.Frame(page, bg="white")
+        frame.place(relx=0.5, rely=0.2, anchor="center")
+
+        tk.Label(frame, text="Search", font=("Arial", 12), bg="white").grid(row=0, column=0, padx=6, pady=4)
         self.ed_search_id = tk.Entry(frame, font=("Arial", 12))
         self.ed_search_id.grid(row=0, column=1, padx=6, pady=4)
-        tk.Button(frame, text="Search", font=("Arial", 12), command=self.search_student_records).grid(row=0, column=2, padx=6)
+        self.ed_mode = tk.StringVar(value=SEARCH_MODES[0][0])
+        ttk.Combobox(frame, textvariable=self.ed_mode, values=[m[0] for m in SEARCH_MODES], state="readonly",
+                     width=18).grid(row=0, column=2, padx=6)
+        tk.Button(frame, text="Search", font=("Arial", 12), command=self.search_student_records).grid(row=0, column=3, padx=6)
         tk.Button(frame, text="Back", font=("Arial", 12), command=self.create_admin_home).grid(row=1, column=1, pady=8)
 
+        # matches stream in while typing; double-click a row to edit that student's records
+        results = tk.Frame(page, bg="white")
+        results.place(relx=0.5, rely=0.62, anchor="center", relwidth=0.85, relheight=0.6)
+        cols = ("ID", "Name", "CourseCode", "Marks", "Grade")
+        self.ed_results = SearchResults(results, self.repo.search_records, self.tasks, columns=cols,
+                                        show="headings", to_values=lambda r: (r + [""] * 5)[:5])
+        for col in cols:
+            self.ed_results.heading(col, text=col)
+            self.ed_results.column(col, width=120, anchor="center")
+        tk.Label(results, textvariable=self.ed_results.status, anchor="w", bg="white").pack(side="bottom", fill="x")
+        self.ed_results.scrollbar.pack(side="right", fill="y")
+        self.ed_results.pack(side="left", fill="both", expand=True)
+        self.ed_results.watch(self.ed_search_id, self.ed_mode)
+        self.ed_results.bind("<Double-1>", lambda e: self.open_selected_student())
+        self.ed_mode.trace_add("write", lambda *_: self.ed_results.run())
+
+        def refresh():
+            self.ed_search_id.delete(0, tk.END)
+            self.ed_results.clear()
+        return refresh
+
+    @instrument.timed
     def search_student_records(self):
         sid = (self.ed_search_id.get() or "").strip()
         if not sid:
             messagebox.showerror("Input error", "Enter student ID.")
             return
+        self.ed_results.run(sid)
+        if self.ed_results.mode() in ("prefix", "id"):
+            # an exact ID still opens its records straight away, as before
+            self.tasks.submit(self.repo.records_for_id, sid,
+                              on_done=lambda records: records and self.show_search_results(sid, records),
+                              key="search")
+
+    @instrument.timed
+    def open_selected_student(self):
+        row = self.ed_results.selected_row()
+        if row is None:
+            return
+        sid = row[0]
+        self.tasks.submit(self.repo.records_for_id, sid,
+                          on_done=lambda records: self.show_search_results(sid, records), key="search")
 
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            records = [r for r in reader if r and len(r) >= 1 and r[0] == sid]
-
+    @instrument.timed
+    def show_search_results(self, sid, records):
         if not records:
             messagebox.showerror("Not found", "No records for this student ID.")
             return
@@ -413,6 +464,7 @@ class GradeTrackerApp:
             tk.Button(frame, text="Edit", command=lambda r=rec, w=win: self.open_edit_marks_window(r, w)).pack(side="right", padx=6)
             tk.Button(frame, text="Delete", command=lambda r=rec, w=win: self.delete_course_record(r, w)).pack(side="right", padx=6)
 
+    @instrument.timed
     def open_edit_marks_window(self, record, parent_win):
         # record: [ID, Name, CourseCode, Marks, Grade]
         ew = tk.Toplevel(parent_win)
@@ -423,6 +475,7 @@ class GradeTrackerApp:
         new_marks_e.pack(pady=6)
         new_marks_e.insert(0, record[3] if len(record) > 3 else "")
 
+        @instrument.timed
         def save_edit():
             val = new_marks_e.get().strip()
             try:
@@ -431,92 +484,125 @@ class GradeTrackerApp:
                 messagebox.showerror("Input error", "Enter numeric marks.")
                 return
             new_grade = self.marks_to_grade(nm)
-            # read all and update
-            with open(STUDENT_FILE, "r", newline="") as f:
-                rows = list(csv.reader(f))
-            for i, r in enumerate(rows):
-                if i == 0:
-                    continue
-                if r and len(r) >= 3 and r[0] == record[0] and r[2] == record[2]:
+
+            def update():
+                current = self.repo.get_record(record[0], record[2])
+                if current is not None:
                     # ensure row has 5 cols
-                    while len(r) < 5:
-                        r.append("")
-                    rows[i][3] = f"{nm:.2f}"
-                    rows[i][4] = new_grade
-            with open(STUDENT_FILE, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerows(rows)
-            messagebox.showinfo("Saved", "Marks updated.")
-            ew.destroy()
-            parent_win.destroy()
+                    r = list(current) + [""] * (5 - len(current))
+                    r[3] = f"{nm:.2f}"
+                    r[4] = new_grade
+                    self.repo.upsert_record(r)
+
+            def done(_):
+                messagebox.showinfo("Saved", "Marks updated.")
+                ew.destroy()
+                parent_win.destroy()
+
+            self.tasks.submit(update, on_done=done, key=("record", record[0], record[2]))
 
         tk.Button(ew, text="Save", font=("Arial", 12), command=save_edit).pack(pady=6)
 
+    @instrument.timed
     def delete_course_record(self, record, parent_win):
-        with open(STUDENT_FILE, "r", newline="") as f:
-            rows = list(csv.reader(f))
-        new_rows = [r for r in rows if not (r and len(r) >= 3 and r[0] == record[0] and r[2] == record[2])]
-        with open(STUDENT_FILE, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerows(new_rows)
-        messagebox.showinfo("Deleted", f"Deleted {record[2]} for {record[0]}.")
-        parent_win.destroy()
+        def done(_):
+            messagebox.showinfo("Deleted", f"Deleted {record[2]} for {record[0]}.")
+            parent_win.destroy()
+
+        self.tasks.submit(self.repo.delete_record, record[0], record[2], on_done=done,
+                          key=("record", record[0], record[2]))
 
     # ---------- reports ----------
+    @instrument.timed
     def generate_report_page(self):
-        for w in self.root.winfo_children():
-            w.destroy()
-        self.set_background(self.root, "report_bg.png")
+        self.pages.show("report")
+
+    def build_report_page(self, page):
+        self.set_background(page, "report_bg.png")
 
-        tk.Label(self.root, text="Generate Student Report (by ID)", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
-        frame = tk.Frame(self.root, bg="white")
+        tk.Label(page, text="Generate Student Report (by ID)", font=("Arial", 18, "bold"), bg="white").pack(pady=8)
+        frame = tk.Frame(page, bg="white")
         frame.place(relx=0.5, rely=0.55, anchor="center")
 
         tk.Label(frame, text="Student ID", font=("Arial", 12), bg="white").grid(row=0, column=0, padx=6)
         self.rp_student_id = tk.Entry(frame, font=("Arial", 12))
         self.rp_student_id.grid(row=0, column=1, padx=6)
-        tk.Button(frame, text="Generate", font=("Arial", 12), command=self.generate_student_report_by_id).grid(row=0, column=2, padx=6)
-        tk.Button(self.root, text="Back", font=("Arial", 12), command=self.create_admin_home).pack(pady=8)
+        self.rp_mode = tk.StringVar(value=SEARCH_MODES[0][0])
+        ttk.Combobox(frame, textvariable=self.rp_mode, values=[m[0] for m in SEARCH_MODES], state="readonly",
+                     width=18).grid(row=0, column=2, padx=6)
+        tk.Button(frame, text="Generate", font=("Arial", 12), command=self.generate_student_report_by_id).grid(row=0, column=3, padx=6)
+        tk.Button(page, text="Back", font=("Arial", 12), command=self.create_admin_home).pack(pady=8)
+
+        # one line per matching student, filled as you type; double-click to report on it
+        results = tk.Frame(page, bg="white")
+        results.place(relx=0.5, rely=0.8, anchor="center", relwidth=0.6, relheight=0.3)
+        self.rp_results = SearchResults(results, self.repo.search_records, self.tasks, columns=("ID", "Name"),
+                                        show="headings", to_values=lambda r: (r[0], r[1] if len(r) > 1 else ""),
+                                        unique=lambda r: r[0])
+        for col in ("ID", "Name"):
+            self.rp_results.heading(col, text=col)
+        tk.Label(results, textvariable=self.rp_results.status, anchor="w", bg="white").pack(side="bottom", fill="x")
+        self.rp_results.scrollbar.pack(side="right", fill="y")
+        self.rp_results.pack(side="left", fill="both", expand=True)
+        self.rp_results.watch(self.rp_student_id, self.rp_mode)
+        self.rp_results.bind("<Double-1>", lambda e: self.report_selected_student())
+        self.rp_mode.trace_add("write", lambda *_: self.rp_results.run())
+
+        def refresh():
+            self.rp_student_id.delete(0, tk.END)
+            self.rp_results.clear()
+        return refresh
+
+    @instrument.timed
+    def report_selected_student(self):
+        row = self.rp_results.selected_row()
+        if row is None:
+            return
+        self.rp_student_id.delete(0, tk.END)
+        self.rp_student_id.insert(0, row[0])
+        self.generate_student_report_by_id()
 
+    @instrument.timed
     def generate_student_report_by_id(self):
         sid = (self.rp_student_id.get() or "").strip()
         if not sid:
             messagebox.showerror("Input", "Enter student ID.")
             return
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            recs = [r for r in reader if r and len(r) >= 1 and r[0] == sid]
-        if not recs:
-            messagebox.showerror("Not found", "No records for this ID.")
-            return
-        self.show_student_report(recs)
+        def find():
+            return self.repo.records_for_id(sid), self.repo.student_aggregate(sid)
+
+        def done(found):
+            recs, agg = found
+            if not recs:
+                messagebox.showerror("Not found", "No records for this ID.")
+                return
+            self.show_student_report(recs, agg)
+
+        self.tasks.submit(find, on_done=done, key="report")
 
+    @instrument.timed
     def student_view_own_report(self):
         sid_or_name = (self.current_user.get("username") or "").strip()
-        # try to find by ID first, then by Name
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            recs_by_id = [r for r in reader if r and len(r) >=1 and r[0] == sid_or_name]
-            f.seek(0); next(reader, None)  # reset and skip header used above (we re-open instead)
-        if recs_by_id:
-            self.show_student_report(recs_by_id)
-            return
 
-        # fallback: search by Name (case-insensitive)
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            recs_by_name = [r for r in reader if r and len(r) >=2 and r[1].lower() == sid_or_name.lower()]
-        if recs_by_name:
-            self.show_student_report(recs_by_name)
-            return
+        def find():
+            # try to find by ID first, then by Name (case-insensitive)
+            recs = self.repo.records_for_id(sid_or_name)
+            if recs:
+                return recs, self.repo.student_aggregate(sid_or_name)
+            return self.repo.records_for_name(sid_or_name), None
+
+        def done(found):
+            recs, agg = found
+            if recs:
+                self.show_student_report(recs, agg)
+                return
+            messagebox.showerror("No records", "No records found for your ID or name.")
 
-        messagebox.showerror("No records", "No records found for your ID or name.")
+        self.tasks.submit(find, on_done=done, key="report")
 
-    def show_student_report(self, recs):
-        # recs: list of [ID, Name, CourseCode, Marks, Grade]
+    @instrument.timed
+    def show_student_report(self, recs, agg=None):
+        # recs: list of [ID, Name, CourseCode, Marks, Grade]; agg: the student's StudentAggregate, if known
         win = tk.Toplevel(self.root)
         win.title(f"Performance Report - {recs[0][1] if len(recs[0])>1 else recs[0][0]} ({recs[0][0]})")
         win.geometry("850x700")
@@ -533,23 +619,7 @@ class GradeTrackerApp:
             grade = r[4] if len(r) > 4 else "F"
             tk.Label(list_frame, text=f"{course}  |  Marks: {marks}  |  Grade: {grade}", anchor="w").pack(anchor="w")
 
-        # marks and grades arrays (guarded)
-        marks = []
-        grades = []
-        for r in recs:
-            try:
-                marks.append(float(r[3]))
-            except Exception:
-                marks.append(0.0)
-            try:
-                grades.append(r[4])
-            except Exception:
-                grades.append("F")
-
-        avg_marks = sum(marks) / len(marks) if marks else 0.0
-        highest = max(marks) if marks else 0.0
-        lowest = min(marks) if marks else 0.0
-        gpa = self.compute_gpa_for_records(recs)
+        marks, avg_marks, highest, lowest, gpa = grading.report_stats(recs, agg)
 
         stats_frame = tk.Frame(win)
         stats_frame.pack(pady=8)
@@ -559,52 +629,43 @@ class GradeTrackerApp:
         tk.Label(stats_frame, text=f"GPA: {gpa:.2f}", font=("Arial", 12, "bold")).grid(row=1, column=0, padx=8, pady=4)
 
         subjects = [r[2] if len(r)>2 else "(unknown)" for r in recs]
-        fig, ax = plt.subplots(figsize=(5, 4))
-        ax.pie(marks if marks else [1], labels=subjects, autopct="%1.1f%%", startangle=90)
-        ax.set_title("Subject-wise Marks Distribution")
-        canvas = FigureCanvasTkAgg(fig, master=win)
-        canvas.draw()
-        canvas.get_tk_widget().pack(pady=10)
+        # the window owns its Figure (no pyplot), and frees it when closed
+        chart = ReportChart(win, figsize=(5, 4))
+        chart.render(marks, subjects)
+        chart.widget.pack(pady=10)
 
         tk.Button(win, text="Close", font=("Arial", 12), command=win.destroy).pack(pady=6)
 
     # ---------- all students report (table) ----------
+    @instrument.timed
     def all_students_report(self):
-        # aggregate per student
-        students = {}
-        with open(STUDENT_FILE, "r", newline="") as f:
-            reader = csv.reader(f)
-            header = next(reader, None)
-            for r in reader:
-                if not r or len(r) < 5:
-                    continue
-                sid, name, course, marks_s, grade = r[0], r[1], r[2], r[3], r[4]
-                try:
-                    marks = float(marks_s)
-                except:
-                    marks = 0.0
-                if sid not in students:
-                    students[sid] = {"name": name, "marks": [], "grades": []}
-                students[sid]["marks"].append(marks)
-                students[sid]["grades"].append(grade)
+        # per-student totals are maintained by the repository on every write
+        self.tasks.submit(self.repo.student_aggregates, on_done=self.show_all_students_report, key="all_students")
 
+    @instrument.timed
+    def show_all_students_report(self, students):
         win = tk.Toplevel(self.root)
         win.title("All Students Report")
         win.geometry("900x600")
         win.configure(bg='#032036')
         tk.Label(win, text="All Students Report",bg='#032036',fg='white',font=("Arial", 16, "bold")).pack(pady=8)
 
+        # rows are only built and inserted a page at a time as the table is scrolled
+        def to_values(item):
+            sid, agg = item
+            return (sid, agg.name, agg.count, f"{agg.avg_marks:.2f}", f"{agg.gpa:.2f}")
+
         cols = ("Student ID", "Name", "Courses Count", "Avg Marks", "GPA")
-        tree = ttk.Treeview(win, columns=cols, show="headings", height=18)
+        table_frame = tk.Frame(win)
+        table_frame.pack(pady=8, fill="both", expand=True)
+        tree = PagedTreeview(table_frame, list_pager(list(students.items()), to_values),
+                             columns=cols, show="headings", height=18)
         for c in cols:
             tree.heading(c, text=c)
             tree.column(c, width=160, anchor="center")
-        tree.pack(pady=8, fill="both", expand=True)
-
-        for sid, info in students.items():
-            avg_marks = sum(info["marks"]) / len(info["marks"]) if info["marks"] else 0.0
-            gpa = self.compute_gpa_for_grade_list(info["grades"])
-            tree.insert("", tk.END, values=(sid, info["name"], len(info["marks"]), f"{avg_marks:.2f}", f"{gpa:.2f}"))
+        tree.scrollbar.pack(side="right", fill="y")
+        tree.pack(side="left", fill="both", expand=True)
+        tree.reload()
 
         btnf = tk.Frame(win)
         btnf.pack(pady=8)
@@ -612,46 +673,33 @@ class GradeTrackerApp:
 
     # ---------- grading & gpa helpers ----------
     def marks_to_grade(self, marks: float) -> str:
-        if marks >= 90:
-            return "S"
-        elif marks >= 80:
-            return "A"
-        elif marks >= 70:
-            return "B"
-        elif marks >= 60:
-            return "C"
-        elif marks >= 50:
-            return "D"
-        else:
-            return "F"
+        return grading.marks_to_grade(marks)
 
     def grade_to_gpa_point(self, grade: str) -> float:
-        mapping = {"S": 5.0, "A": 4.0, "B": 3.0, "C": 2.0, "D": 1.0, "F": 0.0}
-        return mapping.get((grade or "").upper(), 0.0)
+        return grading.grade_to_gpa_point(grade)
 
     def compute_gpa_for_records(self, recs) -> float:
-        points = []
-        for r in recs:
-            try:
-                g = r[4]
-            except Exception:
-                g = "F"
-            points.append(self.grade_to_gpa_point(g))
-        if not points:
-            return 0.0
-        return sum(points) / len(points)
+        return grading.gpa_for_grades(r[4] if len(r) > 4 else "F" for r in recs)
 
     def compute_gpa_for_grade_list(self, grade_list) -> float:
-        points = [self.grade_to_gpa_point(g) for g in grade_list]
-        if not points:
-            return 0.0
-        return sum(points) / len(points)
+        return grading.gpa_for_grades(grade_list)
 
 # ---------- main ----------
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade Tracking System")
+    parser.add_argument("--profile", nargs="?", metavar="DIR", const=PROFILE_DIR,
+                        default=PROFILE_DIR if PROFILE_ENABLED else None,
+                        help=f"profile every action (cProfile + tracemalloc) into DIR (default {PROFILE_DIR})")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable(args.profile)
     root = tk.Tk()
     app = GradeTrackerApp(root)
     root.mainloop()
+    app.tasks.shutdown()
+    app.repo.close()
+    if METRICS_FILE:
+        instrument.export(METRICS_FILE)
 
 if __name__ == "__main__":
     main()
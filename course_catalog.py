@@ -0,0 +1,51 @@
+from bisect import bisect_left
+
+
+class CourseCatalog:
+    """Read-only snapshot of the course list with O(1) lookup and prefix search.
+
+    Repositories build a new catalog whenever the courses change, so a
+    catalog can be handed to the Tk thread and searched there without locks.
+    """
+
+    def __init__(self, courses):
+        self.courses = [(code, name) for code, name in courses]    # file/insert order
+        self._names = {}
+        for code, name in self.courses:
+            self._names.setdefault(code, name)     # first row wins, as with a linear scan
+        # sorted (key, code) pairs: bisect to the first key >= prefix, then walk while it matches
+        self._by_code = sorted((code.upper(), code) for code in self._names)
+        self._by_name = sorted((name.lower(), code) for code, name in self._names.items() if name)
+
+    def __contains__(self, code):
+        return code in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def get(self, code):
+        if code in self._names:
+            return (code, self._names[code])
+        return None
+
+    def name(self, code):
+        return self._names.get(code)
+
+    @staticmethod
+    def _prefix(index, key, limit, out, seen):
+        i = bisect_left(index, (key,))
+        while i < len(index) and len(out) < limit and index[i][0].startswith(key):
+            code = index[i][1]
+            if code not in seen:
+                seen.add(code)
+                out.append(code)
+            i += 1
+
+    def search(self, text, limit=20):
+        """Codes whose code (then whose name) starts with text, at most limit of them."""
+        text = (text or "").strip()
+        out, seen = [], set()
+        self._prefix(self._by_code, text.upper(), limit, out, seen)
+        if text and len(out) < limit:
+            self._prefix(self._by_name, text.lower(), limit, out, seen)
+        return out
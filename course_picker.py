@@ -0,0 +1,44 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class CoursePicker(ttk.Combobox):
+    """Course code entry that suggests matching courses as you type.
+
+    Suggestions come from a CourseCatalog (set_catalog) searched on the Tk
+    thread; the catalog is an in-memory sorted index, so each keystroke is a
+    bisect rather than a file scan. The dropdown lists "CODE  -  Name"; picking
+    one leaves just the code in the field, so get() always returns a code.
+    """
+
+    def __init__(self, master, limit=20, **kw):
+        super().__init__(master, **kw)
+        self.catalog = None
+        self.limit = limit
+        self.bind("<KeyRelease>", self._on_key, add="+")
+        self.bind("<<ComboboxSelected>>", self._on_selected, add="+")
+
+    def set_catalog(self, catalog):
+        self.catalog = catalog
+        self._suggest()
+
+    def clear(self):
+        self.delete(0, tk.END)
+        self._suggest()
+
+    def _suggest(self):
+        if self.catalog is None:
+            self.configure(values=())
+            return
+        codes = self.catalog.search(self.get(), self.limit)
+        self.configure(values=[f"{c}  -  {self.catalog.name(c)}" if self.catalog.name(c) else c for c in codes])
+
+    def _on_key(self, event):
+        # arrows/enter drive the dropdown itself; only edits change the suggestions
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        self._suggest()
+
+    def _on_selected(self, _event):
+        self.set(self.get().split("  -  ", 1)[0])
+        self.icursor(tk.END)
@@ -0,0 +1,253 @@
+import queue, sqlite3, threading, time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import instrument
+
+
+class DBPool(ABC):
+    """Connections shared by every SAMPLE1 handler.
+
+    Use `with pool.cursor() as cur:` for a unit of work: the cursor's
+    connection is health-checked on checkout, committed on success, rolled
+    back on error and handed back to the pool afterwards. Queries use the
+    %s placeholder style on every backend.
+    """
+
+    IntegrityError = Exception
+
+    # seconds a connection may sit idle before it is pinged again on checkout
+    health_check_interval = 30
+
+    @abstractmethod
+    def _acquire(self):
+        ...
+
+    @abstractmethod
+    def _release(self, conn):
+        ...
+
+    @abstractmethod
+    def _ensure_alive(self, conn):
+        ...
+
+    def _wrap_cursor(self, cur):
+        return cur
+
+    def _discard(self, conn):
+        self._release(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            conn = self._ensure_alive(conn)
+        except Exception:
+            self._discard(conn)
+            raise
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            cur = conn.cursor()
+            wrapped = self._wrap_cursor(cur)
+            if instrument.enabled():
+                wrapped = _CountingCursor(wrapped)
+            try:
+                yield wrapped
+                conn.commit()
+            finally:
+                cur.close()
+
+    def close(self):
+        pass
+
+
+class _CountingCursor:
+    # only used while instrumentation is on: charges queries and fetched rows to the open span
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, args=()):
+        instrument.add(queries=1)
+        return self._cur.execute(sql, args)
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        instrument.add(queries=1, rows=len(seq))
+        return self._cur.executemany(sql, seq)
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is not None:
+            instrument.add(rows=1)
+        return row
+
+    def fetchall(self):
+        rows = self._cur.fetchall()
+        instrument.add(rows=len(rows))
+        return rows
+
+    def fetchmany(self, *args):
+        rows = self._cur.fetchmany(*args)
+        instrument.add(rows=len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+# ---------- MySQL / MariaDB ----------
+class MySQLPool(DBPool):
+    def __init__(self, size=5, name="grade_system", **config):
+        import mysql.connector
+        from mysql.connector import pooling
+        self.IntegrityError = mysql.connector.IntegrityError
+        self._pool = pooling.MySQLConnectionPool(pool_name=name, pool_size=size,
+                                                 pool_reset_session=True, **config)
+        # keyed by the pool's own connection objects: get_connection() wraps one in a new
+        # PooledMySQLConnection each time, and its connection_id changes on reconnect
+        self._last_used = {}
+
+    @staticmethod
+    def _pooled(conn):
+        return getattr(conn, "_cnx", conn)
+
+    def _acquire(self):
+        return self._pool.get_connection()
+
+    def _release(self, conn):
+        self._last_used[self._pooled(conn)] = time.monotonic()
+        # closing a pooled connection returns it to the pool
+        conn.close()
+
+    def _discard(self, conn):
+        # failed its health check: ping it again on the next checkout
+        self._last_used.pop(self._pooled(conn), None)
+        conn.close()
+
+    def _ensure_alive(self, conn):
+        last = self._last_used.get(self._pooled(conn))
+        if last is None or time.monotonic() - last > self.health_check_interval:
+            # reconnects in place when the server dropped the idle connection
+            conn.ping(reconnect=True, attempts=3, delay=1)
+        return conn
+
+    def close(self):
+        self._last_used.clear()
+
+
+# ---------- generic queue pool (SQLite stand-in for local testing) ----------
+class QueuePool(DBPool):
+    def __init__(self, connect, size=5, timeout=30):
+        self._connect = connect
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+        self._last_used = {}
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise TimeoutError("no free database connection in pool")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn):
+        if conn is not None:
+            self._last_used[conn] = time.monotonic()
+            self._idle.put_nowait(conn)
+        self._slots.release()
+
+    def _discard(self, conn):
+        self._last_used.pop(conn, None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._slots.release()
+
+    def _ensure_alive(self, conn):
+        last = self._last_used.get(conn)
+        if last is not None and time.monotonic() - last <= self.health_check_interval:
+            return conn
+        try:
+            conn.execute("SELECT 1")
+            return conn
+        except Exception:
+            # stale connection: close it and open a fresh one in its slot
+            self._last_used.pop(conn, None)
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return self._connect()
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._last_used.pop(conn, None)
+            conn.close()
+
+
+class _QmarkCursor:
+    # lets SAMPLE1's %s-style queries run unchanged on sqlite3
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, args=()):
+        return self._cur.execute(sql.replace("%s", "?"), args)
+
+    def executemany(self, sql, seq):
+        return self._cur.executemany(sql.replace("%s", "?"), seq)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS marks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    marks INTEGER NOT NULL
+);
+"""
+
+
+class SQLitePool(QueuePool):
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path, size=5, timeout=30):
+        def connect():
+            conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            return conn
+        super().__init__(connect, size=size, timeout=timeout)
+        with self.connection() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _wrap_cursor(self, cur):
+        return _QmarkCursor(cur)
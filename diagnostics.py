@@ -0,0 +1,163 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import instrument, profiling
+
+COLUMNS = (("count", "Calls", 60), ("p50_s", "p50 ms", 75), ("p95_s", "p95 ms", 75), ("p99_s", "p99 ms", 75),
+           ("max_s", "max ms", 75), ("rows", "Rows", 80), ("bytes", "Bytes", 90), ("queries", "Queries", 65),
+           ("errors", "Errors", 55))
+
+
+class DiagnosticsPanel:
+    """Live table of instrument.snapshot(), opened and closed with toggle().
+
+    The window is only built while it is open, and it refreshes itself once a
+    second from the Tk thread. Opening it turns recording on; the checkbox
+    turns it off again without closing the window.
+    """
+
+    def __init__(self, root, refresh_ms=1000):
+        self.root = root
+        self.refresh_ms = refresh_ms
+        self.win = None
+        self.tree = None
+        self.recording = None
+        self._after = None
+        self.profile_viewer = ProfileViewer(root, refresh_ms)
+
+    def toggle(self):
+        if self.win is not None and self.win.winfo_exists():
+            self.close()
+        else:
+            self.open()
+
+    def open(self):
+        if self.win is not None and self.win.winfo_exists():
+            self.win.lift()
+            return
+        instrument.enable(True)
+        self.win = tk.Toplevel(self.root)
+        self.win.title("Diagnostics")
+        self.win.geometry("900x360")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+
+        bar = tk.Frame(self.win)
+        bar.pack(fill="x", padx=6, pady=4)
+        self.recording = tk.BooleanVar(value=True)
+        tk.Checkbutton(bar, text="Recording", variable=self.recording,
+                       command=lambda: instrument.enable(self.recording.get())).pack(side="left")
+        tk.Button(bar, text="Reset", command=self.reset).pack(side="left", padx=4)
+        tk.Button(bar, text="Export JSON...", command=lambda: self.export(".json")).pack(side="left", padx=4)
+        tk.Button(bar, text="Export Prometheus...", command=lambda: self.export(".prom")).pack(side="left", padx=4)
+        tk.Button(bar, text="Last action profile...", command=self.profile_viewer.open).pack(side="right")
+
+        self.tree = ttk.Treeview(self.win, columns=[c[0] for c in COLUMNS])
+        self.tree.heading("#0", text="Operation")
+        self.tree.column("#0", width=260)
+        for key, title, width in COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=6, pady=(0, 6))
+        self.refresh()
+
+    def close(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        if self.win is not None and self.win.winfo_exists():
+            self.win.destroy()
+        self.win = self.tree = None
+
+    def refresh(self):
+        self._after = None
+        if self.win is None or not self.win.winfo_exists():
+            return
+        snap = instrument.snapshot()
+        for name in set(self.tree.get_children()) - set(snap):
+            self.tree.delete(name)
+        for name, s in snap.items():
+            values = [f"{s[k] * 1000:.2f}" if k.endswith("_s") else s[k] for k, _, _ in COLUMNS]
+            if self.tree.exists(name):
+                self.tree.item(name, values=values)
+            else:
+                self.tree.insert("", "end", iid=name, text=name, values=values)
+        self._after = self.root.after(self.refresh_ms, self.refresh)
+
+    def reset(self):
+        instrument.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def export(self, ext):
+        path = filedialog.asksaveasfilename(parent=self.win, defaultextension=ext,
+                                            initialfile="metrics" + ext)
+        if not path:
+            return
+        try:
+            instrument.export(path)
+        except OSError as exc:
+            messagebox.showerror("Export failed", str(exc), parent=self.win)
+
+
+class ProfileViewer:
+    """Shows profiling.last_action(): per-unit wall times, merged cProfile stats
+    and allocation growth. Follows the newest action while open."""
+
+    def __init__(self, root, refresh_ms=1000):
+        self.root = root
+        self.refresh_ms = refresh_ms
+        self.win = None
+        self.text = None
+        self._shown = None
+        self._after = None
+
+    def toggle(self):
+        if self.win is not None and self.win.winfo_exists():
+            self.close()
+        else:
+            self.open()
+
+    def open(self):
+        if self.win is not None and self.win.winfo_exists():
+            self.win.lift()
+            return
+        self.win = tk.Toplevel(self.root)
+        self.win.title("Last action profile")
+        self.win.geometry("980x560")
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+        self.text = tk.Text(self.win, wrap="none", font=("Courier", 10))
+        ys = ttk.Scrollbar(self.win, orient="vertical", command=self.text.yview)
+        xs = ttk.Scrollbar(self.win, orient="horizontal", command=self.text.xview)
+        self.text.configure(yscrollcommand=ys.set, xscrollcommand=xs.set)
+        ys.pack(side="right", fill="y")
+        xs.pack(side="bottom", fill="x")
+        self.text.pack(fill="both", expand=True)
+        self._shown = None
+        self.refresh()
+
+    def close(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        if self.win is not None and self.win.winfo_exists():
+            self.win.destroy()
+        self.win = self.text = None
+
+    def refresh(self):
+        self._after = None
+        if self.win is None or not self.win.winfo_exists():
+            return
+        act = profiling.last_action()
+        # rebuild only when a new action or another of its units has arrived
+        state = (profiling.enabled(), act.seq if act else None, len(act.units) if act else 0)
+        if state != self._shown:
+            self._shown = state
+            if not profiling.enabled():
+                body = "Profiling mode is off. Start the app with --profile [DIR] or GRADE_PROFILE=1."
+            elif act is None:
+                body = "No action profiled yet."
+            else:
+                body = act.report()
+            self.text.configure(state="normal")
+            self.text.delete("1.0", tk.END)
+            self.text.insert("1.0", body)
+            self.text.configure(state="disabled")
+        self._after = self.root.after(self.refresh_ms, self.refresh)
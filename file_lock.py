@@ -0,0 +1,182 @@
+"""Advisory locking and a write counter for data files shared between processes.
+
+Several copies of the app may run against the same students.csv. Each file
+gets a companion <path>.lock. An exclusive lock on it (fcntl.flock, or
+msvcrt.locking on Windows) serialises writers; readers take it shared, so
+they never see half of an append. The file also holds two counters:
+- the version, bumped by every committed write. A writer that prepared its
+  change from a copy of the data can check, under the lock, whether anyone
+  else wrote in between (see RecordStore._write).
+- the epoch, bumped only by writes that replace the file rather than append
+  to it. A reader whose epoch is still current can read just the new tail.
+
+The locks are advisory: they only coordinate code that goes through
+FileLock. The OS drops them when a process dies, so a crashed writer never
+leaves the file locked.
+"""
+import os, threading, time
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+_WIDTH = 20     # each counter is 20 ASCII digits: version at offset 0, epoch after it
+
+
+class FileLock:
+    """Reentrant lock on <path>.lock, plus the file's version and epoch counters.
+
+    Use as a context manager. One FileLock object may be shared by threads,
+    but callers serialise them (RecordStore holds its own RLock). Two
+    FileLock objects for the same path exclude each other, even in one process.
+    """
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._fd = None
+        self._depth = 0
+        self._io = threading.Lock()     # seek + read/write on the shared fd
+        self.acquired = 0       # times the lock was taken
+        self.contended = 0      # ... of which had to wait for another holder
+        self.wait_s = 0.0
+
+    def _open(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        return self._fd
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def shared(self):
+        """Context manager for a shared (reader) lock; inside a held lock it adds nothing.
+
+        msvcrt has no shared locks, so on Windows readers exclude each other too.
+        """
+        return _Shared(self)
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @property
+    def held(self):
+        return self._depth > 0
+
+    def acquire(self, blocking=True, shared=False):
+        """Take the lock (reentrant); with blocking=False, return False instead of waiting.
+
+        Nested calls keep the mode of the outermost one.
+        """
+        if self._depth == 0 and not self._lock(self._open(), blocking, shared):
+            return False
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock(self._fd)
+
+    def _lock(self, fd, blocking, shared=False):
+        if fcntl is not None:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                self.acquired += 1
+                return True
+            except BlockingIOError:
+                if not blocking:
+                    return False
+            self.contended += 1
+            t = time.perf_counter()
+            fcntl.flock(fd, mode)
+            self.wait_s += time.perf_counter() - t
+            self.acquired += 1
+            return True
+        # msvcrt locks a byte range (one byte past the counter) and its blocking
+        # mode gives up after about ten seconds, so poll instead
+        t = time.perf_counter()
+        waited = False
+        while True:
+            with self._io:
+                os.lseek(fd, _WIDTH, os.SEEK_SET)
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    pass
+            if not blocking:
+                return False
+            waited = True
+            time.sleep(0.005)
+        if waited:
+            self.contended += 1
+            self.wait_s += time.perf_counter() - t
+        self.acquired += 1
+        return True
+
+    def _unlock(self, fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return
+        with self._io:
+            os.lseek(fd, _WIDTH, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def state(self):
+        """(version, epoch): (0, 0) before the first write, None if unreadable.
+
+        Readable without the lock. A read that races a bump may return None,
+        which callers treat as "changed".
+        """
+        try:
+            fd = self._open()
+            if hasattr(os, "pread"):
+                raw = os.pread(fd, 2 * _WIDTH, 0)     # no seek, so no need for _io
+            else:
+                with self._io:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    raw = os.read(fd, 2 * _WIDTH)
+        except OSError:
+            return None
+        if not raw:
+            return (0, 0)
+        if len(raw) != 2 * _WIDTH or not raw.isdigit():
+            return None
+        return int(raw[:_WIDTH]), int(raw[_WIDTH:])
+
+    def bump(self, epoch=False):
+        """Count a committed write (epoch=True: one that replaced the file); only under the lock."""
+        assert self.held, "bump() needs the lock"
+        version, old_epoch = self.state() or (0, 0)
+        state = (version + 1, old_epoch + 1 if epoch else old_epoch)
+        with self._io:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, b"%0*d%0*d" % (_WIDTH, state[0], _WIDTH, state[1]))
+        return state
+
+    def stats(self):
+        return {"acquired": self.acquired, "contended": self.contended, "wait_s": round(self.wait_s, 4)}
+
+    def close(self):
+        if self._fd is not None:
+            if self._depth:
+                self._unlock(self._fd)
+                self._depth = 0
+            os.close(self._fd)
+            self._fd = None
+
+
+class _Shared:
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire(shared=True)
+        return self.lock
+
+    def __exit__(self, *exc):
+        self.lock.release()
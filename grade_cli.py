@@ -0,0 +1,153 @@
+"""Headless command line for reports and batch jobs (no Tk, no matplotlib).
+
+    python grade_cli.py report <ID>
+    python grade_cli.py all [--csv]
+    python grade_cli.py import <marks.csv> [--rejects <file>]
+    python grade_cli.py export <out.csv>
+    python grade_cli.py regrade [--scheme S:90,A:80,B:70,C:60,D:50]
+    python grade_cli.py reports <out_dir> [--format pdf|png] [--workers N] [--id ID ...]
+    python grade_cli.py snapshot
+
+Storage is picked the same way as the GUI (GRADE_BACKEND / GRADE_JOURNAL),
+or with --backend.
+"""
+import argparse, csv, os, sys
+
+import grading
+import bulk_import
+from record_store import HEADER
+from repository import open_repository
+from settings import (USER_FILE, COURSE_FILE, STUDENT_FILE, SQLITE_FILE,
+                      STORAGE_BACKEND, USE_JOURNAL, PASSWORD_SCHEME, PASSWORD_COST, LOAD_WORKERS)
+
+
+def cmd_report(repo, args):
+    recs = repo.records_for_id(args.student_id)
+    if not recs:
+        print(f"No records for student ID {args.student_id}.", file=sys.stderr)
+        return 1
+    marks, avg_marks, highest, lowest, gpa = grading.report_stats(recs, repo.student_aggregate(args.student_id))
+    print(f"{recs[0][1] if len(recs[0]) > 1 else ''}  —  {recs[0][0]}")
+    for r in recs:
+        course = r[2] if len(r) > 2 else "(unknown)"
+        grade = r[4] if len(r) > 4 else "F"
+        print(f"  {course}  |  Marks: {r[3] if len(r) > 3 else '0'}  |  Grade: {grade}")
+    print(f"Average Marks: {avg_marks:.2f}  Highest: {highest:.2f}  Lowest: {lowest:.2f}  GPA: {gpa:.2f}")
+    return 0
+
+
+def cmd_all(repo, args):
+    aggs = repo.student_aggregates()
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["Student ID", "Name", "Courses Count", "Avg Marks", "GPA"])
+        for sid, a in aggs.items():
+            writer.writerow([sid, a.name, a.count, f"{a.avg_marks:.2f}", f"{a.gpa:.2f}"])
+    else:
+        for sid, a in aggs.items():
+            print(f"{sid:<12} {a.name:<24} {a.count:>4} {a.avg_marks:>8.2f} {a.gpa:>6.2f}")
+    return 0
+
+
+def cmd_import(repo, args):
+    result = bulk_import.import_grades(args.file, repo, reject_file=args.rejects)
+    print(result.summary())
+    return 0 if not result.rejected else 2
+
+
+def cmd_export(repo, args):
+    with open(args.file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(repo.all_records())
+    return 0
+
+
+def cmd_snapshot(repo, args):
+    store = getattr(repo, "store", None)
+    if store is None:
+        print("Only the CSV backend uses a binary snapshot.", file=sys.stderr)
+        return 1
+    store.refresh()
+    store.save_snapshot()
+    print(f"{store.snapshot_path}: {len(store)} records")
+    return 0
+
+
+def cmd_regrade(repo, args):
+    scheme = grading.GradingScheme.from_spec(args.scheme) if args.scheme else grading.DEFAULT_SCHEME
+    changed = grading.regrade_rows(repo.all_records(), scheme)
+    if changed:
+        repo.bulk_upsert_records(changed)
+    print(f"Regraded: {len(changed)} records changed grade.")
+    return 0
+
+
+def cmd_reports(repo, args):
+    # batch_reports pulls in matplotlib only inside its worker processes
+    import batch_reports
+
+    def progress(done, total):
+        print(f"\r{done}/{total} students", end="", file=sys.stderr, flush=True)
+
+    written, failed = batch_reports.generate_reports(
+        repo.all_records(), args.out_dir, fmt=args.format, workers=args.workers,
+        chunk_size=args.chunk_size, student_ids=args.id, progress=progress)
+    print(file=sys.stderr)
+    for sid, err in failed:
+        print(f"{sid}: {err}", file=sys.stderr)
+    print(f"Wrote {written} reports to {os.path.abspath(args.out_dir)}" + (f", {len(failed)} failed." if failed else "."))
+    return 0 if not failed else 2
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Grade Tracking System (headless)")
+    parser.add_argument("--backend", choices=("csv", "sqlite"), default=STORAGE_BACKEND)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("report", help="performance report for one student ID")
+    p.add_argument("student_id")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("all", help="all students summary")
+    p.add_argument("--csv", action="store_true", help="write CSV to stdout")
+    p.set_defaults(func=cmd_all)
+
+    p = sub.add_parser("import", help="bulk import ID,Name,CourseCode,Marks rows")
+    p.add_argument("file")
+    p.add_argument("--rejects", help="reject report path (default <file>.rejects.csv)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="write every grade record to a CSV file")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("regrade", help="recompute every grade from its marks")
+    p.add_argument("--scheme", help="grade boundaries, e.g. S:90,A:80,B:70,C:60,D:50")
+    p.set_defaults(func=cmd_regrade)
+
+    p = sub.add_parser("reports", help="write a PDF/PNG performance report for every student")
+    p.add_argument("out_dir")
+    p.add_argument("--format", choices=("pdf", "png"), default="pdf")
+    p.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("--chunk-size", type=int, default=100, help="students per work unit")
+    p.add_argument("--id", action="append", help="only this student ID (repeatable)")
+    p.set_defaults(func=cmd_reports)
+
+    p = sub.add_parser("snapshot", help="write students.csv.snap so later starts skip parsing the CSV")
+    p.set_defaults(func=cmd_snapshot)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    repo = open_repository(args.backend, USER_FILE, COURSE_FILE, STUDENT_FILE, SQLITE_FILE, journal=USE_JOURNAL,
+                           password_scheme=PASSWORD_SCHEME, password_cost=PASSWORD_COST, load_workers=LOAD_WORKERS)
+    try:
+        return args.func(repo, args)
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
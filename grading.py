@@ -0,0 +1,132 @@
+from bisect import bisect_right
+
+# ---------- grading & gpa rules (no GUI imports, shared by the app and the stores) ----------
+GPA_POINTS = {"S": 5.0, "A": 4.0, "B": 3.0, "C": 2.0, "D": 1.0, "F": 0.0}
+
+# lowest marks needed for each grade, best first; anything below the last is FAIL_GRADE
+GRADE_THRESHOLDS = [(90, "S"), (80, "A"), (70, "B"), (60, "C"), (50, "D")]
+FAIL_GRADE = "F"
+
+
+def _np():
+    # numpy is only needed for batch work, so single-record grading never pays for the import
+    import numpy
+    return numpy
+
+
+class GradingScheme:
+    """Grade boundaries plus GPA points, usable one mark at a time or on whole arrays.
+
+    Grades are also available as small integer codes (index into self.grades,
+    worst first) so a cohort can be regraded with one np.searchsorted call.
+    """
+
+    def __init__(self, thresholds=GRADE_THRESHOLDS, fail_grade=FAIL_GRADE, gpa_points=GPA_POINTS):
+        ordered = sorted(thresholds)
+        self.bounds = [float(b) for b, _ in ordered]
+        self.grades = [fail_grade] + [g for _, g in ordered]
+        self.gpa_points = dict(gpa_points)
+        self.code_points = [self.gpa_points.get(g, 0.0) for g in self.grades]
+
+    @classmethod
+    def from_spec(cls, spec, fail_grade=FAIL_GRADE):
+        # "S:90,A:80,B:70,C:60,D:50"
+        thresholds = []
+        for part in spec.split(","):
+            grade, bound = part.split(":")
+            thresholds.append((float(bound), grade.strip().upper()))
+        return cls(thresholds, fail_grade)
+
+    # ---------- one record ----------
+    def grade(self, marks: float) -> str:
+        if marks != marks:      # NaN fails rather than sorting past every bound
+            return self.grades[0]
+        return self.grades[bisect_right(self.bounds, marks)]
+
+    def points(self, grade: str) -> float:
+        return self.gpa_points.get((grade or "").upper(), 0.0)
+
+    # ---------- whole arrays ----------
+    def grade_codes(self, marks):
+        np = _np()
+        marks = np.asarray(marks, dtype=np.float64)
+        codes = np.searchsorted(np.asarray(self.bounds), marks, side="right").astype(np.uint8)
+        codes[np.isnan(marks)] = 0
+        return codes
+
+    def grade_array(self, marks):
+        np = _np()
+        return np.asarray(self.grades)[self.grade_codes(marks)]
+
+    def points_for_codes(self, codes):
+        np = _np()
+        return np.asarray(self.code_points, dtype=np.float64)[codes]
+
+    def points_for_grades(self, grades):
+        np = _np()
+        uniq, inverse = np.unique(np.char.upper(np.asarray(grades, dtype=str)), return_inverse=True)
+        table = np.asarray([self.gpa_points.get(g, 0.0) for g in uniq], dtype=np.float64)
+        return table[inverse.ravel()]
+
+    def group_gpa(self, keys, points):
+        """Mean GPA points per key; returns (unique_keys, gpa) with keys sorted."""
+        np = _np()
+        uniq, inverse = np.unique(np.asarray(keys), return_inverse=True)
+        inverse = inverse.ravel()
+        totals = np.bincount(inverse, weights=np.asarray(points, dtype=np.float64), minlength=len(uniq))
+        counts = np.bincount(inverse, minlength=len(uniq))
+        return uniq, totals / np.maximum(counts, 1)
+
+
+DEFAULT_SCHEME = GradingScheme()
+
+
+def marks_to_grade(marks: float) -> str:
+    return DEFAULT_SCHEME.grade(marks)
+
+
+def grade_to_gpa_point(grade: str) -> float:
+    return DEFAULT_SCHEME.points(grade)
+
+
+def gpa_for_grades(grades) -> float:
+    points = [grade_to_gpa_point(g) for g in grades]
+    if not points:
+        return 0.0
+    return sum(points) / len(points)
+
+
+def parse_marks(marks_s) -> float:
+    try:
+        return float(marks_s)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def report_stats(recs, agg=None):
+    """Per-student report numbers: (marks list, average, highest, lowest, GPA).
+
+    Uses the maintained StudentAggregate when it covers exactly these records.
+    """
+    # marks array (guarded against malformed rows)
+    marks = [parse_marks(r[3]) if len(r) > 3 else 0.0 for r in recs]
+    if agg is not None and agg.count == len(recs):
+        return marks, agg.avg_marks, agg.max_marks, agg.min_marks, agg.gpa
+    avg_marks = sum(marks) / len(marks) if marks else 0.0
+    highest = max(marks) if marks else 0.0
+    lowest = min(marks) if marks else 0.0
+    gpa = gpa_for_grades(r[4] if len(r) > 4 else "F" for r in recs)
+    return marks, avg_marks, highest, lowest, gpa
+
+
+def regrade_rows(rows, scheme=DEFAULT_SCHEME):
+    """Regrade [ID, Name, CourseCode, Marks, Grade] rows in one pass; returns the rows whose grade changed."""
+    rows = [r for r in rows if len(r) >= 5]
+    if not rows:
+        return []
+    new_grades = scheme.grade_array([parse_marks(r[3]) for r in rows])
+    changed = []
+    for r, g in zip(rows, new_grades.tolist()):
+        if r[4] != g:
+            changed.append([r[0], r[1], r[2], r[3], g] + list(r[5:]))
+    return changed
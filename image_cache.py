@@ -0,0 +1,155 @@
+import base64, hashlib, io, os, tempfile, threading
+import tkinter as tk
+from collections import OrderedDict
+
+
+class BackgroundCache:
+    """Pre-scaled page backgrounds, cached in memory (LRU of PhotoImages) and on disk.
+
+    Entries are keyed by (file, size, mtime), so replacing an image file picks up
+    the new picture on the next navigation. Resized copies are written to
+    cache_dir as PPM (PNG if the image has transparency), which Tk loads
+    natively, so a warm disk cache needs neither PIL nor a resample. If
+    cache_dir cannot be written, the copy is kept in memory as PNG data.
+
+    Thread rule: prepare()/prepare_many() may run on a worker thread (they only
+    touch files); photo() and the PhotoImage objects are main-thread only.
+    """
+
+    def __init__(self, size=(1000, 750), max_images=8, cache_dir=".bg_cache"):
+        self.size = tuple(size)
+        self.max_images = max_images
+        self.cache_dir = cache_dir
+        self._photos = OrderedDict()     # key -> tk.PhotoImage, most recently used last
+        self._files = {}                 # key -> resized file on disk, or PNG data if it can't be written
+        self._lock = threading.Lock()    # guards _files, shared with warm-up workers
+
+    def _key(self, path):
+        st = os.stat(path)
+        return os.path.abspath(path), self.size, st.st_mtime_ns, st.st_size
+
+    def _cache_prefix(self, key):
+        # one prefix per source file and size: other versions of it share the prefix
+        path, (w, h), _, _ = key
+        stem = os.path.splitext(os.path.basename(path))[0]
+        source = hashlib.sha1(path.encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{stem}-{w}x{h}-{source}-")
+
+    def _cache_name(self, key):
+        _, _, mtime_ns, size = key
+        return self._cache_prefix(key) + hashlib.sha1(f"{mtime_ns}|{size}".encode()).hexdigest()[:12]
+
+    # ---------- file side (safe on worker threads) ----------
+    def prepare(self, path):
+        """Make sure a resized copy of path exists; returns (key, file or PNG data)."""
+        key = self._key(path)
+        with self._lock:
+            cached = self._files.get(key)
+        if cached and (isinstance(cached, bytes) or os.path.exists(cached)):
+            return key, cached
+        base = self._cache_name(key)
+        for ext in (".ppm", ".png"):
+            if os.path.exists(base + ext):
+                cached = base + ext
+                break
+        else:
+            cached = self._write_resized(path, key)
+        with self._lock:
+            self._files[key] = cached
+        return key, cached
+
+    def prepare_many(self, paths):
+        out = []
+        for p in paths:
+            try:
+                out.append(self.prepare(p))
+            except OSError:
+                continue     # missing/unreadable images simply aren't warmed
+        return out
+
+    def _write_resized(self, path, key):
+        # PIL is only needed when the disk cache has no copy yet
+        from PIL import Image
+        with Image.open(path) as img:
+            img = img.resize(self.size)
+        alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        if alpha:
+            img, ext, fmt, options = img.convert("RGBA"), ".png", "PNG", {"compress_level": 1}
+        else:
+            img, ext, fmt, options = img.convert("RGB"), ".ppm", "PPM", {}
+        base = self._cache_name(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # drop copies of older versions of the same picture
+            prefix = os.path.basename(self._cache_prefix(key))
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and not name.startswith(os.path.basename(base)):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=ext)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    img.save(f, fmt, **options)
+                os.replace(tmp, base + ext)
+            except OSError:
+                os.remove(tmp)
+                raise
+            return base + ext
+        except OSError:
+            # cache_dir not writable: keep the copy in memory for this session only
+            buf = io.BytesIO()
+            img.save(buf, "PNG", compress_level=1)
+            return base64.b64encode(buf.getvalue())
+
+    # ---------- Tk side (main thread only) ----------
+    def photo(self, path):
+        key, cached = self.prepare(path)
+        img = self._photos.get(key)
+        if img is None:
+            img = _load_photo(cached)
+            self._store(key, img)
+        else:
+            self._photos.move_to_end(key)
+        return img
+
+    def load_prepared(self, prepared):
+        # on_done for a warm-up job: turn the worker's files into PhotoImages
+        for key, cached in prepared:
+            if key not in self._photos:
+                try:
+                    self._store(key, _load_photo(cached))
+                except tk.TclError:
+                    continue
+
+    def _store(self, key, img):
+        self._photos[key] = img
+        while len(self._photos) > self.max_images:
+            self._photos.popitem(last=False)
+
+    def __len__(self):
+        return len(self._photos)
+
+
+def _load_photo(cached):
+    # a file in the disk cache, or base64 PNG data when it could not be written
+    if isinstance(cached, bytes):
+        return tk.PhotoImage(data=cached.decode("ascii"))
+    return tk.PhotoImage(file=cached)
+
+
+def read_bg_list(path="bgdata.txt", ext=".png"):
+    """Background names listed in bgdata.txt (one per line), as image file names."""
+    names = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                name = line.strip()
+                # skip the prose lines, keep the bare image names
+                if not name or " " in name:
+                    continue
+                names.append(name if os.path.splitext(name)[1] else name + ext)
+    except OSError:
+        pass
+    return names
@@ -0,0 +1,220 @@
+import functools, json, math, os, threading, time
+from bisect import bisect_left
+
+# Off by default. While disabled (and no profiling hook is set), timed()
+# wrappers and add() return after one global check and span() hands back a
+# shared no-op context, so instrumented code costs a function call more than
+# uninstrumented code.
+_enabled = False
+_action_hook = None     # profiling.action while profiling mode is on
+_active = False         # _enabled or a hook is set: the one flag timed() wrappers check
+_lock = threading.Lock()
+_local = threading.local()
+
+# latency histogram buckets: 1 us .. ~100 s, each 20% wider than the last
+_BOUNDS_NS = [int(1000 * 1.2 ** i) for i in range(102)]
+
+
+class OpStats:
+    """Latency histogram plus work counters for one instrumented operation."""
+
+    __slots__ = ("count", "errors", "total_ns", "max_ns", "buckets", "rows", "bytes", "queries")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(_BOUNDS_NS) + 1)
+        self.rows = 0
+        self.bytes = 0
+        self.queries = 0
+
+    def observe(self, ns, failed=False):
+        self.count += 1
+        self.errors += failed
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[bisect_left(_BOUNDS_NS, ns)] += 1
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th sample (within 20%), capped at the true max
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                bound = _BOUNDS_NS[i] if i < len(_BOUNDS_NS) else self.max_ns
+                return min(bound, self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def summary(self):
+        return {"count": self.count, "errors": self.errors,
+                "mean_s": self.total_ns / self.count / 1e9 if self.count else 0.0,
+                "p50_s": self.quantile(0.50), "p95_s": self.quantile(0.95), "p99_s": self.quantile(0.99),
+                "max_s": self.max_ns / 1e9, "rows": self.rows, "bytes": self.bytes, "queries": self.queries}
+
+
+_stats = {}     # op name -> OpStats
+
+
+def _op(name):
+    st = _stats.get(name)
+    if st is None:
+        st = _stats[name] = OpStats()
+    return st
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled, _active
+    _enabled = bool(on)
+    _active = _enabled or _action_hook is not None
+
+
+def set_action_hook(hook):
+    """hook(op) -> context manager entered around every timed() call (None to remove)."""
+    global _action_hook, _active
+    _action_hook = hook
+    _active = _enabled or hook is not None
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+# ---------- recording ----------
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ns = time.perf_counter_ns() - self.start
+        _local.stack.pop()
+        with _lock:
+            _op(self.name).observe(ns, exc_type is not None)
+        return False
+
+
+def span(name):
+    """with span("op"): ... records the block's latency under op."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def add(rows=0, nbytes=0, queries=0, name=None):
+    """Attribute work (rows scanned, bytes read, queries run) to name or the innermost open span."""
+    if not _enabled:
+        return
+    if name is None:
+        stack = getattr(_local, "stack", None)
+        name = stack[-1] if stack else "(untracked)"
+    with _lock:
+        st = _op(name)
+        st.rows += rows
+        st.bytes += nbytes
+        st.queries += queries
+
+
+def label(fn):
+    return getattr(fn, "__qualname__", getattr(fn, "__name__", repr(fn))).replace(".<locals>", "")
+
+
+def call_span(prefix, fn):
+    """span() named after the callable fn; the name is only built while enabled."""
+    return _Span(prefix + label(fn)) if _enabled else _NULL_SPAN
+
+
+def timed(name=None):
+    """Decorator recording each call's latency; usable as @timed or @timed("op")."""
+    def deco(fn):
+        op = name or label(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            if not _active:
+                return fn(*args, **kw)
+            return _call(op, fn, args, kw)
+        return wrapper
+
+    if callable(name):
+        fn, name = name, None
+        return deco(fn)
+    return deco
+
+
+def _call(op, fn, args, kw):
+    hook = _action_hook
+    with hook(op) if hook is not None else _NULL_SPAN:
+        if not _enabled:
+            return fn(*args, **kw)
+        with _Span(op):
+            return fn(*args, **kw)
+
+
+# ---------- reading / export ----------
+def snapshot():
+    """{op: summary dict} for every operation seen so far."""
+    with _lock:
+        return {name: st.summary() for name, st in sorted(_stats.items())}
+
+
+def to_prometheus(snap=None, prefix="grade"):
+    snap = snapshot() if snap is None else snap
+    esc = lambda s: s.replace("\\", "\\\\").replace('"', '\\"')
+    lines = [f"# HELP {prefix}_op_latency_seconds Latency of instrumented operations.",
+             f"# TYPE {prefix}_op_latency_seconds summary"]
+    for name, s in snap.items():
+        for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+            lines.append(f'{prefix}_op_latency_seconds{{op="{esc(name)}",quantile="{q}"}} {s[key]:.9f}')
+        lines.append(f'{prefix}_op_latency_seconds_sum{{op="{esc(name)}"}} {s["mean_s"] * s["count"]:.9f}')
+        lines.append(f'{prefix}_op_latency_seconds_count{{op="{esc(name)}"}} {s["count"]}')
+    for metric, key, help_text in (("op_errors_total", "errors", "Calls that raised."),
+                                   ("rows_scanned_total", "rows", "Rows read or scanned."),
+                                   ("bytes_read_total", "bytes", "Bytes read from files."),
+                                   ("queries_total", "queries", "Database queries executed.")):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} counter")
+        for name, s in snap.items():
+            lines.append(f'{prefix}_{metric}{{op="{esc(name)}"}} {s[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """Write the current metrics to path: Prometheus text for .prom/.txt, JSON otherwise."""
+    snap = snapshot()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        if os.path.splitext(path)[1].lower() in (".prom", ".txt"):
+            f.write(to_prometheus(snap))
+        else:
+            json.dump({"timestamp": time.time(), "ops": snap}, f, indent=1)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,94 @@
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+
+class PagedTreeview(ttk.Treeview):
+    """Treeview that pulls its rows a page at a time as the user scrolls.
+
+    fetch_page(cursor, limit) must return (rows, next_cursor), where rows is a
+    list of value tuples and next_cursor is None once there is nothing left.
+    The first call gets cursor=None. For SQL sources the cursor is the last
+    key seen, so each page is a keyset query (WHERE id > ? LIMIT n).
+    Only pages the user has scrolled to are inserted into the widget, so
+    page_size should be comfortably larger than the visible height.
+
+    With a TaskRunner, fetch_page runs on a worker thread.
+    """
+
+    def __init__(self, master, fetch_page, page_size=200, prefetch=0.8, runner=None, **kw):
+        super().__init__(master, **kw)
+        self.fetch_page = fetch_page
+        self.runner = runner
+        self.page_size = page_size
+        # load the next page once the bottom of the view passes this fraction
+        self.prefetch = prefetch
+        self.scrollbar = ttk.Scrollbar(master, orient="vertical", command=self.yview)
+        self.configure(yscrollcommand=self._on_scroll)
+        self._cursor = None
+        self._done = False
+        self._loading = False
+        self._idle_id = None     # the one load_next_page queued by scrolling, if any
+
+    def reload(self):
+        if self.runner is not None:
+            self.runner.cancel(self)    # drop a page still in flight for the old contents
+        if self._idle_id is not None:
+            self.after_cancel(self._idle_id)
+            self._idle_id = None
+        self.delete(*self.get_children())
+        self._cursor = None
+        self._done = False
+        self._loading = False
+        self.load_next_page()
+
+    def load_next_page(self):
+        if self._done or self._loading:
+            return
+        self._loading = True
+        if self.runner is None:
+            try:
+                self._show_page(self.fetch_page(self._cursor, self.page_size))
+            finally:
+                self._loading = False
+        else:
+            self.runner.submit(self.fetch_page, self._cursor, self.page_size,
+                               on_done=self._show_page, on_error=self._page_failed, key=self)
+
+    def _show_page(self, page):
+        self._loading = False
+        rows, self._cursor = page
+        for values in rows:
+            self.insert("", tk.END, values=values)
+        if self._cursor is None:
+            self._done = True
+
+    def _page_failed(self, exc):
+        self._loading = False
+        messagebox.showerror("Error", f"Could not load rows:\n{exc}")
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # scrolling fires this many times per second: queue at most one load at a time
+        if (not self._done and not self._loading and self._idle_id is None
+                and float(last) >= self.prefetch):
+            self._idle_id = self.after_idle(self._load_on_idle)
+
+    def _load_on_idle(self):
+        self._idle_id = None
+        self.load_next_page()
+
+    def destroy(self):
+        if self._idle_id is not None:
+            self.after_cancel(self._idle_id)
+            self._idle_id = None
+        super().destroy()
+
+
+def list_pager(items, to_values):
+    # fetch_page over an in-memory list; the cursor is the offset of the next row
+    def fetch_page(cursor, limit):
+        start = cursor or 0
+        page = items[start:start + limit]
+        end = start + len(page)
+        return [to_values(item) for item in page], (end if end < len(items) else None)
+    return fetch_page
@@ -0,0 +1,43 @@
+import tkinter as tk
+
+
+class PageManager:
+    """Builds each page frame once and raises the cached frame on navigation.
+
+    build(frame) creates a page's widgets inside frame the first time the page
+    is shown, and may return a refresh callable. refresh(*args) runs on every
+    show(name, *args) and is where data-bound widgets (entries to clear, labels
+    that name the user, tables to reload) are brought up to date. Everything
+    else is reused as-is instead of being destroyed and rebuilt.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._builders = {}
+        self._pages = {}     # name -> (frame, refresh) for pages built so far
+        self.current = None
+
+    def register(self, name, build):
+        self._builders[name] = build
+
+    def show(self, name, *args):
+        page = self._pages.get(name)
+        if page is None:
+            frame = tk.Frame(self.root)
+            frame.place(x=0, y=0, relwidth=1, relheight=1)
+            page = self._pages[name] = (frame, self._builders[name](frame))
+        frame, refresh = page
+        frame.tkraise()
+        self.current = name
+        if refresh is not None:
+            refresh(*args)
+        return frame
+
+    def forget(self, name=None):
+        # drop cached frames (one page, or all of them) so they are rebuilt on next show
+        for n in ([name] if name is not None else list(self._pages)):
+            page = self._pages.pop(n, None)
+            if page is not None:
+                page[0].destroy()
+        if name is None or name == self.current:
+            self.current = None
@@ -0,0 +1,118 @@
+"""Parse a large CSV in a process pool, keeping the rows in file order.
+
+The file is cut into byte ranges that end on record boundaries. A newline
+ends a record only outside a quoted field. With the csv module's default
+dialect, every quoted field holds an even number of '"' characters: the
+two that enclose it, plus each "" escape. So a newline ends a record
+exactly when the number of quotes before it is even. Each range is parsed
+by csv.reader in a worker. The rows come back packed into one string
+(fields joined by \\x1f, records by \\x1e), which the parent splits with
+str.split; that is far cheaper than unpickling a list of lists. A chunk
+whose text already contains either separator is sent back as row lists.
+
+Quoting that csv.reader reads leniently, like a stray '"' inside an
+unquoted field, throws the parity count off. read_rows falls back to one
+serial csv.reader when the file's total quote count is odd.
+"""
+import csv, io, locale, mmap, os
+
+MIN_PARALLEL_BYTES = 32 * 2**20     # below this, starting the pool costs more than it saves
+_FIELD, _RECORD = "\x1f", "\x1e"
+_SCAN = 8 * 2**20
+
+
+def _count_quotes(mm, start, end):
+    n = 0
+    for pos in range(start, end, _SCAN):
+        n += mm[pos:min(pos + _SCAN, end)].count(b'"')
+    return n
+
+
+def record_ranges(path, parts):
+    """[(start, end), ...] byte ranges covering path, each ending on a record boundary.
+
+    Returns None if the file's quote count is odd (quoting the parity rule cannot follow).
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = [0]
+        quotes = done = 0
+        for k in range(1, parts):
+            pos = max(size * k // parts, done)
+            while True:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    break
+                quotes += _count_quotes(mm, done, nl + 1)
+                done = pos = nl + 1
+                if quotes % 2 == 0:
+                    break
+            if nl < 0 or done >= size:
+                break
+            bounds.append(done)
+        quotes += _count_quotes(mm, done, size)
+    if quotes % 2:
+        return None
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_range(path, start, end, encoding, skip_header):
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding)
+    reader = csv.reader(io.StringIO(text, newline=""))
+    if skip_header:
+        next(reader, None)
+    rows = [r for r in reader if r]
+    if not rows or _FIELD in text or _RECORD in text:
+        return rows
+    return _RECORD.join([_FIELD.join(r) for r in rows])
+
+
+def _unpack(chunk):
+    if isinstance(chunk, list):
+        return chunk
+    return [rec.split(_FIELD) for rec in chunk.split(_RECORD)]
+
+
+def read_serial(path, skip_header=True):
+    """Non-empty rows of path via one csv.reader: the reference read_rows must match."""
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
+        for r in reader:
+            if r:
+                yield r
+
+
+def read_rows(path, workers=None, skip_header=True, chunks_per_worker=4, min_bytes=None):
+    """Yield the non-empty rows of path in file order, as csv.reader would.
+
+    Files under min_bytes (default MIN_PARALLEL_BYTES), or with workers == 1,
+    are read serially. Otherwise the file is split into
+    workers * chunks_per_worker ranges. The parent yields the rows of the
+    first ranges while later ranges are still being parsed, so the caller's
+    indexing overlaps the parsing.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = None
+    if workers > 1 and os.path.getsize(path) >= (MIN_PARALLEL_BYTES if min_bytes is None else min_bytes):
+        ranges = record_ranges(path, workers * chunks_per_worker)
+    if ranges is None:
+        yield from read_serial(path, skip_header)
+        return
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor     # ~30 ms of imports, only paid here
+    # decode with the same encoding open(path, "r") would pick
+    encoding = locale.getpreferredencoding(False)
+    # never fork: the GUI loads on a worker thread, and forking a threaded Tk process can deadlock
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)) as pool:
+        futures = [pool.submit(_parse_range, path, start, end, encoding, skip_header and i == 0)
+                   for i, (start, end) in enumerate(ranges)]
+        for fut in futures:
+            yield from _unpack(fut.result())
@@ -0,0 +1,92 @@
+import base64, hashlib, hmac, os
+
+# Stored format: "<scheme>$<cost>$<salt>$<hash>" (salt/hash urlsafe base64).
+#   scrypt: cost is log2(N), with r=8, p=1
+#   pbkdf2_sha256: cost is the iteration count
+# Anything else is a legacy plaintext password; it still verifies and is
+# re-hashed on the next successful login.
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+DEFAULT_COST = {SCRYPT: 14, PBKDF2: 600_000}
+SCRYPT_R, SCRYPT_P = 8, 1
+SALT_BYTES = 16
+
+
+def _b64(b):
+    return base64.urlsafe_b64encode(b).decode("ascii").rstrip("=")
+
+
+def _unb64(s):
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+def default_scheme():
+    # hashlib.scrypt needs OpenSSL 1.1+; fall back to PBKDF2 where it is missing
+    return SCRYPT if hasattr(hashlib, "scrypt") else PBKDF2
+
+
+def _derive(scheme, cost, password, salt):
+    pw = password.encode("utf-8")
+    if scheme == SCRYPT:
+        n = 1 << cost
+        return hashlib.scrypt(pw, salt=salt, n=n, r=SCRYPT_R, p=SCRYPT_P,
+                              maxmem=2 * 128 * SCRYPT_R * n + (1 << 20), dklen=32)
+    if scheme == PBKDF2:
+        return hashlib.pbkdf2_hmac("sha256", pw, salt, cost)
+    raise ValueError(f"unknown password scheme {scheme!r}")
+
+
+def hash_password(password, scheme=None, cost=None):
+    scheme = scheme or default_scheme()
+    cost = int(cost or DEFAULT_COST[scheme])
+    salt = os.urandom(SALT_BYTES)
+    return f"{scheme}${cost}${_b64(salt)}${_b64(_derive(scheme, cost, password, salt))}"
+
+
+_dummies = {}
+
+
+def dummy_hash(scheme=None, cost=None):
+    """A hash of a random password, to verify against when a username is unknown.
+
+    Checking it costs as much as checking a real user's hash, so the response
+    time does not give away which usernames exist.
+    """
+    scheme = scheme or default_scheme()
+    key = (scheme, int(cost or DEFAULT_COST[scheme]))
+    if key not in _dummies:
+        _dummies[key] = hash_password(_b64(os.urandom(SALT_BYTES)), *key)
+    return _dummies[key]
+
+
+def _parse(stored):
+    parts = (stored or "").split("$")
+    if len(parts) == 4 and parts[0] in DEFAULT_COST and parts[1].isdigit():
+        return parts[0], int(parts[1]), parts[2], parts[3]
+    return None
+
+
+def is_hashed(stored):
+    return _parse(stored) is not None
+
+
+def verify_password(password, stored):
+    """Check password against a stored hash (or a legacy plaintext value) in constant time."""
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest((password or "").encode("utf-8"), (stored or "").encode("utf-8"))
+    scheme, cost, salt, digest = parsed
+    try:
+        derived = _derive(scheme, cost, password or "", _unb64(salt))
+        return hmac.compare_digest(derived, _unb64(digest))
+    except (ValueError, MemoryError):
+        return False
+
+
+def needs_rehash(stored, scheme=None, cost=None):
+    # plaintext, or hashed with a different scheme/cost than the current setting
+    parsed = _parse(stored)
+    if parsed is None:
+        return True
+    scheme = scheme or default_scheme()
+    return parsed[0] != scheme or parsed[1] != int(cost or DEFAULT_COST[scheme])
@@ -0,0 +1,168 @@
+import io, os, re, threading, time
+from contextlib import contextmanager, nullcontext
+import instrument
+
+# Profiling mode: every user-triggered action (the outermost @instrument.timed
+# handler on a thread) runs under cProfile with tracemalloc snapshots taken
+# around it. Jobs a handler submits to the TaskRunner, and their on_done
+# callbacks, are profiled as further units of the same action, so the report
+# for all_students_report includes the worker that read the file.
+#
+# Each unit is written to <out_dir>/<seq>-<action>.<unit>.prof (open with
+# pstats or snakeviz) next to a .alloc.txt of the top allocation growth.
+# Only one unit is profiled at a time: cProfile cannot run on two threads at
+# once on every Python version, and tracemalloc diffs are process-wide anyway.
+# Units that overlap a running one are recorded with their wall time only.
+
+_out_dir = None
+_top = 25
+_local = threading.local()
+_busy = threading.Lock()
+_lock = threading.Lock()
+_seq = 0
+_last = None
+
+
+class ActionProfile:
+    """One user action and the units (handler, jobs, callbacks) profiled under it."""
+
+    def __init__(self, seq, name):
+        self.seq = seq
+        self.name = name
+        self.started = time.time()
+        self.units = []    # (unit name, wall seconds, pstats.Stats or None, [allocation diff lines])
+
+    def stats(self):
+        import pstats
+        profiled = [st for _, _, st, _ in self.units if st is not None]
+        if not profiled:
+            return None
+        merged = pstats.Stats()
+        merged.add(*profiled)
+        return merged
+
+    def report(self, limit=30):
+        out = io.StringIO()
+        out.write(f"#{self.seq} {self.name}  ({time.strftime('%H:%M:%S', time.localtime(self.started))})\n\n")
+        for unit, wall, st, _ in self.units:
+            out.write(f"  {wall * 1000:9.2f} ms  {unit}{'' if st is not None else '  (not profiled: overlapped)'}\n")
+        merged = self.stats()
+        if merged is not None:
+            out.write("\n---------- cProfile, by cumulative time ----------\n")
+            merged.stream = out
+            merged.sort_stats("cumulative").print_stats(limit)
+        out.write("---------- top allocation growth ----------\n")
+        for unit, _, _, diff in self.units:
+            if diff:
+                out.write(f"[{unit}]\n")
+                out.writelines(line + "\n" for line in diff)
+        return out.getvalue()
+
+
+def enabled():
+    return _out_dir is not None
+
+
+def enable(out_dir="profiles", top=25, frames=8):
+    """Turn profiling mode on; .prof and .alloc.txt files go to out_dir."""
+    global _out_dir, _top
+    import cProfile, pstats, tracemalloc     # loaded now so the first action's diff doesn't show the imports
+    os.makedirs(out_dir, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _out_dir = out_dir
+    _top = top
+    instrument.set_action_hook(action)
+
+
+def disable():
+    global _out_dir
+    import tracemalloc
+    instrument.set_action_hook(None)
+    _out_dir = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def last_action():
+    return _last
+
+
+def current_action():
+    """The action being profiled on this thread (TaskRunner hands it to the jobs it submits)."""
+    return getattr(_local, "action", None) if _out_dir is not None else None
+
+
+def action(name):
+    # the instrument hook: only the outermost timed call on a thread starts an action
+    if _out_dir is None or getattr(_local, "action", None) is not None:
+        return nullcontext()
+    global _seq, _last
+    with _lock:
+        _seq += 1
+        act = _last = ActionProfile(_seq, name)
+    return _unit(act, name)
+
+
+def unit(act, prefix, fn):
+    """Profile fn's run as part of act; a no-op when act is None (profiling off or no action)."""
+    if act is None or _out_dir is None:
+        return nullcontext()
+    return _unit(act, prefix + instrument.label(fn))
+
+
+@contextmanager
+def _unit(act, name):
+    import cProfile
+    outer = getattr(_local, "action", None)
+    _local.action = act
+    profiled = _busy.acquire(blocking=False)
+    prof = before = after = None
+    start = time.perf_counter()
+    try:
+        if profiled:
+            before = _snapshot()
+            prof = cProfile.Profile()
+            start = time.perf_counter()
+            prof.enable()
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        if profiled:
+            prof.disable()
+            after = _snapshot()
+            _busy.release()
+        _local.action = outer
+        _record(act, name, wall, prof, before, after)
+
+
+def _snapshot():
+    import tracemalloc
+    # leave out the profiler's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                      tracemalloc.Filter(False, __file__)))
+
+
+def _record(act, name, wall, prof, before, after):
+    import pstats
+    stats, diff = None, []
+    if prof is not None:
+        stats = pstats.Stats(prof)
+        diff = [str(d) for d in after.compare_to(before, "lineno")[:_top] if d.size_diff > 0]
+        _dump(act, name, prof, diff)
+    with _lock:
+        act.units.append((name, wall, stats, diff))
+
+
+def _dump(act, unit_name, prof, diff):
+    out_dir = _out_dir
+    if out_dir is None:
+        return
+    safe = lambda s: re.sub(r"[^A-Za-z0-9_.-]+", "_", s)[:80]
+    base = os.path.join(out_dir, f"{act.seq:05d}-{safe(act.name)}.{safe(unit_name)}")
+    try:
+        prof.dump_stats(base + ".prof")
+        with open(base + ".alloc.txt", "w") as f:
+            f.write("\n".join(diff) + "\n")
+    except OSError:
+        pass     # a full or read-only disk must not break the action being profiled
@@ -0,0 +1,897 @@
+import csv, io, locale, os, random, threading, time
+from array import array
+from bisect import bisect_left, insort
+from contextlib import nullcontext
+import instrument, parallel_load
+from file_lock import FileLock
+from grading import grade_to_gpa_point, parse_marks
+from record_table import RecordTable, StudentAggregate
+
+HEADER = ["ID", "Name", "CourseCode", "Marks", "Grade"]
+
+# journal ops: U = upsert (full row follows), D = delete (ID, CourseCode follow)
+OP_UPSERT = "U"
+OP_DELETE = "D"
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _tmp_path(path):
+    # unique per process and thread: other copies of the app may be writing the same file
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _complete_len(data):
+    """Bytes of data up to the end of its last complete line (quoted fields may hold newlines).
+
+    Anything after that is an entry a crash cut off part way through writing.
+    """
+    if not data or data.endswith(b"\n"):
+        return len(data)
+    end = pos = quotes = 0
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            return end
+        quotes += data.count(b'"', pos, nl + 1)
+        pos = nl + 1
+        if quotes % 2 == 0:
+            end = pos
+
+
+def _decoded_rows(data):
+    # decode as open(path, "r") would
+    return csv.reader(io.StringIO(data.decode(locale.getpreferredencoding(False)), newline=""))
+
+
+def _write_tmp(path, rows, header=HEADER):
+    tmp = _tmp_path(path)
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def write_snapshot(path, rows, header=HEADER):
+    # write to a temp file and swap it in so a crash never leaves a half-written file
+    os.replace(_write_tmp(path, rows, header), path)
+
+
+class WriteConflict(RuntimeError):
+    """Another process kept changing the file while a write was being applied."""
+
+
+def read_aggregates(path, sig):
+    # returns the persisted aggregates, or None if missing or written for other data
+    try:
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            head = next(reader, None)
+            if head != ["sig", repr(sig)]:
+                return None
+            aggs = {}
+            for r in reader:
+                aggs[r[0]] = StudentAggregate(r[1], int(r[2]), float(r[3]), float(r[4]),
+                                              float(r[5]), float(r[6]))
+            return aggs
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def write_aggregates(path, sig, aggs):
+    tmp = _tmp_path(path)
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["sig", repr(sig)])
+        for sid, a in aggs.items():
+            writer.writerow([sid, a.name, a.count, repr(a.sum_marks), repr(a.sum_points),
+                             repr(a.min_marks), repr(a.max_marks)])
+    os.replace(tmp, path)
+
+
+def _accumulate(aggs, row):
+    if len(row) < 5:
+        return
+    m = parse_marks(row[3])
+    a = aggs.get(row[0])
+    if a is None:
+        # a student is named by their first complete row in file order
+        a = aggs[row[0]] = StudentAggregate(row[1])
+    a.count += 1
+    a.sum_marks += m
+    a.sum_points += grade_to_gpa_point(row[4])
+    if a.min_marks is None or m < a.min_marks:
+        a.min_marks = m
+    if a.max_marks is None or m > a.max_marks:
+        a.max_marks = m
+
+
+def _prefix_end(prefix):
+    # smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SortedKeys:
+    """Sorted copy of a dict's keys for prefix range scans.
+
+    Built on first use. New keys are appended and the list re-sorted before
+    the next scan (timsort merges the short unsorted tail in about linear
+    time); removals only mark it for a compaction pass on that re-sort.
+    """
+
+    def __init__(self):
+        self.keys = None
+        self._dirty = False
+        self._removed = False
+
+    def reset(self):
+        self.keys = None
+        self._dirty = self._removed = False
+
+    def added(self, key):
+        if self.keys is not None:
+            self.keys.append(key)
+            self._dirty = True
+
+    def discarded(self):
+        if self.keys is not None:
+            self._dirty = self._removed = True
+
+    def sorted(self, source):
+        if self.keys is None:
+            self.keys = sorted(source)
+        elif self._dirty:
+            keys = self.keys
+            keys.sort()
+            if self._removed:
+                # drop keys that left source and duplicates of ones that came back
+                self.keys = [k for i, k in enumerate(keys) if k in source and (i == 0 or keys[i - 1] != k)]
+            self._dirty = self._removed = False
+        return self.keys
+
+    def prefix(self, source, prefix):
+        keys = self.sorted(source)
+        if not prefix:
+            return list(keys)
+        return keys[bisect_left(keys, prefix):bisect_left(keys, _prefix_end(prefix))]
+
+
+class RecordStore:
+    """In-memory copy of students.csv with hash indexes.
+
+    The file is parsed once and reloaded only when its mtime or size changes.
+    Rows are held column by column in a RecordTable (record_table.py), one
+    slot per (ID, CourseCode); the indexes map IDs and lower-cased names to
+    slot arrays. Lookups hand back fresh [ID, Name, CourseCode, Marks, Grade]
+    lists, so report code consumes them unchanged. Slots of deleted rows are
+    reclaimed once they outnumber the live ones.
+
+    With journal=True, edits are appended to an fsync'd log next to the CSV
+    instead of rewriting it, and a background thread folds the log back into
+    the CSV once it holds compact_every entries.
+
+    Per-student aggregates (count, sum of marks, sum of GPA points, min, max)
+    are kept up to date on every upsert/delete and written to <path>.agg by
+    close(), so the all-students summary costs O(students) rather than O(rows).
+    A student's name is the one on their first complete row in file order.
+
+    close() also writes a binary snapshot to <path>.snap (binary_snapshot.py).
+    Until the CSV has been parsed, lookups, searches and len() are answered
+    from that snapshot through mmap when its signature still matches the
+    files on disk; the first write, or any change to the CSV, falls back to
+    parsing it. Pass snapshot=False to never read or write one.
+
+    With load_workers other than 1, a CSV of parallel_load.MIN_PARALLEL_BYTES
+    or more is parsed by a process pool (parallel_load.py) and indexed here
+    in file order as the chunks come back.
+
+    Other copies of the app may share the files. Writes take the <path>.lock
+    file lock (file_lock.py) and are checked against the version counter it
+    holds, so a write based on rows another process has since changed is
+    redone rather than lost (see _write). Reloads after another process's
+    appends read only the new tail. In journal mode every edit is an append,
+    which is why it holds up best when several admins write at once.
+    locking=False turns all of this off.
+    """
+
+    OPTIMISTIC_TRIES = 1
+    RECLAIM_MIN = 4096     # dead slots tolerated before reclaiming, however few live ones there are
+
+    def __init__(self, path, journal=False, compact_every=1000, snapshot=True, load_workers=1,
+                 locking=True, optimistic_tries=None):
+        self.path = path
+        self.journal = journal
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._journal_len = 0
+        self._sig = None
+        self._table = RecordTable()   # the rows, one slot each; slot order is file order
+        self._by_id = {}     # ID -> array of its slots, in file order
+        self._by_name = {}   # lower-cased Name -> array of its slots, in file order
+        self._id_keys = SortedKeys()     # sorted _by_id keys, built on the first prefix search
+        self._name_keys = SortedKeys()   # sorted _by_name keys
+        self._agg = {}       # ID -> StudentAggregate
+        self._agg_stale = set()   # IDs whose name/min/max must be recomputed after a removal
+        self.agg_path = path + ".agg"
+        self.snapshot = snapshot
+        self.load_workers = load_workers    # processes parsing a large CSV (0/None: one per CPU)
+        self._flock = FileLock(path) if locking else None
+        self.optimistic_tries = self.OPTIMISTIC_TRIES if optimistic_tries is None else optimistic_tries
+        self.conflicts = 0     # writes redone because another process wrote first
+        self._busy = False     # recent conflicts or lock waits: skip the optimistic attempt
+        self._tail_pos = 0     # bytes of the CSV (journal, in journal mode) already loaded
+        self.snapshot_path = path + ".snap"
+        self._mapped = None        # binary_snapshot.MappedTable for _mapped_sig
+        self._mapped_sig = None
+
+    # ---------- loading ----------
+    def _stat_sig(self):
+        # the lock file's (version, epoch) catches changes that leave mtime and size alike
+        state = self._flock.state() if self._flock is not None else None
+        if not self.journal:
+            return (state, _file_sig(self.path))
+        return (state, _file_sig(self.path), _file_sig(self.journal_path),
+                _file_sig(self.journal_path + ".compacting"))
+
+    def refresh(self):
+        with self._lock:
+            sig = self._stat_sig()
+            if sig is not None and sig == self._sig:
+                return
+            # shared lock: no writer can be half way through an append while we read
+            with self._flock.shared() if self._flock is not None else nullcontext():
+                sig = self._stat_sig()
+                if not self._catch_up(sig):
+                    self._load()
+                self._sig = sig
+            # parsed rows answer from here on; a search still walking the map keeps it alive
+            self._mapped = self._mapped_sig = None
+            if self.journal and os.path.exists(self.journal_path + ".compacting"):
+                self._finish_abandoned_compaction()
+
+    def _load(self):
+        self._table = RecordTable()
+        self._by_id = {}
+        self._by_name = {}
+        self._id_keys.reset()
+        self._name_keys.reset()
+        self._agg = {}
+        self._agg_stale = set()
+        self._journal_len = 0
+        if os.path.exists(self.path):
+            count = 0
+            # chunks parsed in worker processes arrive in file order, so later rows still win
+            for r in parallel_load.read_rows(self.path, self.load_workers):
+                self._index(r)
+                count += 1
+            if instrument.enabled():
+                instrument.add(rows=count, nbytes=os.path.getsize(self.path))
+        if self.journal:
+            # a leftover .compacting log means a compaction was interrupted; its
+            # entries are older than the live journal, and replays are idempotent
+            self._replay(self.journal_path + ".compacting")
+            self._journal_len = self._replay(self.journal_path)
+        else:
+            self._tail_pos = _size(self.path)
+
+    def _appendable(self):
+        # the one file that writes append to rather than replace
+        return self.journal_path if self.journal else self.path
+
+    def _catch_up(self, sig):
+        """Apply just what other processes appended since the last load; False if a full load is needed."""
+        old = self._sig
+        if self._flock is None or old is None or old[0] is None or sig[0] is None or old[0][1] != sig[0][1]:
+            return False    # nothing loaded yet, counters unreadable, or a file was replaced (new epoch)
+        if self.journal and (old[1] != sig[1] or old[3] != sig[3]):
+            return False
+        if _size(self._appendable()) < self._tail_pos:
+            return False
+        try:
+            with open(self._appendable(), "rb") as f:
+                f.seek(self._tail_pos)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        if self.journal:
+            data = data[:_complete_len(data)]
+        entries = _decoded_rows(data)
+        if self.journal:
+            count = self._apply_journal(entries)
+            self._journal_len += count
+        else:
+            count = 0
+            for r in entries:
+                if r:
+                    self._index(r)
+                    count += 1
+        self._tail_pos += len(data)
+        if instrument.enabled():
+            instrument.add(rows=count, nbytes=len(data))
+        return True
+
+    def _replay(self, path):
+        """Apply a journal file; returns its entry count and leaves _tail_pos after the last whole one."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._tail_pos = 0
+            return 0
+        # a final entry without its line end was cut off by a crash: skip it
+        self._tail_pos = _complete_len(data)
+        count = self._apply_journal(_decoded_rows(data[:self._tail_pos]))
+        if instrument.enabled():
+            instrument.add(rows=count, nbytes=len(data))
+        return count
+
+    def _apply_journal(self, entries):
+        count = 0
+        for entry in entries:
+            if not entry:
+                continue
+            op, data = entry[0], entry[1:]
+            if op == OP_UPSERT and len(data) >= len(HEADER):
+                self._index(data)
+            elif op == OP_DELETE and len(data) >= 2:
+                slot = self._slot(data[0], data[1])
+                if slot is not None:
+                    self._unindex(slot)
+            count += 1
+        return count
+
+    @staticmethod
+    def _key(row):
+        return (row[0], row[2] if len(row) > 2 else "")
+
+    def _slot(self, sid, course):
+        # a student has a handful of rows, so their slots are scanned rather than hashed
+        slots = self._by_id.get(sid)
+        if slots is None:
+            return None
+        code = self._table.courses.codes.get(course)
+        if code is None:
+            return None
+        course_col = self._table.course_col
+        for i in slots:
+            if course_col[i] == code:
+                return i
+        return None
+
+    def _index(self, row):
+        table = self._table
+        slot = self._slot(*self._key(row))
+        renamed = True
+        if slot is not None:
+            old = table.row(slot)
+            self._agg_remove(old)
+            renamed = len(old) < 2 or len(row) < 2 or old[1].lower() != row[1].lower()
+            if len(old) > 1 and renamed:
+                self._drop_name(old[1], slot)
+            if len(old) < 5 <= len(row):
+                # a short row made complete in place may now be the student's first complete row
+                self._agg_stale.add(old[0])
+            # overwriting keeps a replaced row at its original file position
+            table.set(slot, row)
+        else:
+            slot = table.append(row)
+            sid = table.sid(slot)     # the pooled string, so the index holds no copy of its own
+            slots = self._by_id.get(sid)
+            if slots is None:
+                slots = self._by_id[sid] = array("i")
+                self._id_keys.added(sid)
+            slots.append(slot)
+        if len(row) > 1 and renamed:
+            name = row[1].lower()
+            slots = self._by_name.get(name)
+            if slots is None:
+                slots = self._by_name[name] = array("i")
+                self._name_keys.added(name)
+            insort(slots, slot)
+        self._agg_add(row)
+
+    def _unindex(self, slot):
+        table = self._table
+        row = table.row(slot)
+        self._agg_remove(row)
+        slots = self._by_id.get(row[0])
+        if slots is not None:
+            slots.remove(slot)
+            if not slots:
+                del self._by_id[row[0]]
+                self._id_keys.discarded()
+        if len(row) > 1:
+            self._drop_name(row[1], slot)
+        table.delete(slot)
+        if table.dead > self.RECLAIM_MIN and table.dead > len(table):
+            self._reclaim()
+
+    def _drop_name(self, name, slot):
+        slots = self._by_name.get(name.lower())
+        if slots is not None and slot in slots:
+            slots.remove(slot)
+            if not slots:
+                del self._by_name[name.lower()]
+                self._name_keys.discarded()
+
+    def _reclaim(self):
+        # copy the live slots into a fresh table and renumber the indexes to match
+        table = self._table
+        keep = table.live_slots()
+        moved = array("i", bytes(4 * table.slots()))
+        for new, old in enumerate(keep):
+            moved[old] = new
+        self._table = table.copy(keep)
+        for index in (self._by_id, self._by_name):
+            for key, slots in index.items():
+                index[key] = array("i", (moved[i] for i in slots))
+
+    def _rows_at(self, slots):
+        row = self._table.row
+        return [row(i) for i in slots]
+
+    # ---------- aggregates ----------
+    def _agg_add(self, row):
+        _accumulate(self._agg, row)
+
+    def _agg_remove(self, row):
+        if len(row) < 5:
+            return
+        a = self._agg.get(row[0])
+        if a is None:
+            return
+        a.count -= 1
+        if a.count <= 0:
+            del self._agg[row[0]]
+            self._agg_stale.discard(row[0])
+            return
+        m = parse_marks(row[3])
+        a.sum_marks -= m
+        a.sum_points -= grade_to_gpa_point(row[4])
+        if m == a.min_marks or m == a.max_marks or row[1] == a.name:
+            # removing an extreme, or maybe the naming row, needs a rescan of this
+            # student's rows; defer it to the next read
+            self._agg_stale.add(row[0])
+
+    def _fix_stale(self):
+        for sid in self._agg_stale:
+            a = self._agg.get(sid)
+            if a is None:
+                continue
+            # _by_id keeps each student's slots in file order
+            rows = [r for r in self._rows_at(self._by_id.get(sid, ())) if len(r) >= 5]
+            marks = [parse_marks(r[3]) for r in rows]
+            a.name = rows[0][1]
+            a.min_marks = min(marks)
+            a.max_marks = max(marks)
+        self._agg_stale.clear()
+
+    def student_aggregates(self):
+        """Return {ID: StudentAggregate} (copies), in first-seen order."""
+        with self._lock:
+            if self._sig is None:
+                # nothing parsed yet: the persisted aggregates answer without reading the CSV
+                persisted = read_aggregates(self.agg_path, self._stat_sig())
+                if persisted is not None:
+                    return persisted
+            self.refresh()
+            self._fix_stale()
+            return {sid: a.copy() for sid, a in self._agg.items()}
+
+    def student_aggregate(self, sid):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                aggs = {}
+                for row in mapped.records_for_id(sid):
+                    _accumulate(aggs, row)
+                return aggs.get(sid)
+            self.refresh()
+            self._fix_stale()
+            a = self._agg.get(sid)
+            return a.copy() if a is not None else None
+
+    def save_aggregates(self):
+        with self._lock:
+            if self._sig is None:
+                return
+            self._fix_stale()
+            try:
+                write_aggregates(self.agg_path, self._sig, self._agg)
+            except OSError:
+                pass    # the cache is optional; it is rebuilt from the rows next time
+
+    # ---------- binary snapshot ----------
+    def _mapped_table(self):
+        """The snapshot matching the files on disk, while nothing has been parsed yet."""
+        if self._sig is not None or not self.snapshot:
+            return None
+        sig = self._stat_sig()
+        if sig != self._mapped_sig:
+            import binary_snapshot
+            if self._mapped is not None:
+                self._mapped.close()
+            self._mapped = binary_snapshot.open_snapshot(self.snapshot_path, sig) if sig is not None else None
+            self._mapped_sig = sig
+        return self._mapped
+
+    def save_snapshot(self):
+        """Write <path>.snap from the loaded rows unless an up-to-date one exists."""
+        with self._lock:
+            if self._sig is None or not self.snapshot:
+                return
+            import binary_snapshot
+            current = binary_snapshot.open_snapshot(self.snapshot_path, self._sig)
+            if current is not None:
+                current.close()
+                return
+            if self._mapped is not None:
+                self._mapped.close()    # the old file is about to be replaced under it
+                self._mapped = self._mapped_sig = None
+            try:
+                binary_snapshot.write_snapshot(self.snapshot_path, self._table, self._sig)
+            except OSError:
+                pass    # like the .agg cache, the snapshot is optional
+
+    # lookups take the lock too, since GUI work runs on background threads
+    def records_for_id(self, sid):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                found = mapped.records_for_id(sid)
+            else:
+                self.refresh()
+                found = self._rows_at(self._by_id.get(sid, ()))
+        instrument.add(rows=len(found))
+        return found
+
+    def records_for_name(self, name):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                found = mapped.records_for_name(name)
+            else:
+                self.refresh()
+                found = self._rows_at(self._by_name.get((name or "").lower(), ()))
+        instrument.add(rows=len(found))
+        return found
+
+    def search(self, text, mode="prefix", chunk=2000):
+        """Yield lists of matching rows, one list per chunk of the index walked.
+
+        mode "prefix": IDs starting with text (sorted ID index); "name": names
+        starting with text, case-insensitive (sorted name index); "substring":
+        text anywhere in the ID or name, case-insensitive; "id": exact ID.
+        Matches come in ID (or name) order. The lock is taken per chunk, not
+        across yields, so writers are never blocked by a slow consumer; rows
+        changed mid-search may or may not be seen.
+        """
+        text = (text or "").strip()
+        with self._lock:
+            mapped = self._mapped_table()
+        if mapped is not None:
+            for found in mapped.search(text, mode, chunk):
+                instrument.add(rows=len(found))
+                yield found
+            return
+        with self._lock:
+            self.refresh()
+            if mode == "prefix":
+                keys = self._id_keys.prefix(self._by_id, text)
+            elif mode == "name":
+                keys = self._name_keys.prefix(self._by_name, text.lower())
+            elif mode == "substring":
+                keys = list(self._id_keys.sorted(self._by_id))
+            elif mode == "id":
+                keys = [text]
+            else:
+                raise ValueError(f"unknown search mode {mode!r}")
+        needle = text.lower()
+        for i in range(0, len(keys), chunk):
+            part = keys[i:i + chunk]
+            with self._lock:
+                if mode == "name":
+                    found = [r for n in part for r in self._rows_at(self._by_name.get(n, ()))]
+                elif mode == "substring":
+                    found = []
+                    name = self._table.name
+                    for sid in part:
+                        slots = self._by_id.get(sid)
+                        if slots and (needle in sid.lower() or
+                                      any(needle in (name(i) or "").lower() for i in slots)):
+                            found.extend(self._rows_at(slots))
+                else:
+                    found = [r for sid in part for r in self._rows_at(self._by_id.get(sid, ()))]
+            instrument.add(rows=len(part) if mode == "substring" else len(found))
+            yield found
+
+    def get(self, sid, course):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                return mapped.get(sid, course)
+            self.refresh()
+            slot = self._slot(sid, course)
+            return self._table.row(slot) if slot is not None else None
+
+    def all_records(self):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                found = mapped.all_records()
+            else:
+                self.refresh()
+                found = list(self._table.rows())
+        instrument.add(rows=len(found))
+        return found
+
+    def __len__(self):
+        with self._lock:
+            mapped = self._mapped_table()
+            if mapped is not None:
+                return len(mapped)
+            self.refresh()
+            return len(self._table)
+
+    # ---------- writes ----------
+    # Other processes may share these files. Every write is a read-modify-write
+    # run by _write: apply the change to rows freshly loaded from disk, write
+    # out the new CSV if needed, then, under the file lock, check that nobody
+    # else has written since those rows were loaded. If nobody has, commit;
+    # otherwise reload and start over.
+
+    def _write(self, apply, optimistic=True):
+        """Run apply() as one optimistic read-modify-write; returns its result.
+
+        apply() changes the in-memory rows and returns (result, op, arg). op
+        says what reaches the disk: "append" (arg: a CSV row), "journal" (arg:
+        a journal entry), "rewrite" (the whole CSV, swapped in atomically; arg:
+        True to drop the journal too) or None (nothing changed). The new CSV
+        is written before the lock is taken, so the lock is held only for the
+        version check and the swap. After optimistic_tries conflicts (or the
+        first one, for an append or journal entry), a last attempt holds the
+        lock throughout, so a busy file cannot starve a writer. WriteConflict
+        means even that failed: a writer that ignores the lock changed the file.
+
+        A conflict costs a full reload, since apply() already changed the rows.
+        Callers expecting an append pass optimistic=False and hold the lock
+        from the start: catching up on the other writers' appends is cheap.
+        After a conflict every write does that, until the lock is next taken
+        without waiting for another process.
+        """
+        with self._lock:
+            tries = self.optimistic_tries if self._flock is not None else 0
+            attempt = 0 if optimistic and not self._busy else tries
+            while True:
+                pessimistic = attempt >= tries
+                waits = self._flock.contended if self._flock is not None else 0
+                with self._flock if (pessimistic and self._flock is not None) else nullcontext():
+                    self.refresh()
+                    loaded = self._sig
+                    tmp = None
+                    try:
+                        result, op, arg = apply()
+                        if op is None:
+                            return result
+                        if op == "rewrite":
+                            tmp = _write_tmp(self.path, self._table.rows())
+                        with self._flock if self._flock is not None else nullcontext():
+                            if self._flock is None or self._stat_sig() == loaded:
+                                self._commit(op, arg, tmp)
+                                tmp = None
+                                if self._flock is not None:
+                                    self._flock.bump(epoch=op == "rewrite")
+                                self._sig = self._stat_sig()
+                                self._tail_pos = _size(self._appendable())
+                                self._busy = self._flock is not None and self._flock.contended > waits
+                                break
+                    except BaseException:
+                        self._sig = None    # memory no longer matches disk; reload on next access
+                        raise
+                    finally:
+                        if tmp is not None:
+                            os.remove(tmp)
+                    # another process wrote first: reload and apply the change again
+                    self._sig = None
+                    self.conflicts += 1
+                    self._busy = True
+                if pessimistic:
+                    raise WriteConflict(f"{self.path} changed during a write that held its lock")
+                # an append or journal entry costs nothing to prepare, so a retry may as
+                # well hold the lock; only a full rewrite is worth another optimistic try
+                attempt = attempt + 1 if op == "rewrite" else tries
+                with instrument.span("store:write_retry"):     # counts conflicts and their back-off
+                    time.sleep(random.uniform(0, 0.002 * 2 ** attempt))
+            if op == "journal":
+                self._journal_len += 1
+                if self._journal_len >= self.compact_every:
+                    self.compact(wait=False)
+            return result
+
+    def _commit(self, op, arg, tmp):
+        if op == "append":
+            with open(self.path, "a", newline="") as f:
+                csv.writer(f).writerow(arg)
+        elif op == "journal":
+            self._trim_torn_entry()
+            with open(self.journal_path, "a", newline="") as f:
+                csv.writer(f).writerow(arg)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            os.replace(tmp, self.path)
+            if arg and os.path.exists(self.journal_path):
+                # entries journaled since the last compaction are in memory, so the new CSV has them
+                os.remove(self.journal_path)
+                self._journal_len = 0
+
+    def _trim_torn_entry(self):
+        # an entry left without its line end by a crash would swallow the next one
+        try:
+            with open(self.journal_path, "rb+") as f:
+                if f.seek(0, os.SEEK_END) == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) == b"\n":
+                    return
+                f.seek(0)
+                f.truncate(_complete_len(f.read()))
+        except FileNotFoundError:
+            pass
+
+    def upsert(self, row):
+        """Insert or replace the row for (ID, CourseCode); returns True if it replaced one."""
+        row = list(row)
+
+        def apply():
+            existed = self._slot(*self._key(row)) is not None
+            self._index(row)
+            if self.journal:
+                return existed, "journal", [OP_UPSERT] + row
+            return existed, ("rewrite" if existed else "append"), row
+        # a guess from possibly stale rows; it only picks the locking strategy
+        with self._lock:
+            known = self._slot(*self._key(row)) is not None
+        return self._write(apply, optimistic=not self.journal and known)
+
+    def delete(self, sid, course):
+        def apply():
+            slot = self._slot(sid, course)
+            if slot is None:
+                return False, None, None
+            self._unindex(slot)
+            if self.journal:
+                return True, "journal", [OP_DELETE, sid, course]
+            return True, "rewrite", False
+        return self._write(apply, optimistic=not self.journal)
+
+    def bulk_upsert(self, rows):
+        """Apply many upserts, then write them all with one atomic file swap.
+
+        Returns (inserted, updated).
+        """
+        rows = [list(row) for row in rows]     # may be re-applied after a conflict
+        self.compact(wait=True)
+
+        def apply():
+            inserted = updated = 0
+            for row in rows:
+                if self._slot(*self._key(row)) is not None:
+                    updated += 1
+                else:
+                    inserted += 1
+                self._index(row)
+            return (inserted, updated), "rewrite", self.journal
+        return self._write(apply)
+
+    def _rewrite(self):
+        write_snapshot(self.path, self._table.rows())
+        self._sig = self._stat_sig()
+
+    def lock_stats(self):
+        """File lock counters for this store (None without locking), plus write conflicts."""
+        if self._flock is None:
+            return None
+        return dict(self._flock.stats(), conflicts=self.conflicts)
+
+    # ---------- journal ----------
+    def compact(self, wait=True):
+        """Fold the journal into a fresh CSV snapshot."""
+        if not self.journal:
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                compactor = self._compactor
+            else:
+                with self._flock if self._flock is not None else nullcontext():
+                    # the rows written out must include every entry in the log being rotated
+                    self.refresh()
+                    compacting = self.journal_path + ".compacting"
+                    if not os.path.exists(self.journal_path) or os.path.exists(compacting):
+                        return      # nothing to fold, or another process is folding it
+                    guard = None
+                    if self._flock is not None:
+                        # held until the swap, so other processes can tell a running
+                        # compaction from one whose process died. Never waited for while
+                        # the file lock is held: the holder may be waiting for that lock.
+                        guard = FileLock(compacting)
+                        if not guard.acquire(blocking=False):
+                            guard.close()
+                            return
+                    # rotate the log so new edits keep landing in a fresh journal
+                    # while the snapshot is written
+                    os.replace(self.journal_path, compacting)
+                    if self._flock is not None:
+                        self._flock.bump(epoch=True)
+                    self._sig = self._stat_sig()
+                    self._tail_pos = 0
+                    self._journal_len = 0
+                    # a copy of the columns, so edits made while it is written do not leak in
+                    table = self._table.copy()
+                compactor = threading.Thread(target=self._compact_worker, args=(table, guard), daemon=True)
+                self._compactor = compactor
+                compactor.start()
+        if wait:
+            compactor.join()
+
+    def _compact_worker(self, table, guard):
+        tmp = _write_tmp(self.path, table.rows())
+        try:
+            with self._lock, self._flock if self._flock is not None else nullcontext():
+                current = self._sig == self._stat_sig()
+                os.replace(tmp, self.path)
+                os.remove(self.journal_path + ".compacting")
+                if self._flock is not None:
+                    self._flock.bump(epoch=True)
+                # other processes may have journaled edits this one has not loaded yet
+                self._sig = self._stat_sig() if current else None
+        finally:
+            if guard is not None:
+                guard.close()
+
+    def _finish_abandoned_compaction(self):
+        # a .compacting log nobody holds the guard on was left by a compaction that died
+        # part way; the rows just loaded include it, so write them out and drop it
+        compacting = self.journal_path + ".compacting"
+        guard = FileLock(compacting) if self._flock is not None else None
+        if guard is not None and not guard.acquire(blocking=False):
+            guard.close()
+            return      # another process is still compacting; its log was replayed above
+        try:
+            with self._flock if self._flock is not None else nullcontext():
+                if self._sig != self._stat_sig() or not os.path.exists(compacting):
+                    self._sig = None    # changed meanwhile; the next refresh sorts it out
+                    return
+                self._rewrite()
+                os.remove(compacting)
+                if self._flock is not None:
+                    self._flock.bump(epoch=True)
+                self._sig = self._stat_sig()
+        finally:
+            if guard is not None:
+                guard.close()
+
+    def close(self):
+        self.compact(wait=True)
+        self.save_aggregates()
+        self.save_snapshot()
+        if self._flock is not None:
+            self._flock.close()
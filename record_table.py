@@ -0,0 +1,377 @@
+import csv
+from array import array
+from bisect import bisect_left
+from grading import grade_to_gpa_point, parse_marks
+
+
+def _np():
+    # numpy is optional here: every column op has a pure-Python fallback
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class StudentAggregate:
+    """Running totals for one student's complete (5-column) grade rows."""
+
+    __slots__ = ("name", "count", "sum_marks", "sum_points", "min_marks", "max_marks")
+
+    def __init__(self, name, count=0, sum_marks=0.0, sum_points=0.0, min_marks=None, max_marks=None):
+        self.name = name
+        self.count = count
+        self.sum_marks = sum_marks
+        self.sum_points = sum_points
+        self.min_marks = min_marks
+        self.max_marks = max_marks
+
+    @property
+    def avg_marks(self):
+        return self.sum_marks / self.count if self.count else 0.0
+
+    @property
+    def gpa(self):
+        return self.sum_points / self.count if self.count else 0.0
+
+    def copy(self):
+        return StudentAggregate(self.name, self.count, self.sum_marks, self.sum_points,
+                                self.min_marks, self.max_marks)
+
+
+class StringPool:
+    """Dictionary encoding: each distinct string is stored once and referred to by an int code."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []     # code -> string
+        self.codes = {}      # string -> code
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RecordTable:
+    """Grade records stored column by column instead of as one list per row.
+
+    ID, Name and CourseCode are dictionary-encoded into int32 code columns
+    (array('i')), Marks are parsed once into a float32 column (array('f')) and
+    Grade is a uint8 code. The Marks text is dictionary-encoded too, since
+    marks take few distinct values, and each row keeps its field count, so
+    row() gives back exactly the list it was given: "85" stays "85", "N/A"
+    stays "N/A" and a short row stays short. Unparseable or missing marks
+    count as 0.0 in the float column, as parse_marks makes them everywhere
+    else. A 5-column row costs 22 bytes plus its share of the distinct
+    strings, against ~350 bytes for a list of five str objects.
+
+    Filtering and aggregation run on the columns (through zero-copy numpy
+    views when numpy is installed). Rows shorter than five columns are left
+    out of the per-student aggregates, as in RecordStore; aggregates use the
+    Marks parsed from their text, not the float32 column.
+
+    Rows are numbered by slot. append() adds a slot, set() overwrites one in
+    place and delete() marks one dead (field count 0); dead slots are skipped
+    by rows(), where() and len() until copy() drops them. The table knows
+    nothing about keys: RecordStore keeps one slot per (ID, CourseCode) and
+    its indexes map IDs and names to slots. Strings stay in the pools once
+    added.
+    """
+
+    MISSING_GRADE = None
+    _COLUMNS = ("id_col", "name_col", "course_col", "marks", "grade_col", "marks_col", "width")
+
+    def __init__(self):
+        self.ids = StringPool()
+        self.names = StringPool()
+        self.courses = StringPool()
+        self.grades = StringPool()
+        self.marks_text = StringPool()
+        self._missing = self.grades.encode(self.MISSING_GRADE)    # code 0: short row
+        self.id_col = array("i")
+        self.name_col = array("i")
+        self.course_col = array("i")
+        self.marks = array("f")
+        self.grade_col = array("B")
+        self.marks_col = array("i")    # code of the Marks text
+        self.width = array("B")        # fields in the row, up to 5; 0 for a deleted slot
+        self.extra = {}                # slot -> fields past the fifth
+        self.marks_value = []          # Marks text code -> parse_marks of it
+        self.dead = 0                  # deleted slots
+
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def from_csv(cls, path):
+        # rows go straight into the columns; no list of rows is ever held
+        table = cls()
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            table.extend(r for r in reader if r)
+        return table
+
+    # ---------- building ----------
+    def _marks_code(self, text):
+        code = self.marks_text.encode(text)
+        if code == len(self.marks_value):
+            self.marks_value.append(parse_marks(text))
+        return code
+
+    def _grade_code(self, row):
+        grade = self.grades.encode(row[4]) if len(row) > 4 else self._missing
+        if grade > 255:
+            raise ValueError("more than 255 distinct grades")
+        return grade
+
+    def append(self, row):
+        """Add row in a new slot at the end; returns the slot."""
+        n = len(row)
+        grade = self._grade_code(row)
+        marks = self._marks_code(row[3] if n > 3 else "")
+        self.id_col.append(self.ids.encode(row[0]))
+        self.name_col.append(self.names.encode(row[1] if n > 1 else ""))
+        self.course_col.append(self.courses.encode(row[2] if n > 2 else ""))
+        self.marks.append(self.marks_value[marks])
+        self.marks_col.append(marks)
+        self.grade_col.append(grade)
+        slot = len(self.width)
+        if n > 5:
+            self.extra[slot] = list(row[5:])
+        self.width.append(min(n, 5))
+        return slot
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def set(self, slot, row):
+        """Overwrite the row in slot (live or dead) with row."""
+        n = len(row)
+        grade = self._grade_code(row)
+        marks = self._marks_code(row[3] if n > 3 else "")
+        self.id_col[slot] = self.ids.encode(row[0])
+        self.name_col[slot] = self.names.encode(row[1] if n > 1 else "")
+        self.course_col[slot] = self.courses.encode(row[2] if n > 2 else "")
+        self.marks[slot] = self.marks_value[marks]
+        self.marks_col[slot] = marks
+        self.grade_col[slot] = grade
+        if n > 5:
+            self.extra[slot] = list(row[5:])
+        else:
+            self.extra.pop(slot, None)
+        if not self.width[slot]:
+            self.dead -= 1
+        self.width[slot] = min(n, 5)
+
+    def delete(self, slot):
+        if self.width[slot]:
+            self.width[slot] = 0
+            self.grade_col[slot] = self._missing     # keeps it out of the aggregates
+            self.extra.pop(slot, None)
+            self.dead += 1
+
+    def __len__(self):
+        return len(self.width) - self.dead
+
+    def slots(self):
+        """Slot count, dead ones included."""
+        return len(self.width)
+
+    def live_slots(self):
+        return array("i", (i for i, w in enumerate(self.width) if w))
+
+    def copy(self, keep=None):
+        """A table with just the slots in keep (default: the live ones), renumbered from 0.
+
+        The copy shares this table's string pools: they only ever grow, and
+        codes never change, so the copy can be read while this table is
+        written to.
+        """
+        t = RecordTable.__new__(RecordTable)
+        t.ids, t.names, t.courses = self.ids, self.names, self.courses
+        t.grades, t.marks_text = self.grades, self.marks_text
+        t._missing, t.marks_value, t.dead = self._missing, self.marks_value, 0
+        if keep is None and not self.dead:
+            for name in self._COLUMNS:
+                setattr(t, name, array(getattr(self, name).typecode, getattr(self, name)))
+            t.extra = {i: list(v) for i, v in self.extra.items()}
+            return t
+        if keep is None:
+            keep = self.live_slots()
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            setattr(t, name, array(col.typecode, (col[i] for i in keep)))
+        t.extra = {}
+        for i, fields in self.extra.items():
+            new = bisect_left(keep, i)
+            if new < len(keep) and keep[new] == i:
+                t.extra[new] = list(fields)
+        return t
+
+    # ---------- single fields ----------
+    def sid(self, slot):
+        return self.ids.values[self.id_col[slot]]
+
+    def course(self, slot):
+        return self.courses.values[self.course_col[slot]]
+
+    def name(self, slot):
+        return self.names.values[self.name_col[slot]] if self.width[slot] > 1 else None
+
+    # ---------- reading rows back ----------
+    def row(self, i):
+        row = [self.ids.values[self.id_col[i]], self.names.values[self.name_col[i]],
+               self.courses.values[self.course_col[i]], self.marks_text.values[self.marks_col[i]],
+               self.grades.values[self.grade_col[i]]][:self.width[i]]
+        if i in self.extra:
+            row.extend(self.extra[i])
+        return row
+
+    def rows(self, indices=None):
+        """Rows of the given slots, or of every live slot in slot order."""
+        if indices is not None:
+            for i in indices:
+                yield self.row(i)
+            return
+        # one pass over the columns: a full export or report walks every row
+        ids, names, courses = self.ids.values, self.names.values, self.courses.values
+        marks, grades, extra = self.marks_text.values, self.grades.values, self.extra
+        for i, (ic, nc, cc, mc, gc, w) in enumerate(zip(self.id_col, self.name_col, self.course_col,
+                                                        self.marks_col, self.grade_col, self.width)):
+            if w == 5:
+                row = [ids[ic], names[nc], courses[cc], marks[mc], grades[gc]]
+                if extra and i in extra:
+                    row.extend(extra[i])
+                yield row
+            elif w:
+                yield [ids[ic], names[nc], courses[cc], marks[mc]][:w]
+
+    def __iter__(self):
+        return self.rows()
+
+    # ---------- filtering ----------
+    def where(self, sid=None, name=None, course=None, min_marks=None, max_marks=None, grade=None):
+        """Slots of the live rows meeting every given condition (name is case-insensitive)."""
+        id_code = course_code = grade_code = None
+        if sid is not None:
+            id_code = self.ids.codes.get(sid)
+            if id_code is None:
+                return []
+        if course is not None:
+            course_code = self.courses.codes.get(course)
+            if course_code is None:
+                return []
+        if grade is not None:
+            grade_code = self.grades.codes.get(grade)
+            if grade_code is None:
+                return []
+        name_codes = None
+        if name is not None:
+            wanted = name.lower()
+            name_codes = {c for c, v in enumerate(self.names.values) if v.lower() == wanted}
+            if not name_codes:
+                return []
+
+        np = _np()
+        if np is not None:
+            mask = np.frombuffer(self.width, dtype=np.uint8) != 0
+            if id_code is not None:
+                mask &= np.frombuffer(self.id_col, dtype=np.int32) == id_code
+            if course_code is not None:
+                mask &= np.frombuffer(self.course_col, dtype=np.int32) == course_code
+            if grade_code is not None:
+                mask &= np.frombuffer(self.grade_col, dtype=np.uint8) == grade_code
+            if name_codes is not None:
+                mask &= np.isin(np.frombuffer(self.name_col, dtype=np.int32), list(name_codes))
+            if min_marks is not None:
+                mask &= np.frombuffer(self.marks, dtype=np.float32) >= min_marks
+            if max_marks is not None:
+                mask &= np.frombuffer(self.marks, dtype=np.float32) <= max_marks
+            return np.flatnonzero(mask).tolist()
+
+        out = []
+        for i, (ic, nc, cc, m, gc, w) in enumerate(zip(self.id_col, self.name_col, self.course_col,
+                                                       self.marks, self.grade_col, self.width)):
+            if w and ((id_code is None or ic == id_code) and (course_code is None or cc == course_code)
+                    and (grade_code is None or gc == grade_code) and (name_codes is None or nc in name_codes)
+                    and (min_marks is None or m >= min_marks) and (max_marks is None or m <= max_marks)):
+                out.append(i)
+        return out
+
+    # ---------- aggregation ----------
+    def student_aggregates(self):
+        """{ID: StudentAggregate} over the complete rows, in first-seen order."""
+        points = [grade_to_gpa_point(g) if g is not None else 0.0 for g in self.grades.values]
+        np = _np()
+        if np is None:
+            aggs = {}
+            ids, names, values = self.ids.values, self.names.values, self.marks_value
+            for ic, nc, mc, gc in zip(self.id_col, self.name_col, self.marks_col, self.grade_col):
+                if gc == self._missing:
+                    continue
+                m = values[mc]
+                sid = ids[ic]
+                a = aggs.get(sid)
+                if a is None:
+                    a = aggs[sid] = StudentAggregate(names[nc])
+                a.count += 1
+                a.sum_marks += m
+                a.sum_points += points[gc]
+                if a.min_marks is None or m < a.min_marks:
+                    a.min_marks = m
+                if a.max_marks is None or m > a.max_marks:
+                    a.max_marks = m
+            return aggs
+
+        grade = np.frombuffer(self.grade_col, dtype=np.uint8)
+        keep = np.flatnonzero(grade != self._missing)
+        if not len(keep):
+            return {}
+        ids = np.frombuffer(self.id_col, dtype=np.int32)[keep]
+        marks = np.asarray(self.marks_value, dtype=np.float64)[np.frombuffer(self.marks_col, dtype=np.int32)[keep]]
+        n = len(self.ids)
+        counts = np.bincount(ids, minlength=n)
+        sums = np.bincount(ids, weights=marks, minlength=n)
+        pts = np.bincount(ids, weights=np.asarray(points)[grade[keep]], minlength=n)
+        lows = np.full(n, np.inf)
+        highs = np.full(n, -np.inf)
+        np.minimum.at(lows, ids, marks)
+        np.maximum.at(highs, ids, marks)
+        # each student's name comes from their first complete row, and students are listed in that row's order
+        seen, first = np.unique(ids, return_index=True)
+        order = np.argsort(first, kind="stable")
+        name_codes = np.frombuffer(self.name_col, dtype=np.int32)[keep][first]
+        seen = seen[order]
+        ids_v, names_v = self.ids.values, self.names.values
+        return {ids_v[c]: StudentAggregate(names_v[nc], n_, s, p, lo, hi)
+                for c, nc, n_, s, p, lo, hi in zip(seen.tolist(), name_codes[order].tolist(),
+                                                   counts[seen].tolist(), sums[seen].tolist(), pts[seen].tolist(),
+                                                   lows[seen].tolist(), highs[seen].tolist())}
+
+    # ---------- size ----------
+    def memory_usage(self):
+        """Approximate bytes held, per part: the code columns and the string pools."""
+        import sys
+        usage = {name: col.buffer_info()[1] * col.itemsize
+                 for name, col in (("id_col", self.id_col), ("name_col", self.name_col),
+                                   ("course_col", self.course_col), ("marks", self.marks),
+                                   ("grade_col", self.grade_col), ("marks_col", self.marks_col),
+                                   ("width", self.width))}
+        for name, pool in (("ids", self.ids), ("names", self.names), ("courses", self.courses),
+                           ("grades", self.grades), ("marks_text", self.marks_text)):
+            usage[name] = (sys.getsizeof(pool.values) + sys.getsizeof(pool.codes)
+                           + sum(sys.getsizeof(v) for v in pool.values))
+        usage["marks_value"] = sys.getsizeof(self.marks_value) + sum(sys.getsizeof(v) for v in self.marks_value)
+        return usage
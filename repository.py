@@ -0,0 +1,690 @@
+import csv, os, sqlite3, threading
+from abc import ABC, abstractmethod
+import instrument, passwords
+from course_catalog import CourseCatalog
+from file_lock import FileLock
+from record_store import RecordStore, StudentAggregate, HEADER, _file_sig, _prefix_end, write_snapshot
+from grading import GPA_POINTS
+
+USER_HEADER = ["Username", "Password", "Role"]
+COURSE_HEADER = ["CourseCode", "CourseName"]
+
+
+class Repository(ABC):
+    """Storage interface used by GradeTrackerApp.
+
+    Users are dicts with username/password/role, courses are (code, name)
+    pairs and grade records are [ID, Name, CourseCode, Marks, Grade] lists.
+    User passwords are stored as salted hashes (see passwords.py).
+    """
+
+    password_scheme = None   # None: passwords.default_scheme()
+    password_cost = None     # None: passwords.DEFAULT_COST for the scheme
+
+    @abstractmethod
+    def ensure_storage(self):
+        ...
+
+    # ---------- users ----------
+    @abstractmethod
+    def list_users(self):
+        ...
+
+    @abstractmethod
+    def get_user(self, username):
+        ...
+
+    @abstractmethod
+    def add_user(self, username, password, role):
+        """Store a new user; returns False if the username is taken.
+
+        password is the plaintext; only its hash is kept.
+        """
+
+    @abstractmethod
+    def set_password(self, username, password_hash):
+        ...
+
+    def hash_password(self, password):
+        return passwords.hash_password(password, self.password_scheme, self.password_cost)
+
+    def verify_user(self, username, password):
+        """Return the user if password matches, else None.
+
+        Hashing is deliberately slow, so call this from a worker thread.
+        """
+        user = self.get_user(username)
+        if user is None:
+            # as slow as a wrong password, so unknown usernames cannot be told apart by timing
+            passwords.verify_password(password, passwords.dummy_hash(self.password_scheme, self.password_cost))
+            return None
+        if not passwords.verify_password(password, user["password"]):
+            return None
+        if passwords.needs_rehash(user["password"], self.password_scheme, self.password_cost):
+            # plaintext from before hashing, or an older cost: upgrade while we have the password
+            self.set_password(username, self.hash_password(password))
+        return user
+
+    # ---------- courses ----------
+    @abstractmethod
+    def list_courses(self):
+        ...
+
+    @abstractmethod
+    def get_course(self, code):
+        ...
+
+    @abstractmethod
+    def add_course(self, code, name):
+        """Store a new course; returns False if the code is taken."""
+
+    @abstractmethod
+    def course_catalog(self):
+        """CourseCatalog snapshot of the current courses (cached until they change)."""
+
+    # ---------- grade records ----------
+    @abstractmethod
+    def records_for_id(self, sid):
+        ...
+
+    @abstractmethod
+    def records_for_name(self, name):
+        ...
+
+    @abstractmethod
+    def get_record(self, sid, course):
+        ...
+
+    @abstractmethod
+    def all_records(self):
+        ...
+
+    @abstractmethod
+    def search_records(self, text, mode="prefix"):
+        """Generator of lists of matching records, produced as the index is walked.
+
+        mode: "prefix" (ID starts with text), "name" (name starts with text,
+        case-insensitive), "substring" (ID or name contains text,
+        case-insensitive) or "id" (exact ID).
+        """
+
+    @abstractmethod
+    def upsert_record(self, row):
+        """Insert or replace the record for (ID, CourseCode); returns True if it replaced one."""
+
+    @abstractmethod
+    def delete_record(self, sid, course):
+        ...
+
+    @abstractmethod
+    def bulk_upsert_records(self, rows, chunk_size=10000):
+        """Upsert an iterable of records in bulk; returns (inserted, updated)."""
+
+    # ---------- per-student aggregates ----------
+    @abstractmethod
+    def student_aggregates(self):
+        """Return {ID: StudentAggregate} for every student with complete records."""
+
+    @abstractmethod
+    def student_aggregate(self, sid):
+        ...
+
+    def close(self):
+        pass
+
+
+# ---------- safely read users.csv (handles header/no-header) ----------
+def read_users_csv(path):
+    users = []
+    try:
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            cols = None      # (user, password, role) positions from a Username/Password header
+            first = True
+            for r in reader:
+                if not r:
+                    continue
+                if first and "Username" in r and "Password" in r:
+                    first = False
+                    cols = (r.index("Username"), r.index("Password"), r.index("Role") if "Role" in r else None)
+                    continue
+                first = False
+                if cols is not None:
+                    u, p, role = cols
+                    if len(r) > u and r[u]:
+                        users.append({"username": r[u], "password": r[p] if len(r) > p else None,
+                                      "role": r[role] if role is not None and len(r) > role else None})
+                    continue
+                # no header: columns in order Username,Password,Role; skip header-looking rows
+                if r[0].strip().lower() in ("username", "user", "uname"):
+                    continue
+                if len(r) >= 3:
+                    users.append({"username": r[0], "password": r[1], "role": r[2]})
+            if instrument.enabled():
+                instrument.add(rows=len(users), nbytes=os.path.getsize(path))
+    except Exception:
+        pass
+    return users
+
+
+def read_courses_csv(path):
+    courses = []
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for r in reader:
+            if r:
+                courses.append((r[0], r[1] if len(r) > 1 else ""))
+        if instrument.enabled():
+            instrument.add(rows=len(courses), nbytes=os.path.getsize(path))
+    return courses
+
+
+# ---------- CSV files (original layout) ----------
+class CsvRepository(Repository):
+    def __init__(self, user_file, course_file, student_file, journal=False,
+                 password_scheme=None, password_cost=None, load_workers=1):
+        self.user_file = user_file
+        self.course_file = course_file
+        self.student_file = student_file
+        self.password_scheme = password_scheme
+        self.password_cost = password_cost
+        # username -> user, parsed once and reused until users.csv changes on disk
+        self._users = None
+        self._users_sig = None
+        self._users_lock = threading.Lock()
+        # users.csv and courses.csv may be shared with other running copies of the app
+        self._users_flock = FileLock(user_file)
+        self._courses_flock = FileLock(course_file)
+        # course catalog, rebuilt after add_course or when courses.csv changes on disk
+        self._catalog = None
+        self._catalog_sig = None
+        self._catalog_lock = threading.Lock()
+        self.ensure_storage()
+        self.store = RecordStore(student_file, journal=journal, load_workers=load_workers)
+
+    def ensure_storage(self):
+        # ensure users file with header exists (also if it exists but is empty)
+        if not os.path.exists(self.user_file) or os.path.getsize(self.user_file) == 0:
+            with open(self.user_file, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(USER_HEADER)
+                writer.writerow(["admin", self.hash_password("admin"), "admin"])
+
+        if not os.path.exists(self.course_file):
+            with open(self.course_file, "w", newline="") as f:
+                csv.writer(f).writerow(COURSE_HEADER)
+
+        if not os.path.exists(self.student_file):
+            with open(self.student_file, "w", newline="") as f:
+                csv.writer(f).writerow(HEADER)
+
+    # ---------- users ----------
+    def _user_index(self):
+        sig = _file_sig(self.user_file)
+        if self._users is None or sig != self._users_sig:
+            index = {}
+            for u in read_users_csv(self.user_file):
+                index.setdefault(u["username"], u)     # first row wins, as with a linear scan
+            self._users, self._users_sig = index, sig
+        return self._users
+
+    def list_users(self):
+        with self._users_lock:
+            return list(self._user_index().values())
+
+    def get_user(self, username):
+        with self._users_lock:
+            return self._user_index().get(username)
+
+    def add_user(self, username, password, role):
+        stored = self.hash_password(password)
+        with self._users_lock, self._users_flock:
+            index = self._user_index()
+            if username in index:
+                return False
+            with open(self.user_file, "a", newline="") as f:
+                csv.writer(f).writerow([username, stored, role])
+            index.setdefault(username, {"username": username, "password": stored, "role": role})
+            self._users_sig = _file_sig(self.user_file)
+            return True
+
+    def set_password(self, username, password_hash):
+        with self._users_lock, self._users_flock:
+            index = self._user_index()
+            if username not in index:
+                return
+            user = index[username] = dict(index[username], password=password_hash)
+            rows = []
+            for u in read_users_csv(self.user_file):
+                if u["username"] == username and user is not None:
+                    u, user = user, None     # only the first row for a name is ever used
+                rows.append([u["username"], u["password"] or "", u["role"] or ""])
+            write_snapshot(self.user_file, rows, header=USER_HEADER)
+            self._users_sig = _file_sig(self.user_file)
+
+    # ---------- courses ----------
+    def _course_catalog(self):
+        sig = _file_sig(self.course_file)
+        if self._catalog is None or sig != self._catalog_sig:
+            self._catalog, self._catalog_sig = CourseCatalog(read_courses_csv(self.course_file)), sig
+        return self._catalog
+
+    def course_catalog(self):
+        with self._catalog_lock:
+            return self._course_catalog()
+
+    def list_courses(self):
+        return list(self.course_catalog().courses)
+
+    def get_course(self, code):
+        return self.course_catalog().get(code)
+
+    def add_course(self, code, name):
+        with self._catalog_lock, self._courses_flock:
+            # checked under the lock: another copy of the app may have just added it
+            catalog = self._course_catalog()
+            if code in catalog:
+                return False
+            with open(self.course_file, "a", newline="") as f:
+                csv.writer(f).writerow([code, name])
+            self._catalog = CourseCatalog(catalog.courses + [(code, name)])
+            self._catalog_sig = _file_sig(self.course_file)
+            return True
+
+    # ---------- grade records ----------
+    def records_for_id(self, sid):
+        return self.store.records_for_id(sid)
+
+    def records_for_name(self, name):
+        return self.store.records_for_name(name)
+
+    def get_record(self, sid, course):
+        return self.store.get(sid, course)
+
+    def all_records(self):
+        return self.store.all_records()
+
+    def search_records(self, text, mode="prefix"):
+        return self.store.search(text, mode)
+
+    def upsert_record(self, row):
+        return self.store.upsert(row)
+
+    def delete_record(self, sid, course):
+        return self.store.delete(sid, course)
+
+    def bulk_upsert_records(self, rows, chunk_size=10000):
+        return self.store.bulk_upsert(rows)
+
+    def student_aggregates(self):
+        return self.store.student_aggregates()
+
+    def student_aggregate(self, sid):
+        return self.store.student_aggregate(sid)
+
+    def close(self):
+        # fold any pending journal entries back into the CSV
+        self.store.close()
+        self._users_flock.close()
+        self._courses_flock.close()
+
+
+# ---------- SQLite ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS students (
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    course_code TEXT NOT NULL,
+    marks TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    PRIMARY KEY (id, course_code)
+);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS student_aggregates (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum_marks REAL NOT NULL,
+    sum_points REAL NOT NULL,
+    min_marks REAL,
+    max_marks REAL
+);
+"""
+
+# GPA points for a grade column, as SQL (kept in step with grading.GPA_POINTS)
+def _points_sql(col):
+    whens = " ".join(f"WHEN '{g}' THEN {p}" for g, p in GPA_POINTS.items())
+    return f"(CASE UPPER({col}) {whens} ELSE 0.0 END)"
+
+
+# student_aggregates is maintained by triggers, so every write path keeps it
+# current in O(1); only removing or lowering/raising a student's current min/max
+# rescans that student's rows. As in RecordStore, a student is named by their
+# first row (lowest rowid; an upsert keeps a row's rowid), so only changing or
+# deleting the row carrying the name looks it up again. Bump AGG_VERSION when
+# the triggers change so old databases refill.
+AGG_VERSION = "3"
+AGG_TRIGGERS = f"""
+DROP TRIGGER IF EXISTS students_agg_insert;
+DROP TRIGGER IF EXISTS students_agg_delete;
+DROP TRIGGER IF EXISTS students_agg_update;
+CREATE TRIGGER students_agg_insert AFTER INSERT ON students BEGIN
+    INSERT INTO student_aggregates VALUES (
+        new.id, new.name, 1, CAST(new.marks AS REAL), {_points_sql("new.grade")},
+        CAST(new.marks AS REAL), CAST(new.marks AS REAL))
+    ON CONFLICT (id) DO UPDATE SET
+        count = count + 1,
+        sum_marks = sum_marks + excluded.sum_marks,
+        sum_points = sum_points + excluded.sum_points,
+        min_marks = MIN(min_marks, excluded.min_marks),
+        max_marks = MAX(max_marks, excluded.max_marks);
+END;
+CREATE TRIGGER students_agg_delete AFTER DELETE ON students BEGIN
+    UPDATE student_aggregates SET
+        count = count - 1,
+        sum_marks = sum_marks - CAST(old.marks AS REAL),
+        sum_points = sum_points - {_points_sql("old.grade")},
+        name = CASE WHEN old.name = name
+            THEN COALESCE((SELECT name FROM students WHERE id = old.id ORDER BY rowid LIMIT 1), name)
+            ELSE name END,
+        min_marks = CASE WHEN CAST(old.marks AS REAL) <= min_marks
+            THEN (SELECT MIN(CAST(marks AS REAL)) FROM students WHERE id = old.id)
+            ELSE min_marks END,
+        max_marks = CASE WHEN CAST(old.marks AS REAL) >= max_marks
+            THEN (SELECT MAX(CAST(marks AS REAL)) FROM students WHERE id = old.id)
+            ELSE max_marks END
+    WHERE id = old.id;
+    DELETE FROM student_aggregates WHERE id = old.id AND count <= 0;
+END;
+CREATE TRIGGER students_agg_update AFTER UPDATE ON students BEGIN
+    UPDATE student_aggregates SET
+        name = CASE WHEN old.name = new.name THEN name
+            ELSE (SELECT name FROM students WHERE id = new.id ORDER BY rowid LIMIT 1) END,
+        sum_marks = sum_marks - CAST(old.marks AS REAL) + CAST(new.marks AS REAL),
+        sum_points = sum_points - {_points_sql("old.grade")} + {_points_sql("new.grade")},
+        min_marks = CASE WHEN CAST(old.marks AS REAL) <= min_marks
+            THEN (SELECT MIN(CAST(marks AS REAL)) FROM students WHERE id = new.id)
+            ELSE MIN(min_marks, CAST(new.marks AS REAL)) END,
+        max_marks = CASE WHEN CAST(old.marks AS REAL) >= max_marks
+            THEN (SELECT MAX(CAST(marks AS REAL)) FROM students WHERE id = new.id)
+            ELSE MAX(max_marks, CAST(new.marks AS REAL)) END
+    WHERE id = new.id;
+END;
+"""
+
+AGG_BACKFILL = f"""
+INSERT INTO student_aggregates
+SELECT id, (SELECT name FROM students s2 WHERE s2.id = s.id ORDER BY rowid LIMIT 1),
+       COUNT(*), SUM(CAST(marks AS REAL)), SUM({_points_sql("grade")}),
+       MIN(CAST(marks AS REAL)), MAX(CAST(marks AS REAL))
+FROM students s GROUP BY id
+"""
+
+RECORD_COLS = "id, name, course_code, marks, grade"
+UPSERT_SQL = (f"INSERT INTO students ({RECORD_COLS}) VALUES (?, ?, ?, ?, ?) "
+              "ON CONFLICT (id, course_code) DO UPDATE SET "
+              "name = excluded.name, marks = excluded.marks, grade = excluded.grade")
+
+
+def _count_query(_sql):
+    instrument.add(queries=1)
+
+
+class SqliteRepository(Repository):
+    """SQLite-backed storage in WAL mode.
+
+    Each thread gets its own connection, so readers never wait on a writer.
+    Pass migrate_from=(user_file, course_file, student_file) to copy the CSV
+    data in once; later opens skip the migration.
+    """
+
+    def __init__(self, db_path, migrate_from=None, password_scheme=None, password_cost=None):
+        self.db_path = db_path
+        self.password_scheme = password_scheme
+        self.password_cost = password_cost
+        self._local = threading.local()
+        self._catalog = None
+        self._catalog_sig = None
+        self._catalog_lock = threading.Lock()
+        self.ensure_storage()
+        if migrate_from:
+            self.migrate_from_csv(*migrate_from)
+        self._seed_admin(migrate_from[0] if migrate_from else None)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.traced = False
+        if self._local.traced is not instrument.enabled():
+            # count statements only while instrumentation is on; otherwise sqlite skips the callback
+            self._local.traced = instrument.enabled()
+            conn.set_trace_callback(_count_query if self._local.traced else None)
+        return conn
+
+    def ensure_storage(self):
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.executescript(AGG_TRIGGERS)
+            # databases created before the aggregate table (or these triggers) get it filled once
+            built = conn.execute("SELECT value FROM meta WHERE key = 'aggregates_built'").fetchone()
+            if built is None or built[0] != AGG_VERSION:
+                conn.execute("DELETE FROM student_aggregates")
+                conn.execute(AGG_BACKFILL)
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('aggregates_built', ?)", (AGG_VERSION,))
+
+    def _seed_admin(self, user_file=None):
+        # a new database gets admin/admin, as a new users.csv does, unless users come from users.csv
+        if user_file and os.path.exists(user_file) and os.path.getsize(user_file) > 0:
+            return
+        conn = self._conn()
+        with conn:
+            if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+                conn.execute("INSERT INTO users VALUES (?, ?, ?)", ("admin", self.hash_password("admin"), "admin"))
+
+    def migrate_from_csv(self, user_file, course_file, student_file):
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_csv'").fetchone():
+            return
+        with conn:
+            if os.path.exists(user_file):
+                conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?)",
+                                 ((u["username"], u["password"], u["role"] or "student") for u in read_users_csv(user_file)))
+            if os.path.exists(course_file):
+                conn.executemany("INSERT OR REPLACE INTO courses VALUES (?, ?)", read_courses_csv(course_file))
+            if os.path.exists(student_file):
+                # journal mode also replays grade edits not yet folded into the CSV
+                store = RecordStore(student_file, journal=True, snapshot=False, locking=False)
+                rows = (r for r in store.all_records() if len(r) >= 5)
+                conn.executemany(UPSERT_SQL, (r[:5] for r in rows))
+            conn.execute("INSERT INTO meta VALUES ('migrated_from_csv', ?)", (student_file,))
+
+    # ---------- users ----------
+    def list_users(self):
+        cur = self._conn().execute("SELECT username, password, role FROM users")
+        return [{"username": u, "password": p, "role": r} for u, p, r in cur]
+
+    def get_user(self, username):
+        row = self._conn().execute("SELECT username, password, role FROM users WHERE username = ?",
+                                   (username,)).fetchone()
+        if row is None:
+            return None
+        return {"username": row[0], "password": row[1], "role": row[2]}
+
+    def add_user(self, username, password, role):
+        stored = self.hash_password(password)
+        conn = self._conn()
+        try:
+            with conn:
+                conn.execute("INSERT INTO users VALUES (?, ?, ?)", (username, stored, role))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def set_password(self, username, password_hash):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+    # ---------- courses ----------
+    def list_courses(self):
+        return [tuple(r) for r in self._conn().execute("SELECT code, name FROM courses ORDER BY rowid")]
+
+    def get_course(self, code):
+        row = self._conn().execute("SELECT code, name FROM courses WHERE code = ?", (code,)).fetchone()
+        return tuple(row) if row else None
+
+    def add_course(self, code, name):
+        conn = self._conn()
+        try:
+            with conn:
+                conn.execute("INSERT INTO courses VALUES (?, ?)", (code, name))
+        except sqlite3.IntegrityError:
+            return False
+        with self._catalog_lock:
+            self._catalog = None
+        return True
+
+    def course_catalog(self):
+        # courses are only ever inserted/replaced, so (count, max rowid) changes with every write,
+        # including writes from other processes
+        sig = self._conn().execute("SELECT COUNT(*), MAX(rowid) FROM courses").fetchone()
+        with self._catalog_lock:
+            if self._catalog is None or sig != self._catalog_sig:
+                self._catalog, self._catalog_sig = CourseCatalog(self.list_courses()), sig
+            return self._catalog
+
+    # ---------- grade records ----------
+    def _records(self, where, args):
+        cur = self._conn().execute(f"SELECT {RECORD_COLS} FROM students {where} ORDER BY rowid", args)
+        found = [list(r) for r in cur]
+        instrument.add(rows=len(found))
+        return found
+
+    def records_for_id(self, sid):
+        return self._records("WHERE id = ?", (sid,))
+
+    def records_for_name(self, name):
+        return self._records("WHERE name = ? COLLATE NOCASE", (name or "",))
+
+    def get_record(self, sid, course):
+        recs = self._records("WHERE id = ? AND course_code = ?", (sid, course))
+        return recs[0] if recs else None
+
+    def all_records(self):
+        return self._records("", ())
+
+    def search_records(self, text, mode="prefix", batch=2000):
+        text = (text or "").strip()
+        if mode == "prefix":
+            # a range on the primary key, so only the matching slice of the index is read
+            where, args = ("WHERE id >= ? AND id < ? ", (text, _prefix_end(text))) if text else ("", ())
+            order = "id"
+        elif mode == "name":
+            # NOCASE compares lower-cased, so the bounds must be too: "Z" + 1 is "[", below "a"
+            where = "WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE " if text else ""
+            args = (text.lower(), _prefix_end(text.lower())) if text else ()
+            order = "name COLLATE NOCASE"
+        elif mode == "substring":
+            where, args = "WHERE instr(lower(id), ?) > 0 OR instr(lower(name), ?) > 0 ", (text.lower(),) * 2
+            order = "id"
+        elif mode == "id":
+            where, args, order = "WHERE id = ? ", (text,), "rowid"
+        else:
+            raise ValueError(f"unknown search mode {mode!r}")
+        cur = self._conn().execute(f"SELECT {RECORD_COLS} FROM students {where}ORDER BY {order}", args)
+        try:
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    return
+                instrument.add(rows=len(rows))
+                yield [list(r) for r in rows]
+        finally:
+            cur.close()
+
+    def upsert_record(self, row):
+        conn = self._conn()
+        with conn:
+            existed = conn.execute("SELECT 1 FROM students WHERE id = ? AND course_code = ?",
+                                   (row[0], row[2])).fetchone() is not None
+            conn.execute(UPSERT_SQL, tuple(row[:5]))
+        return existed
+
+    def delete_record(self, sid, course):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM students WHERE id = ? AND course_code = ?", (sid, course))
+        return cur.rowcount > 0
+
+    def bulk_upsert_records(self, rows, chunk_size=10000):
+        conn = self._conn()
+        total = inserted = 0
+        chunk = []
+        for row in rows:
+            chunk.append(tuple(row[:5]))
+            if len(chunk) >= chunk_size:
+                inserted += self._upsert_chunk(conn, chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            inserted += self._upsert_chunk(conn, chunk)
+            total += len(chunk)
+        return inserted, total - inserted
+
+    @staticmethod
+    def _upsert_chunk(conn, chunk):
+        # one transaction per chunk; keys missing beforehand are the inserts (one
+        # primary-key probe each, rather than counting the whole table)
+        with conn:
+            keys = {(r[0], r[2]) for r in chunk}
+            existing = sum(conn.execute("SELECT 1 FROM students WHERE id = ? AND course_code = ?",
+                                        key).fetchone() is not None for key in keys)
+            conn.executemany(UPSERT_SQL, chunk)
+            return len(keys) - existing
+
+    def student_aggregates(self):
+        cur = self._conn().execute("SELECT id, name, count, sum_marks, sum_points, min_marks, max_marks "
+                                   "FROM student_aggregates ORDER BY rowid")
+        found = {r[0]: StudentAggregate(*r[1:]) for r in cur}
+        instrument.add(rows=len(found))
+        return found
+
+    def student_aggregate(self, sid):
+        r = self._conn().execute("SELECT name, count, sum_marks, sum_points, min_marks, max_marks "
+                                 "FROM student_aggregates WHERE id = ?", (sid,)).fetchone()
+        return StudentAggregate(*r) if r else None
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_repository(backend, user_file, course_file, student_file, sqlite_file, journal=False,
+                    password_scheme=None, password_cost=None, load_workers=1):
+    if backend == "sqlite":
+        return SqliteRepository(sqlite_file, migrate_from=(user_file, course_file, student_file),
+                                password_scheme=password_scheme, password_cost=password_cost)
+    return CsvRepository(user_file, course_file, student_file, journal=journal,
+                         password_scheme=password_scheme, password_cost=password_cost,
+                         load_workers=load_workers)
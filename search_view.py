@@ -0,0 +1,102 @@
+import tkinter as tk
+from tkinter import ttk
+
+# label shown in the mode picker -> Repository.search_records mode
+SEARCH_MODES = (("ID starts with", "prefix"), ("Name starts with", "name"),
+                ("ID or name contains", "substring"), ("Exact ID", "id"))
+
+
+class SearchResults(ttk.Treeview):
+    """Treeview filled from a streaming search as its batches arrive.
+
+    search(text, mode) must return a generator of row lists (such as
+    Repository.search_records); it runs on the TaskRunner, and each batch is
+    inserted as soon as the worker posts it, so the first matches show up
+    while the rest of the index is still being walked. watch(entry) re-runs
+    the search delay_ms after the last keystroke; a newer search cancels the
+    one in flight. At most limit rows are shown. With unique, only the first
+    row for each unique(row) key is kept (one line per student, say).
+    """
+
+    def __init__(self, master, search, runner, to_values=tuple, unique=None, limit=2000, delay_ms=200, **kw):
+        super().__init__(master, **kw)
+        self.search = search
+        self.runner = runner
+        self.to_values = to_values
+        self.unique = unique
+        self.limit = limit
+        self.delay_ms = delay_ms
+        self.scrollbar = ttk.Scrollbar(master, orient="vertical", command=self.yview)
+        self.configure(yscrollcommand=self.scrollbar.set)
+        self.status = tk.StringVar(value="")
+        self.rows = {}       # item id -> row
+        self._seen = set()
+        self._after = None
+        self._entry = None
+        self._mode = None
+
+    def watch(self, entry, mode_var=None):
+        """Search as the user types in entry; mode_var holds a SEARCH_MODES label."""
+        self._entry = entry
+        self._mode = mode_var
+        entry.bind("<KeyRelease>", self._schedule, add="+")
+
+    def mode(self):
+        label = self._mode.get() if self._mode is not None else ""
+        return dict(SEARCH_MODES).get(label, "prefix")
+
+    def clear(self):
+        self._cancel_pending()
+        self.runner.cancel(self)
+        self.delete(*self.get_children())
+        self.rows.clear()
+        self._seen.clear()
+        self.status.set("")
+
+    def run(self, text=None, mode=None):
+        self._cancel_pending()
+        text = (self._entry.get() if text is None else text).strip()
+        mode = mode or self.mode()
+        self.clear()
+        if not text:
+            return     # an empty query would list every record
+        self.status.set("Searching...")
+        self.runner.stream(self.search, text, mode, on_batch=self._add, on_done=self._finished,
+                           on_error=self._failed, key=self, limit=self.limit)
+
+    def _cancel_pending(self):
+        if self._after is not None:
+            self.after_cancel(self._after)
+            self._after = None
+
+    def _schedule(self, event=None):
+        if event is not None and event.keysym in ("Up", "Down", "Left", "Right", "Return", "Tab"):
+            return
+        self._cancel_pending()
+        self._after = self.after(self.delay_ms, self.run)
+
+    def _add(self, rows):
+        for row in rows:
+            if self.unique is not None:
+                k = self.unique(row)
+                if k in self._seen:
+                    continue
+                self._seen.add(k)
+            self.rows[self.insert("", "end", values=self.to_values(row))] = row
+        self.status.set(f"{len(self.rows)} matches so far...")
+
+    def _finished(self, count):
+        shown = len(self.rows)
+        if not shown:
+            self.status.set("No matches.")
+        elif count >= self.limit:
+            self.status.set(f"First {shown} matches; type more to narrow it down.")
+        else:
+            self.status.set(f"{shown} matches.")
+
+    def _failed(self, exc):
+        self.status.set(f"Search failed: {exc}")
+
+    def selected_row(self):
+        sel = self.selection()
+        return self.rows.get(sel[0]) if sel else None
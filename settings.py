@@ -0,0 +1,35 @@
+import os
+
+# ----- File names -----
+USER_FILE = "users.csv"
+COURSE_FILE = "courses.csv"
+STUDENT_FILE = "students.csv"
+SQLITE_FILE = "grades.db"
+
+# set GRADE_BACKEND=sqlite to keep everything in grades.db (CSV data is migrated in on first run)
+STORAGE_BACKEND = os.environ.get("GRADE_BACKEND", "csv")
+
+# set GRADE_JOURNAL=1 to log grade edits to students.csv.journal instead of rewriting the CSV
+USE_JOURNAL = os.environ.get("GRADE_JOURNAL", "0") == "1"
+
+# processes parsing a large students.csv on first load (0 = one per CPU, 1 = serial)
+LOAD_WORKERS = int(os.environ.get("GRADE_LOAD_WORKERS", "0"))
+
+# resized page backgrounds are cached here; GRADE_BG_WARMUP=0 skips preloading bgdata.txt at startup
+BG_CACHE_DIR = ".bg_cache"
+BG_WARMUP = os.environ.get("GRADE_BG_WARMUP", "1") == "1"
+
+# password hashing: GRADE_PASSWORD_HASH=scrypt|pbkdf2_sha256 (default scrypt where available);
+# GRADE_PASSWORD_COST is log2(N) for scrypt or the iteration count for PBKDF2
+PASSWORD_SCHEME = os.environ.get("GRADE_PASSWORD_HASH") or None
+PASSWORD_COST = int(os.environ["GRADE_PASSWORD_COST"]) if os.environ.get("GRADE_PASSWORD_COST") else None
+
+# GRADE_METRICS=1 records handler/DB latency from startup (F12 opens the panel either way);
+# GRADE_METRICS_FILE=path writes the numbers on exit (.prom/.txt: Prometheus text, otherwise JSON)
+METRICS_ENABLED = os.environ.get("GRADE_METRICS", "0") == "1"
+METRICS_FILE = os.environ.get("GRADE_METRICS_FILE") or None
+
+# GRADE_PROFILE=1 (or code.py --profile [DIR]) runs every user action under cProfile + tracemalloc
+# and writes .prof / .alloc.txt files to GRADE_PROFILE_DIR; F11 shows the last action's profile
+PROFILE_ENABLED = os.environ.get("GRADE_PROFILE", "0") == "1"
+PROFILE_DIR = os.environ.get("GRADE_PROFILE_DIR", "profiles")
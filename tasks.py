@@ -0,0 +1,174 @@
+import queue, time
+import tkinter as tk
+from tkinter import messagebox, ttk
+from concurrent.futures import ThreadPoolExecutor
+import instrument, profiling
+
+
+class TaskRunner:
+    """Runs blocking file/DB work on worker threads and hands results back to Tk.
+
+    Rule: a job passed to submit() must never touch a widget. Widgets are only
+    touched by on_done/on_error, which always run on the Tk thread (results
+    are queued by the workers and drained from root.after).
+
+    Jobs submitted with the same key supersede each other: a queued older job
+    is cancelled, and a running one has its result dropped when it finishes.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=25):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+        self._results = queue.Queue()
+        self._latest = {}    # key -> (ticket, future) of the newest job for that key
+        self._tickets = {}   # ticket -> (key, on_done, on_error, profiled action, on_batch) for jobs not yet delivered
+        self._pending = 0
+        self._ticket = 0
+        self._polling = False
+        self._progress = None
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        return self._submit(fn, args, on_done, on_error, key)
+
+    def stream(self, gen_fn, *args, on_batch=None, on_done=None, on_error=None, key=None,
+               limit=None, batch_size=200, flush_s=0.05):
+        """submit() for a generator of item lists (such as Repository.search_records).
+
+        Items reach on_batch(list) on the Tk thread as they are produced, at most
+        batch_size at a time and at least every flush_s seconds once one is
+        waiting; on_done(count) follows the last batch. The worker stops early
+        after limit items, or as soon as a newer job with the same key replaces it.
+        """
+        return self._submit(self._pump, (gen_fn, args, key, limit, batch_size, flush_s),
+                            on_done, on_error, key, on_batch)
+
+    def _submit(self, fn, args, on_done, on_error, key, on_batch=None):
+        self._ticket += 1
+        ticket = self._ticket
+        if key is not None:
+            self._drop_queued(self._latest.get(key))
+            # claimed before the job starts, so a streaming worker never sees itself as superseded
+            self._latest[key] = (ticket, None)
+        if on_batch is not None:
+            args = (ticket,) + args     # the pump posts its batches under its own ticket
+        # in profiling mode the job and its callbacks count toward the action that submitted them
+        action = profiling.current_action()
+        future = self._pool.submit(self._run, ticket, fn, args, action)
+        if key is not None:
+            self._latest[key] = (ticket, future)
+        self._pending += 1
+        self._tickets[ticket] = (key, on_done, on_error, action, on_batch)
+        self._show_progress()
+        self._schedule_poll()
+        return ticket
+
+    def cancel(self, key):
+        # a job that already started still runs, but its result is discarded
+        self._drop_queued(self._latest.pop(key, None))
+
+    def _drop_queued(self, entry):
+        if entry is not None and entry[1] is not None and entry[1].cancel():
+            self._pending -= 1
+            self._tickets.pop(entry[0], None)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # ---------- worker side (no widgets here) ----------
+    def _run(self, ticket, fn, args, action):
+        try:
+            with profiling.unit(action, "task:", fn), instrument.call_span("task:", fn):
+                result = fn(*args)
+            self._results.put((ticket, True, result))
+        except BaseException as exc:
+            self._results.put((ticket, False, exc))
+
+    def _superseded(self, key, ticket):
+        latest = self._latest.get(key)
+        return latest is None or latest[0] != ticket
+
+    def _pump(self, ticket, gen_fn, args, key, limit, batch_size, flush_s):
+        count = 0
+        buf = []
+        flushed = time.perf_counter()
+        for items in gen_fn(*args):
+            if key is not None and self._superseded(key, ticket):
+                return count
+            if limit is not None and count + len(buf) + len(items) > limit:
+                items = items[:limit - count - len(buf)]
+            buf.extend(items)
+            while len(buf) >= batch_size or (buf and time.perf_counter() - flushed >= flush_s):
+                out, buf = buf[:batch_size], buf[batch_size:]
+                self._results.put((ticket, None, out))     # ok=None: a partial result
+                count += len(out)
+                flushed = time.perf_counter()
+            if limit is not None and count + len(buf) >= limit:
+                break
+        if buf:
+            self._results.put((ticket, None, buf))
+            count += len(buf)
+        return count
+
+    # ---------- Tk side ----------
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                ticket, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if ok is None:
+                # a streamed batch; the job itself is still running
+                key, _, _, action, on_batch = self._tickets.get(ticket, (None, None, None, None, None))
+                if on_batch is None or (key is not None and self._superseded(key, ticket)):
+                    continue
+                try:
+                    with profiling.unit(action, "ui:", on_batch), instrument.call_span("ui:", on_batch):
+                        on_batch(value)
+                except tk.TclError:
+                    pass
+                continue
+            self._pending -= 1
+            key, on_done, on_error, action, _ = self._tickets.pop(ticket, (None, None, None, None, None))
+            if key is not None:
+                if self._superseded(key, ticket):
+                    continue     # superseded by a newer request
+                del self._latest[key]
+            try:
+                if ok:
+                    if on_done is not None:
+                        with profiling.unit(action, "ui:", on_done), instrument.call_span("ui:", on_done):
+                            on_done(value)
+                elif on_error is not None:
+                    on_error(value)
+                else:
+                    messagebox.showerror("Error", str(value))
+            except tk.TclError:
+                pass     # the page that asked for this result was navigated away from
+        if self._pending > 0:
+            if self._progress is not None and self._progress.winfo_exists():
+                self._progress.lift()     # a page raised meanwhile must not cover the bar
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+            self._hide_progress()
+
+    def _show_progress(self):
+        # rebuild the bar if something destroyed it along with root's children
+        if self._progress is None or not self._progress.winfo_exists():
+            self._progress = ttk.Progressbar(self.root, mode="indeterminate", length=200)
+        self._progress.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor="se")
+        self._progress.lift()
+        self._progress.start(12)
+        self.root.config(cursor="watch")
+
+    def _hide_progress(self):
+        if self._progress is not None and self._progress.winfo_exists():
+            self._progress.stop()
+            self._progress.place_forget()
+        self.root.config(cursor="")
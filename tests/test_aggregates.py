@@ -0,0 +1,71 @@
+"""Aggregates kept up to date write by write must equal the ones rebuilt from the rows."""
+import os, random
+
+import pytest
+
+from record_store import RecordStore
+from repository import AGG_BACKFILL, SqliteRepository
+
+
+def summary(aggs):
+    return {sid: (a.name, a.count, round(a.sum_marks, 6), round(a.sum_points, 6), a.min_marks, a.max_marks)
+            for sid, a in aggs.items()}
+
+
+def random_edits(seed, n=1500):
+    rnd = random.Random(seed)
+    for i in range(n):
+        sid, course = f"S{rnd.randrange(15)}", f"C{rnd.randrange(6)}"
+        if rnd.random() < 0.2:
+            yield "delete", (sid, course)
+        else:
+            yield "upsert", [sid, rnd.choice(["Bob", "Robert", "Bobby"]), course,
+                             f"{rnd.randrange(0, 101)}", rnd.choice("ABCDF")]
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_renamed_row_keeps_first_row_name(tmp_path, journal):
+    path = str(tmp_path / "students.csv")
+    store = RecordStore(path, journal=journal, snapshot=False)
+    store.upsert(["S1", "Bob", "CS1", "70", "B"])
+    store.upsert(["S1", "Bob", "CS2", "80", "A"])
+    store.upsert(["S1", "Robert", "CS1", "75", "B"])
+    assert store.student_aggregates()["S1"].name == "Robert"
+    store.close()
+    os.remove(store.agg_path)
+    fresh = RecordStore(path, journal=journal, snapshot=False)
+    assert fresh.student_aggregates()["S1"].name == "Robert"
+    fresh.close()
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_store_incremental_matches_rebuild(tmp_path, journal):
+    path = str(tmp_path / "students.csv")
+    store = RecordStore(path, journal=journal, compact_every=200, snapshot=False)
+    for op, arg in random_edits(3, 600):
+        if op == "delete":
+            store.delete(*arg)
+        else:
+            store.upsert(arg)
+    incremental = summary(store.student_aggregates())
+    store.close()
+    os.remove(store.agg_path)
+    fresh = RecordStore(path, journal=journal, snapshot=False)
+    assert summary(fresh.student_aggregates()) == incremental
+    fresh.close()
+
+
+def test_sqlite_triggers_match_backfill(tmp_path):
+    repo = SqliteRepository(str(tmp_path / "grades.db"))
+    for op, arg in random_edits(5):
+        if op == "delete":
+            repo.delete_record(*arg)
+        else:
+            repo.upsert_record(arg)
+    conn = repo._conn()
+    query = "SELECT id, name, count, ROUND(sum_marks, 6), min_marks, max_marks FROM student_aggregates ORDER BY id"
+    incremental = conn.execute(query).fetchall()
+    with conn:
+        conn.execute("DELETE FROM student_aggregates")
+        conn.execute(AGG_BACKFILL)
+    assert conn.execute(query).fetchall() == incremental
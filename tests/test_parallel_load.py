@@ -0,0 +1,61 @@
+"""parallel_load.read_rows must give exactly what one csv.reader gives."""
+import csv, random
+
+import pytest
+
+import parallel_load
+from record_store import HEADER, RecordStore
+
+
+def write_quoted(path, rows, seed=1):
+    # names with commas, escaped quotes and embedded newlines, so ranges have to be cut outside them
+    rnd = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for i in range(rows):
+            name = rnd.choice(["Ann", 'Bo "B" Smith', "Lee,\nJr", "a\r\nb", '"\n"', ""])
+            marks = f"{rnd.uniform(0, 100):.2f}"
+            w.writerow([f"S{i % (rows // 3 + 1)}", name, f"C{i % 7}", marks, "A"][:rnd.choice([3, 5, 5, 5])])
+
+
+@pytest.mark.parametrize("workers", [2, 3, 5])
+def test_parallel_matches_serial(tmp_path, workers):
+    path = str(tmp_path / "students.csv")
+    write_quoted(path, 3000)
+    expected = list(parallel_load.read_serial(path))
+    ranges = parallel_load.record_ranges(path, workers * 4)
+    assert ranges is not None and len(ranges) > 1
+    got = list(parallel_load.read_rows(path, workers, chunks_per_worker=4, min_bytes=0))
+    assert got == expected
+
+
+def test_separator_characters_survive(tmp_path):
+    # a chunk holding the packing separators is sent back as row lists instead
+    path = str(tmp_path / "students.csv")
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        w.writerows([f"S{i}", f"x\x1fy\x1e{i}", "C1", "50", "D"] for i in range(500))
+    got = list(parallel_load.read_rows(path, 2, min_bytes=0))
+    assert got == list(parallel_load.read_serial(path))
+
+
+def test_odd_quote_count_falls_back_to_serial(tmp_path):
+    path = str(tmp_path / "students.csv")
+    with open(path, "w", newline="") as f:
+        f.write("ID,Name,CourseCode,Marks,Grade\r\n")
+        f.write('S1,Al "the" x,C1,50,D\r\n' * 200)
+        f.write('S2,Bo " Jr,C1,60,C\r\n')
+    assert parallel_load.record_ranges(path, 8) is None
+    assert list(parallel_load.read_rows(path, 4, min_bytes=0)) == list(parallel_load.read_serial(path))
+
+
+def test_store_loads_the_same_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "students.csv")
+    write_quoted(path, 2000, seed=7)
+    serial = RecordStore(path, snapshot=False, locking=False)
+    monkeypatch.setattr(parallel_load, "MIN_PARALLEL_BYTES", 0)
+    parallel = RecordStore(path, snapshot=False, locking=False, load_workers=3)
+    assert parallel.all_records() == serial.all_records()
+    assert list(parallel.student_aggregates()) == list(serial.student_aggregates())
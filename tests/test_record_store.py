@@ -0,0 +1,93 @@
+"""RecordStore on RecordTable slots must answer exactly as a dict of row lists in file order would."""
+import random
+
+import pytest
+
+from record_store import RecordStore
+
+
+class Model:
+    """(ID, CourseCode) -> row, in file order: what the store used to hold."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def upsert(self, row):
+        self.rows[(row[0], row[2] if len(row) > 2 else "")] = list(row)
+
+    def delete(self, sid, course):
+        self.rows.pop((sid, course), None)
+
+    def for_id(self, sid):
+        return [r for r in self.rows.values() if r[0] == sid]
+
+    def for_name(self, name):
+        return [r for r in self.rows.values() if len(r) > 1 and r[1].lower() == name.lower()]
+
+    def by_id_prefix(self, prefix):
+        return [r for sid in sorted({r[0] for r in self.rows.values() if r[0].startswith(prefix)})
+                for r in self.for_id(sid)]
+
+    def by_name_prefix(self, prefix):
+        names = sorted({r[1].lower() for r in self.rows.values() if len(r) > 1 and r[1].lower().startswith(prefix)})
+        return [r for n in names for r in self.for_name(n)]
+
+
+def random_row(rnd):
+    sid, course = f"S{rnd.randrange(40)}", f"C{rnd.randrange(8)}"
+    row = [sid, rnd.choice(["Ann", "ann", "Bo Li", "Cy", "N/A"]), course,
+           rnd.choice(["85", "70.50", "N/A", "", "100"]), rnd.choice("ABCDF"), "extra"]
+    return row[:rnd.choice([2, 3, 4, 5, 5, 5, 5, 6])]
+
+
+def check(store, model, rnd):
+    assert store.all_records() == list(model.rows.values())
+    assert len(store) == len(model.rows)
+    for _ in range(5):
+        sid, course = f"S{rnd.randrange(40)}", f"C{rnd.randrange(8)}"
+        assert store.records_for_id(sid) == model.for_id(sid)
+        assert store.get(sid, course) == model.rows.get((sid, course))
+    for name in ("Ann", "bo li", "nobody"):
+        assert store.records_for_name(name) == model.for_name(name)
+    assert [r for part in store.search("S1", chunk=3) for r in part] == model.by_id_prefix("S1")
+    assert [r for part in store.search("an", mode="name", chunk=1) for r in part] == model.by_name_prefix("an")
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_matches_row_list_model(tmp_path, monkeypatch, journal):
+    # reclaim dead slots early, so renumbering is exercised too
+    monkeypatch.setattr(RecordStore, "RECLAIM_MIN", 8)
+    path = str(tmp_path / "students.csv")
+    store = RecordStore(path, journal=journal, compact_every=150, snapshot=False)
+    model = Model()
+    rnd = random.Random(11)
+    for i in range(800):
+        # mostly deletes in the second half, so dead slots outnumber live ones
+        if rnd.random() < (0.35 if i < 400 else 0.8):
+            sid, course = f"S{rnd.randrange(40)}", f"C{rnd.randrange(8)}"
+            store.delete(sid, course)
+            model.delete(sid, course)
+        else:
+            row = random_row(rnd)
+            store.upsert(row)
+            model.upsert(row)
+        if i % 100 == 0:
+            check(store, model, rnd)
+    check(store, model, rnd)
+    store.close()
+    check(RecordStore(path, journal=journal, snapshot=False), model, rnd)
+
+
+def test_snapshot_after_deletes(tmp_path):
+    path = str(tmp_path / "students.csv")
+    store = RecordStore(path)
+    for i in range(50):
+        store.upsert([f"S{i}", f"Name {i}", "C1", str(i), "B"])
+    for i in range(0, 50, 3):
+        store.delete(f"S{i}", "C1")
+    expected = store.all_records()
+    store.close()
+    mapped = RecordStore(path)
+    assert mapped._mapped_table() is not None
+    assert mapped.all_records() == expected
+    assert mapped.records_for_name("name 4") == [["S4", "Name 4", "C1", "4", "B"]]
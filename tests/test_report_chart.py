@@ -0,0 +1,42 @@
+"""ReportChart frees its Figure when its window is destroyed, so RSS stays flat over many reports."""
+import gc, os, sys, weakref
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import report_rss
+
+import charts
+
+REPORTS = 1000
+MAX_GROWTH_MB = 25.0
+
+
+def test_destroy_releases_the_figure():
+    win = report_rss._Toplevel()
+    chart = charts.ReportChart(win, canvas_class=report_rss._agg_canvas_class())
+    chart.render([70.0, 80.0, 90.0], ["CS101", "CS102", "CS103"])
+    figure = weakref.ref(chart.figure)
+    win.destroy()
+    gc.collect()
+    assert chart.figure is None and chart.canvas is None
+    assert figure() is None
+
+
+def test_child_destroy_keeps_the_figure():
+    # Tk also sends a Toplevel's <Destroy> binding to each of its children
+    win = report_rss._Toplevel()
+    chart = charts.ReportChart(win, canvas_class=report_rss._agg_canvas_class())
+    chart._on_destroy(type("Event", (), {"widget": object()})())
+    assert chart.figure is not None
+
+
+@pytest.mark.parametrize("mode", ["headless", "tk"])
+def test_many_reports_keep_rss_bounded(mode):
+    if mode == "tk" and not report_rss.has_display():
+        pytest.skip("no display")
+    base, end, unreleased = report_rss.run(mode, REPORTS)
+    assert unreleased == 0
+    assert end - base <= MAX_GROWTH_MB, f"RSS grew {end - base:.1f} MB over {REPORTS} reports"